@@ -1,13 +1,26 @@
+import itertools
+import os
+import re
+import shlex
+import tempfile
+import threading
+from datetime import datetime
+from io import BytesIO
+from typing import IO, Union
 # ESA utils
 from esalib.utils.logger.Logger import Logger
 from .ESASSHAgent import ESASSHAgent
+from .ESASNMPDConf import ESASNMPDConf
+# SSH
+from ..infrastructure.ssh_manager.strategy.SSHStrategy import SSHStrategy
 # Utils
 from ..utils.files.FileManager import FileManager
+from ..utils.files.FileCache import FileCache
 
 
 class ESAFileManager:
     """
-    @version 1.2.3
+    @version 1.13.5
 
     Class to get files from ESA and retrieve values from them. It is useful to get relevant values for 
     the state. 
@@ -15,7 +28,34 @@ class ESAFileManager:
     to simply retrieve a remote file by its name/path, and anither facade to retrieve values from already
     obtained files via regular expressions.
     The method et_essential_files is a practical wrapper to get all the necessary files to get ESA's basic
-    information (serial number and warnings in the logfile).
+    information (serial number and warnings in the logfile), which are retrieved concurrently when possible.
+    The files are stored in the local directory provided by constructor (the current directory by default), so that
+    concurrent runs against different ESAs do not overwrite each other's files.
+    The files can also be searched remotely (grep on the ESA), which only transfers the matching lines. If the remote
+    search is enabled for the logs, the log file is not retrieved with the essential files, it is only retrieved if
+    the remote search is not possible (the local search is the fallback).
+    If a FileCache is provided, the retrieved files are cached by device serial number (by host until the serial
+    number is known) and remote path, and they are only transferred again if their remote size or modification
+    time changed (a single stat command) or if the freshness policy of the cache requires it.
+    The log file can also be fetched incrementally (it requires the cache, which keeps the remote size and inode of
+    the last fetch): only the bytes appended since the last fetch are transferred and appended to the cached copy.
+    A rotation (a new inode, a smaller file or different bytes before the last offset) triggers a full fetch.
+    The files can also be retrieved in memory (spooled temporary files, which only touch the disk once they exceed
+    MAX_IN_MEMORY_SIZE), instead of the local directory. The in-memory files are searched directly by the FileManager,
+    and get_file_source returns the file of a name in both modes.
+    The transfers can be compressed ($transfer_compression): with gzip on the ESA (decompressed on the fly), over a
+    dedicated connection with SSH transport compression, or automatically (gzip only for the files bigger than
+    $compression_threshold, where it pays off). If a compressed transfer fails, the file is transferred uncompressed.
+    Many warnings (or captures) can be searched in a single read of a file (search_patterns_in_file, and
+    search_patterns_in_the_logs, which runs a single grep on the ESA if the logs are searched remotely).
+    The SNMPD conf file is parsed once into an immutable ESASNMPDConf model (get_snmpd_conf), which is cached by device
+    for the whole process (until the modification time of the file changes), and stored with the cached file if there
+    is a FileCache, so later runs do not parse it again.
+    The logs can be searched newest-first (get_last_matches_in_the_logs), reading the log file backwards from its end,
+    so the checks of recent warnings only read the tail of the file.
+    The logs can also be searched within a time window (search_in_the_logs_between): the window is found with a
+    binary search over the byte offsets of the log file, parsing the timestamps of the lines ($log_timestamp_parser,
+    the ESA format by default), so only the lines of the window are read.
     """
 
     # File names
@@ -27,18 +67,80 @@ class ESAFileManager:
     ESA_LOG_FILE_PATH = '/data/db/' + ESA_LOG_FILE_NAME
     ESA_SNMPD_CONF_PATH = '/data/release/current/etc/' + ESA_SNMPD_CONF_FILE_NAME
 
+    # Remote command to get the size, modification time and inode of a file (FreeBSD stat, with the GNU stat as fallback)
+    __REMOTE_STAT_COMMAND = "stat -f '%%z %%m %%i' %(path)s 2>/dev/null || stat -c '%%s %%Y %%i' %(path)s"
+
+    # Number of bytes before the last offset that are fetched again to detect the rotations that keep the inode
+    __ROTATION_CHECK_SIZE = 64
+
+    # Maximum number of bytes of an in-memory file kept in memory (the rest is spooled to a temporary file)
+    MAX_IN_MEMORY_SIZE = 8388608
+
+    # Compression modes of the transfers
+    TRANSFER_COMPRESSION_GZIP   = 'gzip'
+    TRANSFER_COMPRESSION_SSH    = 'ssh'
+    TRANSFER_COMPRESSION_AUTO   = 'auto'
+
+    # Python regex syntax that is not supported by the extended regular expressions of grep, the GNU extensions (like
+    # \s, \w or \b) are included, because the BSD grep of the ESA does not support them either
+    __PYTHON_ONLY_REGEX = re.compile(r'\(\?|\\[dDsSwWbBAZ<>`\']|\*\?|\+\?|\?\?|\}\?')
+
+    # Timestamp at the beginning of the log lines (like Mon Oct  4 10:02:45 2021) and its format
+    LOG_TIMESTAMP_REGEX = re.compile(r'^(\w{3} \w{3} +\d{1,2} \d{2}:\d{2}:\d{2} \d{4}) ')
+    LOG_TIMESTAMP_FORMAT = '%a %b %d %H:%M:%S %Y'
+
+    # Name of the parsed SNMPD conf model in the metadata of the FileCache
+    __SNMPD_CONF_METADATA_NAME = 'snmpd_conf'
+
+    # Parsed SNMPD conf models of the process by device, with the modification time and size of their files
+    __snmpd_conf_cache: dict[str, tuple] = {}
+    __snmpd_conf_cache_lock = threading.Lock()
+
+    # Characters with a special meaning in the extended regular expressions of grep (escaped in the literals)
+    __GREP_SPECIAL_CHARACTERS_REGEX = re.compile(r'([.\[\]\\^$*+?(){}|])')
+
 
     def __init__(
         self, 
-        ssh_agent: ESASSHAgent
+        ssh_agent: ESASSHAgent,
+        local_directory: str = '',
+        search_logs_remotely: bool = False,
+        file_cache: FileCache = None,
+        fetch_log_incrementally: bool = False,
+        retrieve_in_memory: bool = False,
+        transfer_compression: str = None,
+        compression_threshold: int = 1048576,
+        log_timestamp_parser = None
     ):
         """
         @param {ESASSHAgent} ssh_agent SSH agent manager.
+        @param {str} local_directory Local directory where the retrieved files are stored (current directory by default).
+        @param {bool} search_logs_remotely Flag to indicate that the log file is searched on the ESA instead of being retrieved.
+        @param {FileCache} file_cache Cache of the retrieved files (no cache by default).
+        @param {bool} fetch_log_incrementally Flag to indicate that only the new bytes of the log file are fetched (it requires $file_cache).
+        @param {bool} retrieve_in_memory Flag to indicate that the files are retrieved in memory instead of the local directory.
+        @param {str} transfer_compression The compression of the transfers (gzip, ssh or auto), uncompressed by default.
+        @param {int} compression_threshold The minimum size of the files compressed in the automatic mode (1MB by default).
+        @param {Callable} log_timestamp_parser The function that returns the timestamp (datetime) of a log line, or None (the ESA format by default).
         """
         self.ssh_agent: ESASSHAgent = ssh_agent
+        self.local_directory: str = local_directory
+        self.search_logs_remotely: bool = search_logs_remotely
+        self.file_cache: FileCache = file_cache
+        self.fetch_log_incrementally: bool = fetch_log_incrementally
+        self.retrieve_in_memory: bool = retrieve_in_memory
+        self.transfer_compression: str = transfer_compression
+        self.compression_threshold: int = compression_threshold
+        self.log_timestamp_parser = log_timestamp_parser if log_timestamp_parser else self.parse_log_timestamp
+        # Files retrieved in memory, by file name
+        self.in_memory_files: dict[str, IO] = {}
+        # We create the local directory if it does not exist
+        if self.local_directory and not self.retrieve_in_memory:
+            os.makedirs(self.local_directory, exist_ok = True)
         # Cached relevant values (to void innecessary file reopening)
         self.serial_number = None
         self.version_number = None
+        self.snmpd_conf: ESASNMPDConf = None
 
     def get_essential_files(self):
         """
@@ -48,10 +150,17 @@ class ESAFileManager:
         """
         # We remove the residual files from previous executions, if any.
         self.remove_essential_files()
+        # We retrieve both files concurrently, unless the log file depends on the serial number (the namespace of the cache)
+        if not self.search_logs_remotely and self.file_cache == None and not self.retrieve_in_memory:
+            self.get_files([self.ESA_SNMPD_CONF_PATH, self.ESA_LOG_FILE_PATH])
+            self.get_esa_serial_number()
+            return
         # We retrieve the files
         self.get_snmpd_file()
         self.get_esa_serial_number()
-        self.get_log_file()
+        # The log file is only retrieved if required, when the logs are searched remotely
+        if not self.search_logs_remotely:
+            self.get_log_file()
 
     def remove_essential_files(self):
         """
@@ -59,23 +168,116 @@ class ESAFileManager:
         This method should be called at the end of the use case, even if - for safety reasons - it is
         automatically called in the get_essential_files method.
         """
-        self.safely_remove_file(self.ESA_SNMPD_CONF_FILE_NAME)
-        self.safely_remove_file(self.ESA_LOG_FILE_NAME)
+        self.safely_remove_file(self.get_file_source(self.ESA_SNMPD_CONF_FILE_NAME))
+        self.safely_remove_file(self.get_file_source(self.ESA_LOG_FILE_NAME))
 
     def get_snmpd_file(self):
         """
         Retrieves the SNMPD file from ESA. This file is useful to get the serial and version number of the
         ESA, which are important values for the remediation process.
         """
-        # We request the file
-        self.ssh_agent.get_file_with_scp(self.ESA_SNMPD_CONF_PATH)
+        # We request the file (and discard the model of the previous one)
+        self.snmpd_conf = None
+        self.retrieve_file(self.ESA_SNMPD_CONF_PATH)
 
     def get_log_file(self):
         """
         Retrieves the log file from ESA. This file is useful for the remediation process, as we'll need to
         look for a warning message indicating a problem with the tenant_id (Invalid Key).
         """
-        self.ssh_agent.get_file_with_scp(self.ESA_LOG_FILE_PATH)
+        if self.fetch_log_incrementally:
+            self.retrieve_file_incrementally(self.ESA_LOG_FILE_PATH)
+        else:
+            self.retrieve_file(self.ESA_LOG_FILE_PATH)
+
+    def retrieve_file(self, remote_path: str) -> Union[str, IO]:
+        """
+        @param {str} remote_path The path of the file in the ESA.
+
+        Retrieves a file from the ESA to the local directory (or in memory), from the cache if the cached copy is current.
+
+        @returns {str|IO} The local path of the file (or the in-memory file).
+        """
+        if self.file_cache == None:
+            return self.__transfer_file(remote_path)
+        namespace = self.__get_cache_namespace()
+        if self.file_cache.is_fresh(namespace, remote_path):
+            Logger.debug(f'Using the cached copy of { remote_path }')
+            return self.__get_cached_copy(namespace, remote_path)
+        remote_size, remote_mtime, remote_inode = self.__get_remote_file_stat(remote_path)
+        if remote_size != None and self.file_cache.is_current(namespace, remote_path, remote_size, remote_mtime):
+            Logger.debug(f'The cached copy of { remote_path } is current')
+            return self.__get_cached_copy(namespace, remote_path)
+        file_source = self.__transfer_file(remote_path, remote_size)
+        self.file_cache.put(namespace, remote_path, file_source, remote_size, remote_mtime, remote_inode)
+        return file_source
+
+    def get_files(
+        self,
+        remote_paths: list[str],
+        max_concurrency: int = SSHStrategy.MAX_CHANNELS
+    ) -> list[str]:
+        """
+        @param {list} remote_paths The paths of the files in the ESA.
+        @param {int} max_concurrency The maximum number of files transferred at the same time.
+
+        Retrieves several files from the ESA to the local directory concurrently, over separate channels of the
+        same connection. If there is a cache, the files are validated with concurrent stat commands and only the
+        files that changed are transferred.
+
+        In memory mode, or if the transfers are compressed, the files are retrieved one by one.
+
+        @returns {list} The local paths of the files (or the in-memory files), in the same order.
+        """
+        if self.retrieve_in_memory or self.transfer_compression:
+            return [self.retrieve_file(remote_path) for remote_path in remote_paths]
+        local_paths = [self.get_local_path(os.path.basename(remote_path)) for remote_path in remote_paths]
+        if self.file_cache == None:
+            self.ssh_agent.get_files_with_scp(remote_paths, self.local_directory, max_concurrency)
+            return local_paths
+        namespace = self.__get_cache_namespace()
+        stale_paths = [remote_path for remote_path in remote_paths if not self.file_cache.is_fresh(namespace, remote_path)]
+        remote_stats = dict(zip(stale_paths, self.__get_remote_file_stats(stale_paths, max_concurrency)))
+        paths_to_transfer = [
+            remote_path for remote_path, (remote_size, remote_mtime, _) in remote_stats.items()
+            if remote_size == None or not self.file_cache.is_current(namespace, remote_path, remote_size, remote_mtime)
+        ]
+        self.ssh_agent.get_files_with_scp(paths_to_transfer, self.local_directory, max_concurrency)
+        for remote_path, local_path in zip(remote_paths, local_paths):
+            if remote_path in paths_to_transfer:
+                self.file_cache.put(namespace, remote_path, local_path, *remote_stats[remote_path])
+            else:
+                self.file_cache.get(namespace, remote_path, local_path)
+        return local_paths
+
+    def retrieve_file_incrementally(self, remote_path: str) -> str:
+        """
+        @param {str} remote_path The path of an append-only file in the ESA (like the log file).
+
+        Retrieves a file from the ESA to the local directory, transferring only the bytes appended since the last
+        fetch (tail -c +N), which are appended to the cached copy. The whole file is retrieved the first time, after
+        a rotation, or if there is no cache to remember the last fetch.
+
+        @returns {str|IO} The local path of the file (or the in-memory file).
+        """
+        if self.file_cache == None:
+            return self.retrieve_file(remote_path)
+        namespace = self.__get_cache_namespace()
+        if self.file_cache.is_fresh(namespace, remote_path):
+            Logger.debug(f'Using the cached copy of { remote_path }')
+            return self.__get_cached_copy(namespace, remote_path)
+        remote_size, remote_mtime, remote_inode = self.__get_remote_file_stat(remote_path)
+        entry = self.file_cache.get_entry(namespace, remote_path)
+        if remote_size != None and self.__is_appended_file(entry, remote_size, remote_inode):
+            if self.file_cache.is_current(namespace, remote_path, remote_size, remote_mtime):
+                Logger.debug(f'The cached copy of { remote_path } is current')
+                return self.__get_cached_copy(namespace, remote_path)
+            if self.__fetch_appended_bytes(namespace, remote_path, entry['remote_size'], remote_mtime):
+                return self.__get_cached_copy(namespace, remote_path)
+        Logger.debug(f'Retrieving the whole { remote_path }')
+        file_source = self.__transfer_file(remote_path, remote_size)
+        self.file_cache.put(namespace, remote_path, file_source, remote_size, remote_mtime, remote_inode)
+        return file_source
 
     def upload_file(
         self, 
@@ -97,7 +299,7 @@ class ESAFileManager:
         key_value_regex: str
     ) -> str:
         """
-        @param {str} file_name The file in which we will look for the values.
+        @param {str|IO} file_name The file in which we will look for the values (a path or an in-memory file).
         @param {str} key_value_regex The regular expression to perform the search.
 
         Gets a value from a file, in a key-value structure via a regular expression and by using the 
@@ -115,7 +317,7 @@ class ESAFileManager:
         string_to_search: str
     ) -> bool:
         """
-        @param {str} file_name The file in which we will look for the string occurrence.
+        @param {str|IO} file_name The file in which we will look for the string occurrence (a path or an in-memory file).
         @param {str} string_to_search The string we are looking for in the file.
 
         Determines if the given string is present in the file. Useful to find warning messages
@@ -126,20 +328,61 @@ class ESAFileManager:
         file_manager = FileManager(file_name)
         return file_manager.is_string_present_in_the_file(string_to_search)
 
+    def search_patterns_in_file(
+        self,
+        file_name: str,
+        regexes: list[str] = None,
+        literals: list[str] = None,
+        mode: str = FileManager.SEARCH_FIRST
+    ) -> dict:
+        """
+        @param {str|IO} file_name The file in which we will look for the patterns (a path or an in-memory file).
+        @param {list} regexes The regular expressions to search.
+        @param {list} literals The literal strings to search.
+        @param {str} mode The result for every pattern: the first match (first), the number of matching lines (count) or all the matches (all).
+
+        Searches several patterns reading the file only once, via the FileManager util. The value of a match is its
+        first group (or the whole match if the regex has no groups).
+
+        @returns {dict} The result by pattern.
+        """
+        return FileManager(file_name).search_patterns(regexes, literals, mode)
+
     # Mehtods for specific files
     def get_value_from_snmpd(self, regex: str) -> str:
         """
         @param {str} regex The regular expression to search the value in SNMPD.
 
         Searches a value in the SNMPD conf file with a regular expression (ideally using the regex
-        pattern (.*?) after the known key literal).
+        pattern (.*?) after the known key literal). The lines of the parsed model are searched, so the file
+        is not reopened.
 
         @returns Desired value in file.
         """
-        # We create a new file manager for the snmpd.conf file
-        file_manager = FileManager(ESAFileManager.ESA_SNMPD_CONF_FILE_NAME)
-        # We get the desired value using the regular expression
-        return file_manager.search_value_with_regex(regex)
+        return self.get_snmpd_conf().search_value(regex)
+
+    def get_snmpd_conf(self) -> ESASNMPDConf:
+        """
+        Gets the parsed model of the SNMPD conf file. It is parsed once per device and modification time of the
+        file: the model is reused by every ESAFileManager of the process, and it is stored with the cached file
+        (if there is a FileCache), so it is only parsed again once the file changes.
+
+        @returns {ESASNMPDConf} The parsed model.
+        """
+        if self.snmpd_conf != None:
+            return self.snmpd_conf
+        device = f'{ self.ssh_agent.esa_ip }:{ self.ssh_agent.esa_ssh_port }'
+        file_version = self.__get_snmpd_conf_file_version()
+        with ESAFileManager.__snmpd_conf_cache_lock:
+            cached_version, snmpd_conf = ESAFileManager.__snmpd_conf_cache.get(device, (None, None))
+        if file_version == None or cached_version != file_version:
+            snmpd_conf = self.__load_snmpd_conf()
+            # We only keep the model of the current file of every device
+            if file_version != None:
+                with ESAFileManager.__snmpd_conf_cache_lock:
+                    ESAFileManager.__snmpd_conf_cache[device] = (file_version, snmpd_conf)
+        self.snmpd_conf = snmpd_conf
+        return snmpd_conf
 
     def is_warning_present_in_the_logs(self, warning: str) -> bool:
         """
@@ -151,41 +394,577 @@ class ESAFileManager:
 
         @returns {bool}
         """
-        return self.is_string_present_in_file(self.ESA_LOG_FILE_NAME, warning)
+        if self.search_logs_remotely:
+            return self.get_first_match_in_remote_file(self.ESA_LOG_FILE_PATH, warning) != None
+        return self.is_string_present_in_file(self.get_file_source(self.ESA_LOG_FILE_NAME), warning)
+
+    def get_warnings_present_in_the_logs(self, warnings: list[str]) -> dict[str, bool]:
+        """
+        @param {list} warnings The warning messages (or patterns) we are looking for in the logfile.
+
+        Determines which warning messages - or patterns - are present in the logfile, reading it only once.
+
+        @returns {dict} The presence of every warning.
+        """
+        return {
+            warning: value != None
+            for warning, value in self.search_patterns_in_the_logs(regexes = warnings).items()
+        }
+
+    def search_patterns_in_the_logs(
+        self,
+        regexes: list[str] = None,
+        literals: list[str] = None,
+        mode: str = FileManager.SEARCH_FIRST
+    ) -> dict:
+        """
+        @param {list} regexes The regular expressions to search.
+        @param {list} literals The literal strings to search.
+        @param {str} mode The result for every pattern: the first match (first), the number of matching lines (count) or all the matches (all).
+
+        Searches several patterns in the logfile with a single read. If the logs are searched remotely, a single grep
+        with all the patterns transfers the lines where any of them matches, which are then searched locally.
+
+        @returns {dict} The result by pattern.
+        """
+        if not self.search_logs_remotely:
+            return self.search_patterns_in_file(self.get_file_source(self.ESA_LOG_FILE_NAME), regexes, literals, mode)
+        grep_regexes = (regexes if regexes else []) + [
+            self.__GREP_SPECIAL_CHARACTERS_REGEX.sub(r'\\\1', literal) for literal in (literals if literals else [])
+        ]
+        lines = self.__execute_remote_grep(['-E'], self.ESA_LOG_FILE_PATH, *grep_regexes) if grep_regexes else []
+        if lines == None:
+            return self.search_patterns_in_file(self.__get_local_copy(self.ESA_LOG_FILE_PATH), regexes, literals, mode)
+        matching_lines = BytesIO(''.join(f'{ line }\n' for line in lines).encode('utf-8'))
+        return FileManager(matching_lines, self.ESA_LOG_FILE_NAME).search_patterns(regexes, literals, mode)
+
+    def get_last_matches_in_the_logs(
+        self,
+        regex: str,
+        max_count: int = 1,
+        max_lines: int = None,
+        max_seconds: float = None
+    ) -> list[str]:
+        """
+        @param {str} regex The regular expression to search.
+        @param {int} max_count The maximum number of matching lines to return (1 by default, the search stops at the newest hit).
+        @param {int} max_lines The maximum number of lines to read from the end of the logfile (all of them by default).
+        @param {float} max_seconds The maximum number of seconds of the search (unlimited by default).
+
+        Searches the logfile newest-first, reading it backwards from its end via the FileManager util. If the logs are
+        searched remotely (and there is no line budget), grep only transfers the matching lines, and the last ones are
+        taken.
+
+        @returns {list} The matching lines, from the newest to the oldest.
+        """
+        if self.search_logs_remotely and max_lines == None:
+            lines = self.search_in_remote_file(self.ESA_LOG_FILE_PATH, regex)
+            return lines[::-1][:max_count] if max_count != None else lines[::-1]
+        file_source = (
+            self.__get_local_copy(self.ESA_LOG_FILE_PATH) if self.search_logs_remotely
+            else self.get_file_source(self.ESA_LOG_FILE_NAME)
+        )
+        return FileManager(file_source, self.ESA_LOG_FILE_NAME).search_lines_in_reverse(regex, max_count, max_lines, max_seconds)
+
+    def is_warning_recent_in_the_logs(
+        self,
+        warning: str,
+        max_lines: int = None,
+        max_seconds: float = None
+    ) -> bool:
+        """
+        @param {str} warning The warning message we are looking for in the logfile.
+        @param {int} max_lines The number of most recent lines of the logfile where the warning is searched (all of them by default).
+        @param {float} max_seconds The maximum number of seconds of the search (unlimited by default).
+
+        Determines if a warning message - or pattern - is present in the most recent lines of the logfile, which
+        are searched newest-first.
+
+        @returns {bool}
+        """
+        return len(self.get_last_matches_in_the_logs(warning, 1, max_lines, max_seconds)) > 0
+
+    def search_in_the_logs_between(
+        self,
+        regex: str,
+        start: datetime = None,
+        end: datetime = None,
+        max_count: int = None
+    ) -> list[str]:
+        """
+        @param {str} regex The regular expression to search.
+        @param {datetime} start The first timestamp of the window (the beginning of the logfile by default).
+        @param {datetime} end The last timestamp of the window (the end of the logfile by default).
+        @param {int} max_count The maximum number of matching lines to return (all of them by default).
+
+        Searches the lines of the logfile within a time window, via the FileManager util: the beginning of the window
+        is found with a binary search over the byte offsets, so only the lines of the window are read. The logfile is
+        retrieved if the logs are searched remotely (the window cannot be found with grep).
+
+        @returns {list} The matching lines, in chronological order.
+        """
+        file_source = (
+            self.__get_local_copy(self.ESA_LOG_FILE_PATH) if self.search_logs_remotely
+            else self.get_file_source(self.ESA_LOG_FILE_NAME)
+        )
+        return FileManager(file_source, self.ESA_LOG_FILE_NAME).search_lines_in_time_window(
+            regex, self.log_timestamp_parser, start, end, max_count
+        )
+
+    def is_warning_present_in_the_logs_between(
+        self,
+        warning: str,
+        start: datetime = None,
+        end: datetime = None
+    ) -> bool:
+        """
+        @param {str} warning The warning message we are looking for in the logfile.
+        @param {datetime} start The first timestamp of the window (the beginning of the logfile by default).
+        @param {datetime} end The last timestamp of the window (the end of the logfile by default).
+
+        Determines if a warning message - or pattern - is present in the logfile within a time window (like the
+        last 24 hours).
+
+        @returns {bool}
+        """
+        return len(self.search_in_the_logs_between(warning, start, end, max_count = 1)) > 0
+
+    @staticmethod
+    def parse_log_timestamp(line: str) -> datetime:
+        """
+        @param {str} line The log line.
+
+        Parses the timestamp at the beginning of an ESA log line (like Mon Oct  4 10:02:45 2021).
+
+        @returns {datetime} The timestamp (None if the line has no timestamp).
+        """
+        match = ESAFileManager.LOG_TIMESTAMP_REGEX.match(line)
+        if match == None:
+            return None
+        try:
+            return datetime.strptime(match.group(1), ESAFileManager.LOG_TIMESTAMP_FORMAT)
+        except ValueError:
+            return None
+
+    # Remote search methods
+
+    def search_in_remote_file(
+        self,
+        remote_path: str,
+        regex: str,
+        max_count: int = None
+    ) -> list[str]:
+        """
+        @param {str} remote_path The path of the file in the ESA.
+        @param {str} regex The regular expression to search.
+        @param {int} max_count The maximum number of matching lines to return (all of them by default).
+
+        Searches a regular expression in a remote file with grep on the ESA, so only the matching lines are transferred.
+        If the search cannot be done remotely (missing tools or a regex that grep does not support), the file is 
+        retrieved and searched locally.
+
+        @returns {list} The matching lines.
+        """
+        options = ['-E'] + (['-m', str(max_count)] if max_count != None else [])
+        lines = self.__execute_remote_grep(options, remote_path, regex)
+        if lines != None:
+            return lines
+        return self.__search_in_local_copy(remote_path, regex, max_count)
+
+    def count_in_remote_file(
+        self,
+        remote_path: str,
+        regex: str
+    ) -> int:
+        """
+        @param {str} remote_path The path of the file in the ESA.
+        @param {str} regex The regular expression to search.
+
+        Counts the lines of a remote file that match a regular expression (remotely, with the local search as fallback).
+
+        @returns {int} The number of matching lines.
+        """
+        lines = self.__execute_remote_grep(['-E', '-c'], remote_path, regex)
+        if lines != None:
+            return int(lines[0]) if lines else 0
+        return len(self.__search_in_local_copy(remote_path, regex))
+
+    def get_first_match_in_remote_file(
+        self,
+        remote_path: str,
+        regex: str
+    ) -> str:
+        """
+        @param {str} remote_path The path of the file in the ESA.
+        @param {str} regex The regular expression to search.
+
+        Gets the first line of a remote file that matches a regular expression (remotely, with the local search as fallback).
+
+        @returns {str} The first matching line (None if there is no match).
+        """
+        lines = self.search_in_remote_file(remote_path, regex, max_count = 1)
+        return lines[0] if lines else None
 
     # Methods to get relevant values for ESA
 
     def get_esa_serial_number(self) -> str:
         """
-        Retrieves the serial number from the SNMPD file the first time, then the value in the local
-        state will be returned to avoid reopening the file.
+        Retrieves the serial number from the parsed SNMPD file the first time, then the value in the local
+        state will be returned.
 
         @returns ESA's serial number.
         """
         if self.serial_number == None:
-            self.serial_number = self.get_value_from_snmpd(r'Serial #: (.*)$')
+            self.serial_number = self.get_snmpd_conf().serial_number
         return self.serial_number
 
     def get_esa_version_number(self) -> str:
         """
-        Retrieves the version number from the SNMPD file the first time, then the value in local
-        state will be returned to avoid reopening the file.
+        Retrieves the version number from the parsed SNMPD file the first time, then the value in local
+        state will be returned.
 
         @returns ESA's AsyncOS version number.
         """
         if self.version_number == None:
-            self.version_number = self.get_value_from_snmpd(r'AsyncOS Version: (.*?),')
+            self.version_number = self.get_snmpd_conf().version_number
         return self.version_number
     
     # General file utils
 
+    def get_local_path(self, file_name: str) -> str:
+        """
+        @param {str} file_name The name of the retrieved file.
+
+        @returns {str} The path of the file in the local directory.
+        """
+        return os.path.join(self.local_directory, file_name)
+
+    def get_file_source(self, file_name: str) -> Union[str, IO]:
+        """
+        @param {str} file_name The name of the retrieved file.
+
+        @returns {str|IO} The in-memory file with the name, if it was retrieved in memory (its local path otherwise).
+        """
+        file_object = self.in_memory_files.get(file_name)
+        if file_object != None and not file_object.closed:
+            return file_object
+        return self.get_local_path(file_name)
+
     def safely_remove_file(self, path_to_file: str):
         """
-        @param {str} path_to_file The path to the file we want to delete.
+        @param {str|IO} path_to_file The path to the file we want to delete (or the in-memory file to release).
 
         Removes a file via the FileManager, which performs a validation to assure that it'll only
         attempt to delete the file if it actually exists in the provided path.
         """
         FileManager(path_to_file).delete_file()
 
+    # Internal methods
+
+    def __execute_remote_grep(
+        self,
+        options: list[str],
+        remote_path: str,
+        *regexes: str
+    ) -> list[str]:
+        """
+        @param {list} options The grep options.
+        @param {str} remote_path The path of the file in the ESA.
+        @param {str} regexes The regular expressions to search (the lines matching any of them are printed).
+
+        Executes grep on the ESA, streaming its output. The exit status tells the result: 0 (matches), 1 (no matches)
+        or an error (like a missing grep or file). The file is always searched as text (-a, supported by the BSD and
+        GNU greps), otherwise a log with a non-text byte would only print that the binary file matches.
+
+        @returns {list} The output lines (None if the search could not be done remotely).
+        """
+        for regex in regexes:
+            if self.__PYTHON_ONLY_REGEX.search(regex):
+                Logger.debug(f'The regex [{ regex }] is not supported by grep, searching locally.')
+                return None
+        patterns = [argument for regex in regexes for argument in ('-e', shlex.quote(regex))]
+        command = ' '.join(['grep', '-a'] + options + patterns + [shlex.quote(remote_path)])
+        try:
+            with self.ssh_agent.stream_command(command, idempotent = True) as stream:
+                lines = [line for line in stream if line]
+                exit_status = stream.get_exit_status()
+        except Exception as exception:
+            Logger.debug(f'Remote search failed ({ exception }), searching locally.')
+            return None
+        if exit_status not in (0, 1):
+            Logger.debug(f'Remote search failed with exit status { exit_status }, searching locally.')
+            return None
+        # grep -c prints 0 (with exit status 1) when there are no matches
+        return lines if exit_status == 0 or '-c' in options else []
+
+    def __search_in_local_copy(
+        self,
+        remote_path: str,
+        regex: str,
+        max_count: int = None
+    ) -> list[str]:
+        """
+        @param {str} remote_path The path of the file in the ESA.
+        @param {str} regex The regular expression to search.
+        @param {int} max_count The maximum number of matching lines to return (all of them by default).
+
+        Searches a regular expression in the local copy of a remote file, retrieving it if it was not retrieved yet.
+
+        @returns {list} The matching lines.
+        """
+        expression = re.compile(regex)
+        lines = []
+        file_manager = FileManager(self.__get_local_copy(remote_path), os.path.basename(remote_path))
+        try:
+            for line in file_manager.open():
+                if expression.search(line):
+                    lines.append(line.rstrip('\n'))
+                    if max_count != None and len(lines) >= max_count:
+                        break
+        finally:
+            file_manager.close()
+        return lines
+
+    def __get_local_copy(self, remote_path: str) -> Union[str, IO]:
+        """Returns the local copy of a remote file (or its in-memory file), retrieving it if it was not retrieved yet."""
+        file_source = self.get_file_source(os.path.basename(remote_path))
+        if isinstance(file_source, str) and not os.path.exists(file_source):
+            file_source = self.retrieve_file(remote_path)
+        return file_source
+
+    def __transfer_file(
+        self,
+        remote_path: str,
+        remote_size: int = None
+    ) -> Union[str, IO]:
+        """
+        @param {str} remote_path The path of the file in the ESA.
+        @param {int} remote_size The size of the file, if it is known (to choose the compression).
 
+        Transfers a file from the ESA to the local directory, or to a spooled temporary file in memory mode.
+
+        @returns {str|IO} The local path of the file (or the in-memory file).
+        """
+        compression = self.__get_transfer_compression(remote_path, remote_size)
+        if compression != None:
+            try:
+                return self.__transfer_compressed_file(remote_path, compression)
+            except Exception as exception:
+                Logger.debug(f'Compressed transfer failed ({ exception }), transferring { remote_path } uncompressed.')
+        if self.retrieve_in_memory:
+            return self.__keep_in_memory(remote_path, self.ssh_agent.get_file_in_memory(remote_path, self.MAX_IN_MEMORY_SIZE))
+        self.ssh_agent.get_file_with_scp(remote_path, self.local_directory)
+        return self.get_local_path(os.path.basename(remote_path))
+
+    def __transfer_compressed_file(
+        self,
+        remote_path: str,
+        compression: str
+    ) -> Union[str, IO]:
+        """Transfers a compressed file, the files retrieved in memory are always compressed with gzip."""
+        if self.retrieve_in_memory:
+            return self.__keep_in_memory(
+                remote_path, self.ssh_agent.get_file_in_memory(remote_path, self.MAX_IN_MEMORY_SIZE, compressed = True)
+            )
+        if compression == self.TRANSFER_COMPRESSION_SSH:
+            self.ssh_agent.get_file_over_compressed_connection(remote_path, self.local_directory)
+        else:
+            self.ssh_agent.get_file_compressed(remote_path, self.local_directory)
+        return self.get_local_path(os.path.basename(remote_path))
+
+    def __get_transfer_compression(
+        self,
+        remote_path: str,
+        remote_size: int
+    ) -> str:
+        """Returns the compression of a transfer (None if uncompressed), the automatic mode only compresses the big files."""
+        if self.transfer_compression != self.TRANSFER_COMPRESSION_AUTO:
+            return self.transfer_compression
+        if remote_size == None:
+            remote_size, _, _ = self.__get_remote_file_stat(remote_path)
+        if remote_size == None or remote_size < self.compression_threshold:
+            return None
+        return self.TRANSFER_COMPRESSION_GZIP
+
+    def __get_cached_copy(
+        self,
+        namespace: str,
+        remote_path: str
+    ) -> Union[str, IO]:
+        """Copies the cached copy of a file to the local directory, or to a spooled temporary file in memory mode."""
+        if self.retrieve_in_memory:
+            file_object = tempfile.SpooledTemporaryFile(max_size = self.MAX_IN_MEMORY_SIZE)
+            return self.__keep_in_memory(remote_path, self.file_cache.get(namespace, remote_path, file_object))
+        return self.file_cache.get(namespace, remote_path, self.get_local_path(os.path.basename(remote_path)))
+
+    def __keep_in_memory(
+        self,
+        remote_path: str,
+        file_object: IO
+    ) -> IO:
+        """Registers an in-memory file by its name, releasing the previous one with the same name."""
+        file_name = os.path.basename(remote_path)
+        previous_file_object = self.in_memory_files.get(file_name)
+        if previous_file_object != None and previous_file_object is not file_object:
+            previous_file_object.close()
+        self.in_memory_files[file_name] = file_object
+        return file_object
+
+    def __load_snmpd_conf(self) -> ESASNMPDConf:
+        """Loads the SNMPD conf model stored with the cached file, or parses the file (storing the model in the cache)."""
+        namespace, entry = self.__get_cache_entry(self.ESA_SNMPD_CONF_PATH)
+        if entry != None:
+            data = self.file_cache.get_metadata(namespace, self.ESA_SNMPD_CONF_PATH, self.__SNMPD_CONF_METADATA_NAME)
+            if data != None:
+                Logger.debug(f'Using the parsed { self.ESA_SNMPD_CONF_FILE_NAME } of the cache')
+                return ESASNMPDConf.from_dict(data)
+        file_manager = FileManager(self.get_file_source(self.ESA_SNMPD_CONF_FILE_NAME))
+        snmpd_conf = ESASNMPDConf.parse(file_manager.read_file_content())
+        if entry != None:
+            self.file_cache.set_metadata(
+                namespace, self.ESA_SNMPD_CONF_PATH, self.__SNMPD_CONF_METADATA_NAME, snmpd_conf.to_dict()
+            )
+        return snmpd_conf
+
+    def __get_snmpd_conf_file_version(self) -> tuple:
+        """
+        Returns the version of the SNMPD conf file in the cache of the process: its modification time and size (the
+        remote ones if it is cached, the local ones otherwise). The in-memory files without a FileCache have no
+        modification time, so their models are not cached (None).
+        """
+        _, entry = self.__get_cache_entry(self.ESA_SNMPD_CONF_PATH)
+        if entry != None and entry.get('remote_mtime') != None:
+            return entry['remote_mtime'], entry['remote_size']
+        file_source = self.get_file_source(self.ESA_SNMPD_CONF_FILE_NAME)
+        if not isinstance(file_source, str) or not os.path.exists(file_source):
+            return None
+        file_stat = os.stat(file_source)
+        return file_stat.st_mtime, file_stat.st_size
+
+    def __get_cache_entry(self, remote_path: str) -> tuple:
+        """
+        Returns the namespace and the entry of a file in the FileCache ((None, None) if it is not cached). The
+        files retrieved before the serial number was known are cached by host.
+        """
+        if self.file_cache == None:
+            return None, None
+        host_namespace = f'{ self.ssh_agent.esa_ip }:{ self.ssh_agent.esa_ssh_port }'
+        for namespace in dict.fromkeys([self.__get_cache_namespace(), host_namespace]):
+            entry = self.file_cache.get_entry(namespace, remote_path)
+            if entry != None:
+                return namespace, entry
+        return None, None
+
+    def __get_cache_namespace(self) -> str:
+        """Returns the namespace of the files in the cache, the serial number (or the host until it is known)."""
+        if self.serial_number:
+            return self.serial_number
+        return f'{ self.ssh_agent.esa_ip }:{ self.ssh_agent.esa_ssh_port }'
+
+    def __get_remote_file_stat(self, remote_path: str) -> tuple:
+        """
+        @param {str} remote_path The path of the file in the ESA.
+
+        Gets the size, modification time and inode of a remote file with a single command.
+
+        @returns {tuple} The size, modification time and inode (None, None, None if they could not be retrieved).
+        """
+        try:
+            return self.__parse_remote_file_stat(self.ssh_agent.execute_command(self.__get_remote_stat_command(remote_path), idempotent = True))
+        except Exception:
+            return None, None, None
+
+    def __get_remote_file_stats(
+        self,
+        remote_paths: list[str],
+        max_concurrency: int
+    ) -> list[tuple]:
+        """
+        @param {list} remote_paths The paths of the files in the ESA.
+        @param {int} max_concurrency The maximum number of commands executed at the same time.
+
+        Gets the size, modification time and inode of several remote files with concurrent commands.
+
+        @returns {list} The (size, modification time, inode) of every file ((None, None, None) if they could not be retrieved).
+        """
+        if not remote_paths:
+            return []
+        try:
+            outputs = self.ssh_agent.execute_commands(
+                [self.__get_remote_stat_command(remote_path) for remote_path in remote_paths], max_concurrency, idempotent = True
+            )
+        except Exception:
+            return [(None, None, None)] * len(remote_paths)
+        stats = []
+        for output in outputs:
+            try:
+                stats.append(self.__parse_remote_file_stat(output))
+            except Exception:
+                stats.append((None, None, None))
+        return stats
+
+    def __get_remote_stat_command(self, remote_path: str) -> str:
+        """Returns the remote command to get the size, modification time and inode of a file."""
+        return self.__REMOTE_STAT_COMMAND % { 'path': shlex.quote(remote_path) }
+
+    @staticmethod
+    def __parse_remote_file_stat(output: str) -> tuple:
+        """Parses the output of the remote stat command (the last line, in case the shell echoes something before)."""
+        size, mtime, inode = output.strip().splitlines()[-1].split()
+        return int(size), float(mtime), int(inode)
+
+    @staticmethod
+    def __is_appended_file(
+        entry: dict,
+        remote_size: int,
+        remote_inode: int
+    ) -> bool:
+        """Determines if a remote file is still the cached one (same inode, not smaller), so it can be fetched incrementally."""
+        return (
+            entry != None and entry.get('remote_size') != None and entry.get('remote_inode') != None
+            and entry['remote_inode'] == remote_inode and remote_size >= entry['remote_size']
+        )
+
+    def __fetch_appended_bytes(
+        self,
+        namespace: str,
+        remote_path: str,
+        offset: int,
+        remote_mtime: float
+    ) -> bool:
+        """
+        @param {str} namespace The namespace of the file in the cache.
+        @param {str} remote_path The path of the file in the ESA.
+        @param {int} offset The remote size of the cached copy.
+        @param {float} remote_mtime The current modification time of the remote file.
+
+        Streams the remote file from a few bytes before $offset and appends the new bytes to the cached copy. The bytes
+        before $offset must match the end of the cached copy, otherwise the file was rotated (or rewritten).
+
+        @returns {bool} True if the cached copy was updated, False if the whole file must be retrieved.
+        """
+        check_size = min(offset, self.__ROTATION_CHECK_SIZE)
+        command = f'tail -c +{ offset - check_size + 1 } { shlex.quote(remote_path) }'
+        try:
+            with self.ssh_agent.stream_command(command, idempotent = True) as stream:
+                chunks = stream.iter_chunks()
+                head = b''
+                for chunk in chunks:
+                    head += chunk
+                    if len(head) >= check_size:
+                        break
+                if head[:check_size] != self.file_cache.read_tail(namespace, remote_path, check_size):
+                    Logger.debug(f'{ remote_path } was rotated')
+                    return False
+                appended_bytes = self.file_cache.append(
+                    namespace, remote_path, itertools.chain([head[check_size:]], chunks), remote_mtime
+                )
+                exit_status = stream.get_exit_status()
+        except Exception as exception:
+            Logger.debug(f'Incremental fetch failed ({ exception }), retrieving the whole file.')
+            return False
+        if exit_status != 0:
+            Logger.debug(f'Incremental fetch failed with exit status { exit_status }, retrieving the whole file.')
+            return False
+        Logger.debug(f'Fetched { appended_bytes } new bytes of { remote_path }')
+        return True
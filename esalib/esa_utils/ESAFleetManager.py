@@ -0,0 +1,344 @@
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+# ESA utils
+from .ESAManager import ESAManager
+from .ESAParameters import ESASSHParameters, ESAEmailParameters, ESADeviceParameters
+from .ESARemediationStatus import ESABaseRemediationStatusCodes
+# SSH
+from ..infrastructure.ssh_manager.SSHConnectionPool import SSHConnectionPool
+from ..infrastructure.ssh_manager.TransferRecord import TransferRecord
+# Utils
+from ..utils.logger.Logger import Logger
+from ..utils.files.FileCache import FileCache
+
+
+class ESAFleetDeviceStatus:
+    """Final status of a device in a fleet execution."""
+    SUCCESS     = 'SUCCESS'
+    FAILED      = 'FAILED'
+    TIMEOUT     = 'TIMEOUT'
+    CANCELLED   = 'CANCELLED'
+
+
+@dataclass
+class ESAFleetDeviceResult:
+    """Class to encapsulate the result of the use case execution for a single ESA."""
+    esa_ip: str
+    esa_ssh_port: int
+    status: str
+    status_codes: list[int] = field(default_factory = list)
+    messages: str = ''
+    error_message: str = None
+    duration: float = 0
+    reconnect_count: int = 0
+    downtime: float = 0
+    # Records of the file transfers (size, duration, throughput and retries), to spot the slow links of the fleet
+    transfer_records: list[TransferRecord] = field(default_factory = list)
+
+
+class ESAFleetManager:
+    """
+    @version 1.4.1
+
+    Class to execute the same remediation use case against a fleet of ESAs, from a single process.
+    Every device is handled by its own ESAManager (and therefore by its own SSH agent, file manager, state manager
+    and remediation status) on a bounded thread pool, and the SSH connections are borrowed from a pool shared by
+    the devices of the fleet. The retrieved files of every device are stored in its own directory.
+    The execution supports a timeout per device (the connection of a device that times out is closed to unblock it)
+    and two policies when a device fails: continue with the rest of the fleet (default), or fail fast, which cancels
+    the devices that did not start yet.
+    """
+
+    def __init__(
+        self,
+        inventory: list[ESASSHParameters],
+        supported_versions: list[str] = [],
+        custom_status_codes: ESABaseRemediationStatusCodes = None,
+        max_workers: int = 8,
+        device_timeout: float = None,
+        fail_fast: bool = False,
+        work_directory: str = 'esa_fleet',
+        esa_email_parameters: ESAEmailParameters = None,
+        file_cache: FileCache = None,
+        fetch_log_incrementally: bool = False,
+    ):
+        """
+        @param {list} inventory The SSH parameters of every ESA of the fleet.
+        @param {list} supported_versions The AsyncOS versions supported by the use case (all of them if empty).
+        @param {ESABaseRemediationStatusCodes} custom_status_codes Extended definition of status codes with custom messages and code numbers.
+        @param {int} max_workers The maximum number of devices handled concurrently.
+        @param {float} device_timeout The maximum number of seconds for the use case on a single device (no limit by default).
+        @param {bool} fail_fast Flag to indicate that the pending devices are cancelled once a device fails.
+        @param {str} work_directory Local directory where the directories with the files of every device are created.
+        @param {ESAEmailParameters} esa_email_parameters Email parameters applied to every device (no email by default).
+        @param {FileCache} file_cache Cache of the retrieved files, shared by the devices (no cache by default).
+        @param {bool} fetch_log_incrementally Flag to indicate that only the new bytes of the log files are fetched (it requires $file_cache).
+        """
+        self.inventory: list[ESASSHParameters] = inventory
+        self.supported_versions: list[str] = supported_versions
+        self.custom_status_codes = custom_status_codes
+        self.max_workers: int = max_workers
+        self.device_timeout: float = device_timeout
+        self.fail_fast: bool = fail_fast
+        self.work_directory: str = work_directory
+        self.esa_email_parameters: ESAEmailParameters = (
+            esa_email_parameters if esa_email_parameters else ESAEmailParameters(False, '', '')
+        )
+        self.file_cache: FileCache = file_cache
+        self.fetch_log_incrementally: bool = fetch_log_incrementally
+        self.connection_pool = SSHConnectionPool(max_size = max_workers)
+        # Internal state of the current execution (indexed by the position of the device in the inventory)
+        self.__esa_managers: dict[int, ESAManager] = {}
+        self.__start_times: dict[int, float] = {}
+        self.__aborted_devices: set[int] = set()
+        self.__devices_lock = threading.Lock()
+
+    def execute_use_case_remediation(
+        self,
+        remediation_use_case,
+        cleanup_function = None,
+        *args,
+        **kwargs
+    ) -> list[ESAFleetDeviceResult]:
+        """
+        @param {class} remediation_use_case The remediation use case class (without creating an instance of it, example: UseCase, instead of UseCase())
+        @param {function} cleanup_function Function to execute after the use case ends on every device (it receives the ESAManager of the device).
+
+        Entry point for the fleet execution. It runs the use case on every device of the inventory and waits for
+        the results, applying the timeout per device and the fail fast policy.
+
+        @returns {list} The result of every device, in the same order as the inventory.
+        """
+        self.__esa_managers = {}
+        self.__start_times = {}
+        self.__aborted_devices = set()
+        results: dict[int, ESAFleetDeviceResult] = {}
+        executor = ThreadPoolExecutor(max_workers = self.max_workers, thread_name_prefix = 'esa_fleet')
+        futures: dict[Future, int] = {
+            executor.submit(
+                self.__execute_device_use_case, index, remediation_use_case, cleanup_function, *args, **kwargs
+            ): index
+            for index in range(len(self.inventory))
+        }
+        pending = set(futures.keys())
+        try:
+            while pending:
+                done, pending = wait(pending, timeout = self.__get_wait_timeout(pending, futures), return_when = FIRST_COMPLETED)
+                for future in done:
+                    results[futures[future]] = self.__get_future_result(future, futures[future])
+                # The devices that reached their timeout are not waited anymore
+                for future in self.__get_timed_out_futures(pending, futures):
+                    index = futures[future]
+                    pending.discard(future)
+                    results[index] = self.__abort_device(index)
+                if self.fail_fast and self.__is_any_device_failed(results):
+                    for future in pending:
+                        future.cancel()
+        finally:
+            executor.shutdown(wait = False)
+        self.__log_results(results)
+        return [results[index] for index in range(len(self.inventory))]
+
+    @staticmethod
+    def get_results_table(results: list[ESAFleetDeviceResult]) -> str:
+        """
+        @param {list} results The results of the fleet execution.
+
+        @returns {str} The results formatted as a table (one row per device), suitable for logs and emails.
+        """
+        rows = [('ESA', 'STATUS', 'DURATION', 'DETAILS')]
+        for result in results:
+            rows.append((
+                f'{ result.esa_ip }:{ result.esa_ssh_port }',
+                result.status,
+                f'{ result.duration:.1f}s',
+                result.error_message if result.error_message else result.messages.replace('\n', ' '),
+            ))
+        widths = [max(len(row[column]) for row in rows) for column in range(3)]
+        return '\n'.join(
+            '  '.join(value.ljust(widths[column]) for column, value in enumerate(row[:3])) + '  ' + row[3]
+            for row in rows
+        )
+
+    # Internal methods
+
+    def __execute_device_use_case(
+        self,
+        index: int,
+        remediation_use_case,
+        cleanup_function,
+        *args,
+        **kwargs
+    ) -> ESAFleetDeviceResult:
+        """
+        @param {int} index The position of the device in the inventory.
+
+        Runs the use case against a single device with its own ESAManager, and closes its connection at the end.
+        """
+        ssh_parameters = self.inventory[index]
+        local_directory = os.path.join(self.work_directory, f'{ ssh_parameters.esa_ip }_{ ssh_parameters.esa_ssh_port }')
+        esa_manager = ESAManager(
+            esa_parameters = ESADeviceParameters(ssh_parameters, self.esa_email_parameters),
+            supported_versions = self.supported_versions,
+            custom_status_codes = self.custom_status_codes,
+            local_directory = local_directory,
+            connection_pool = self.connection_pool,
+            delete_log_file_after = False,
+            file_cache = self.file_cache,
+            fetch_log_incrementally = self.fetch_log_incrementally,
+        )
+        # The manager is registered before the timeout of the device starts counting, so it can always be cancelled
+        with self.__devices_lock:
+            self.__esa_managers[index] = esa_manager
+            if index in self.__aborted_devices:
+                esa_manager.cancel()
+            self.__start_times[index] = time.monotonic()
+        Logger.info(f'[{ ssh_parameters.esa_ip }] Starting use case.')
+        try:
+            esa_manager.execute_use_case_remediation(remediation_use_case, cleanup_function, *args, **kwargs)
+        finally:
+            self.__close_device_connection(esa_manager)
+            self.__remove_directory_if_empty(local_directory)
+        return self.__get_device_result(index, esa_manager)
+
+    def __get_device_result(
+        self,
+        index: int,
+        esa_manager: ESAManager
+    ) -> ESAFleetDeviceResult:
+        """
+        @param {int} index The position of the device in the inventory.
+        @param {ESAManager} esa_manager The ESAManager that executed the use case.
+
+        Builds the result of a device from its remediation status.
+        """
+        ssh_parameters = self.inventory[index]
+        remediation_status = esa_manager.esa_remediation_status
+        status_codes = list(remediation_status.messages.keys()) if remediation_status else []
+        is_failed = esa_manager.error_message != None or ESABaseRemediationStatusCodes.ERROR in status_codes
+        return ESAFleetDeviceResult(
+            esa_ip = ssh_parameters.esa_ip,
+            esa_ssh_port = ssh_parameters.esa_ssh_port,
+            status = ESAFleetDeviceStatus.FAILED if is_failed else ESAFleetDeviceStatus.SUCCESS,
+            status_codes = status_codes,
+            messages = remediation_status.get_remediation_messages() if remediation_status else '',
+            error_message = esa_manager.error_message,
+            duration = time.monotonic() - self.__start_times[index],
+            reconnect_count = remediation_status.reconnect_count if remediation_status else 0,
+            downtime = remediation_status.downtime if remediation_status else 0,
+            transfer_records = remediation_status.transfer_records if remediation_status else [],
+        )
+
+    def __get_future_result(
+        self,
+        future: Future,
+        index: int
+    ) -> ESAFleetDeviceResult:
+        """
+        @param {Future} future The future of the device execution.
+        @param {int} index The position of the device in the inventory.
+
+        Returns the result of a finished device execution (the cancelled and crashed executions are reported as well).
+        """
+        if future.cancelled():
+            return self.__get_status_result(index, ESAFleetDeviceStatus.CANCELLED)
+        exception = future.exception()
+        if exception != None:
+            return self.__get_status_result(index, ESAFleetDeviceStatus.FAILED, exception.__str__())
+        return future.result()
+
+    def __get_status_result(
+        self,
+        index: int,
+        status: str,
+        error_message: str = None
+    ) -> ESAFleetDeviceResult:
+        """Builds the result of a device that did not finish the use case."""
+        ssh_parameters = self.inventory[index]
+        start_time = self.__start_times.get(index)
+        return ESAFleetDeviceResult(
+            esa_ip = ssh_parameters.esa_ip,
+            esa_ssh_port = ssh_parameters.esa_ssh_port,
+            status = status,
+            error_message = error_message,
+            duration = time.monotonic() - start_time if start_time != None else 0,
+        )
+
+    def __get_wait_timeout(
+        self,
+        pending: set[Future],
+        futures: dict[Future, int]
+    ) -> float:
+        """Returns the time to wait until the next device timeout (None if there is no timeout per device)."""
+        if self.device_timeout == None:
+            return None
+        now = time.monotonic()
+        deadlines = [
+            self.__start_times[futures[future]] + self.device_timeout
+            for future in pending if futures[future] in self.__start_times
+        ]
+        return max(0, min(deadlines) - now) if deadlines else self.device_timeout
+
+    def __get_timed_out_futures(
+        self,
+        pending: set[Future],
+        futures: dict[Future, int]
+    ) -> list[Future]:
+        """Returns the running executions that reached the timeout per device."""
+        if self.device_timeout == None:
+            return []
+        now = time.monotonic()
+        return [
+            future for future in pending
+            if futures[future] in self.__start_times and now - self.__start_times[futures[future]] >= self.device_timeout
+        ]
+
+    def __abort_device(self, index: int) -> ESAFleetDeviceResult:
+        """
+        @param {int} index The position of the device in the inventory.
+
+        Cancels the use case of a device that reached the timeout, closing its connection so that the blocked SSH
+        operations fail and the worker is released. The connections started after the cancellation are closed too.
+        """
+        Logger.warning(f'[{ self.inventory[index].esa_ip }] Use case timed out after { self.device_timeout }s.')
+        with self.__devices_lock:
+            self.__aborted_devices.add(index)
+            esa_manager = self.__esa_managers.get(index)
+        if esa_manager != None:
+            esa_manager.cancel()
+        return self.__get_status_result(index, ESAFleetDeviceStatus.TIMEOUT, f'Timeout after { self.device_timeout }s')
+
+    @staticmethod
+    def __is_any_device_failed(results: dict[int, ESAFleetDeviceResult]) -> bool:
+        """Determines if any of the finished devices did not succeed."""
+        return any(
+            result.status in (ESAFleetDeviceStatus.FAILED, ESAFleetDeviceStatus.TIMEOUT)
+            for result in results.values()
+        )
+
+    @staticmethod
+    def __close_device_connection(esa_manager: ESAManager):
+        """Closes the SSH connection of a device, ignoring the errors of already closed connections."""
+        if esa_manager.esa_ssh_agent == None:
+            return
+        try:
+            esa_manager.esa_ssh_agent.close_connection()
+        except Exception:
+            pass
+
+    @staticmethod
+    def __remove_directory_if_empty(directory: str):
+        """Removes the directory of a device once its files were removed."""
+        try:
+            os.rmdir(directory)
+        except OSError:
+            pass
+
+    def __log_results(self, results: dict[int, ESAFleetDeviceResult]):
+        """Logs the results table of the fleet execution."""
+        Logger.info('Fleet execution results:\n' + self.get_results_table(
+            [results[index] for index in range(len(self.inventory))]
+        ))
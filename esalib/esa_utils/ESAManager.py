@@ -1,3 +1,4 @@
+import threading
 from abc import ABCMeta, abstractmethod
 # ESA utils
 from .ESASSHAgent import ESASSHAgent
@@ -5,8 +6,11 @@ from .ESAParameters import ESAParameters, LoggerInitializer
 from .ESAFileManager import ESAFileManager
 from .ESAStateManager import ESAStateManager
 from .ESARemediationStatus import ESARemediationStatus, ESABaseRemediationStatusCodes
+# SSH
+from ..infrastructure.ssh_manager.SSHConnectionPool import SSHConnectionPool
 # Utils
 from ..utils.logger.Logger import Logger
+from ..utils.files.FileCache import FileCache
 from ..utils.mail.CaseMailer import CaseMailer
 
 
@@ -38,7 +42,7 @@ class ESARemediationUseCase():
 
 class ESAManager:
     """
-    @version 1.4.2
+    @version 1.13.0
     
     Class to initialize all ESA services for the remediation use cases. It starts the SSH connections, retrieves the basic files and
     sets the ES state from the values in those files. Finally, the remediation status manager is initialized with the custom status codes.
@@ -48,10 +52,44 @@ class ESAManager:
         esa_parameters: ESAParameters = None,
         supported_versions: list[str] = [],
         custom_status_codes: ESABaseRemediationStatusCodes = None,
+        local_directory: str = '',
+        connection_pool: SSHConnectionPool = None,
+        delete_log_file_after: bool = True,
+        search_logs_remotely: bool = False,
+        file_cache: FileCache = None,
+        fetch_log_incrementally: bool = False,
+        retrieve_in_memory: bool = False,
+        transfer_compression: str = None,
     ):
+        """
+        @param {ESAParameters} esa_parameters The SSH and email parameters, an ESADeviceParameters instance is also accepted (retrieved from the CLI arguments if not provided).
+        @param {list} supported_versions The AsyncOS versions supported by the use case (all of them if empty).
+        @param {ESABaseRemediationStatusCodes} custom_status_codes Extended definition of status codes with custom messages and code numbers.
+        @param {str} local_directory Local directory where the ESA files are retrieved (current directory by default).
+        @param {SSHConnectionPool} connection_pool The pool to borrow the SSH connection from (the default pool if not provided).
+        @param {bool} delete_log_file_after Flag to indicate if the app log file is deleted after the use case ends.
+        @param {bool} search_logs_remotely Flag to indicate that the ESA log file is searched on the ESA instead of being retrieved.
+        @param {FileCache} file_cache Cache of the files retrieved from the ESA (no cache by default).
+        @param {bool} fetch_log_incrementally Flag to indicate that only the new bytes of the ESA log file are fetched (it requires $file_cache).
+        @param {bool} retrieve_in_memory Flag to indicate that the ESA files are retrieved in memory instead of the local directory.
+        @param {str} transfer_compression The compression of the ESA file transfers (gzip, ssh or auto), uncompressed by default.
+        """
         self.esa_parameters: ESAParameters = esa_parameters if esa_parameters else ESAParameters()
         self.supported_versions: list[str] = supported_versions
         self.custom_status_codes = custom_status_codes if custom_status_codes else ESABaseRemediationStatusCodes()
+        self.local_directory: str = local_directory
+        self.connection_pool: SSHConnectionPool = connection_pool
+        self.delete_log_file_after: bool = delete_log_file_after
+        self.search_logs_remotely: bool = search_logs_remotely
+        self.file_cache: FileCache = file_cache
+        self.fetch_log_incrementally: bool = fetch_log_incrementally
+        self.retrieve_in_memory: bool = retrieve_in_memory
+        self.transfer_compression: str = transfer_compression
+        # Message of the exception that stopped the use case, if any
+        self.error_message: str = None
+        # Cancellation of the use case (the SSH agent can be created after the cancellation)
+        self.__cancel_lock = threading.Lock()
+        self.__is_cancelled: bool = False
         # To be initialized
         self.esa_ssh_agent: ESASSHAgent = None
         self.esa_file_manager: ESAFileManager = None
@@ -89,17 +127,37 @@ class ESAManager:
         except Exception as exception:
             self.__report_exception(exception)
         finally:
+            # We report the SSH reconnections (if any)
+            self.__report_connection_statistics()
             # We send the case email if indicated
             self.__send_remediation_email()
             # Finally, we delete the retrieved files from ESA, as they are no longer required
             if self.esa_file_manager != None:
                 self.esa_file_manager.remove_essential_files()
             # We remove the app log file
-            LoggerInitializer.delete_log_file()
+            if self.delete_log_file_after:
+                LoggerInitializer.delete_log_file()
             # We execute the cleanup function, if it was provided
             if cleanup_function != None:
                 cleanup_function(self)
     
+    def cancel(self):
+        """
+        Cancels the use case from another thread, closing the SSH connection so that the blocked operations fail.
+        If the connection is not started yet, it is closed as soon as it is, and the use case stops.
+        """
+        with self.__cancel_lock:
+            self.__is_cancelled = True
+            esa_ssh_agent = self.esa_ssh_agent
+        if esa_ssh_agent != None:
+            self.__close_ssh_connection(esa_ssh_agent)
+
+    def is_cancelled(self) -> bool:
+        """
+        @returns {bool} True if the use case was cancelled.
+        """
+        return self.__is_cancelled
+
     # Internal methods
 
     def __load(self):
@@ -114,16 +172,43 @@ class ESAManager:
     def __report_exception(self, exception: Exception):
         """Reports an exception at logger and remediation status level."""
         Logger.exception(exception.__str__())
+        self.error_message = exception.__str__()
         if self.esa_remediation_status != None:
             self.esa_remediation_status.push_status_code(self.custom_status_codes.ERROR)
             self.esa_remediation_status.set_error_message(exception.__str__())
         
+    def __report_connection_statistics(self):
+        """Reports the SSH reconnections and the file transfers of the agent at remediation status level."""
+        if self.esa_ssh_agent == None or self.esa_remediation_status == None:
+            return
+        self.esa_remediation_status.set_connection_statistics(
+            self.esa_ssh_agent.get_reconnect_count(),
+            self.esa_ssh_agent.get_downtime()
+        )
+        self.esa_remediation_status.set_transfer_records(self.esa_ssh_agent.get_transfer_records())
+
     def __start_ssh_connection(self):
         """
         Starts the SSH connection with ESA via the ESASSHAgent class.
         """
-        self.esa_ssh_agent = ESASSHAgent(self.esa_parameters.esa_ssh_parameters)
-        self.esa_ssh_agent.start_connection()
+        esa_ssh_agent = ESASSHAgent(self.esa_parameters.esa_ssh_parameters, self.connection_pool)
+        with self.__cancel_lock:
+            if self.__is_cancelled:
+                raise Exception('The use case was cancelled')
+            self.esa_ssh_agent = esa_ssh_agent
+        esa_ssh_agent.start_connection()
+        # We check it again, the cancellation could not close a connection that was being started
+        if self.__is_cancelled:
+            self.__close_ssh_connection(esa_ssh_agent)
+            raise Exception('The use case was cancelled')
+
+    @staticmethod
+    def __close_ssh_connection(esa_ssh_agent: ESASSHAgent):
+        """Closes the SSH connection of the agent, ignoring the errors of already closed connections."""
+        try:
+            esa_ssh_agent.close_connection()
+        except Exception:
+            pass
     
     def __initialize_esa_state(self):
         """
@@ -134,7 +219,15 @@ class ESAManager:
         content via the set_state_from_files method.
         """
         # We create a file manager (required for ESAStateManager)
-        self.esa_file_manager = ESAFileManager(self.esa_ssh_agent)
+        self.esa_file_manager = ESAFileManager(
+            self.esa_ssh_agent, 
+            self.local_directory, 
+            self.search_logs_remotely,
+            self.file_cache,
+            self.fetch_log_incrementally,
+            self.retrieve_in_memory,
+            self.transfer_compression
+        )
         # We create the ESAStateManager and initialize it
         self.esa_state_manager = ESAStateManager(self.esa_ssh_agent, self.esa_file_manager, self.supported_versions)
         self.esa_state_manager.set_state_from_files()
@@ -12,6 +12,8 @@ class ESASSHParameters:
     esa_user: str
     esa_password: str
     esa_ssh_port: int = 22
+    # Protocol of the file transfers (scp or sftp)
+    file_transfer_protocol: str = 'scp'
 
 
 @dataclass 
@@ -22,6 +24,13 @@ class ESAEmailParameters:
     case_identification_number: str
 
 
+@dataclass
+class ESADeviceParameters:
+    """Class to encapsulate the SSH and email parameters of a single ESA, without reading the CLI arguments."""
+    esa_ssh_parameters: ESASSHParameters
+    esa_email_parameters: ESAEmailParameters
+
+
 class ESACLIArguments(argparse.ArgumentParser):
     """
     @version 1.0.0
@@ -52,6 +61,7 @@ class ESACLIArguments(argparse.ArgumentParser):
         self.add_argument('-u', '--esa-user', help = 'ESA SSH user', default = 'service')
         self.add_argument('-s', '--esa-password', help = 'ESA SSH password', default = '')
         self.add_argument('-p', '--esa-ssh-port', help = 'ESA SSH port', default = 22)
+        self.add_argument('--file-transfer-protocol', help = 'Protocol of the file transfers', choices = ['scp', 'sftp'], default = 'scp')
 
     def __add_email_arguments(self):
         """Method to register the CLI email arguments"""
@@ -94,7 +104,9 @@ class ESASSHParametersGetter:
     def set(self):
         """Retrieves the SSH parameters from CLI arguments."""
         args = ESACLIArguments().arguments
-        self.esa_ssh_parameters = ESASSHParameters(args.esa_ip, args.esa_user, args.esa_password, args.esa_ssh_port)
+        self.esa_ssh_parameters = ESASSHParameters(
+            args.esa_ip, args.esa_user, args.esa_password, args.esa_ssh_port, args.file_transfer_protocol
+        )
 
     def get(self) -> ESASSHParameters:
         """Returns the SSH parameters instance"""
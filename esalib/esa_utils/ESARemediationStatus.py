@@ -1,3 +1,5 @@
+# SSH
+from ..infrastructure.ssh_manager.TransferRecord import TransferRecord
 # Utils
 from ..utils.logger.Logger import Logger
 
@@ -37,11 +39,12 @@ class ESABaseRemediationStatusCodes:
 
 class ESARemediationStatus():
     """
-    @version 1.3.0
+    @version 1.5.0
 
     Class to keep track of the remediation status via status codes. It also allows to keep track of the 
     files that were modified, which are candidates to be incorporated to the mail that is sent at the end
-    of the process. 
+    of the process. The SSH reconnections (count and time without connection) are reported as well, and so are
+    the file transfers (their records, with the size, duration, throughput and retries of every transfer).
     """
 
     def __init__(
@@ -53,6 +56,11 @@ class ESARemediationStatus():
         """
         self.files: list[str] = []
         self.messages = { }
+        # SSH reconnection statistics
+        self.reconnect_count: int = 0
+        self.downtime: float = 0
+        # File transfer records
+        self.transfer_records: list[TransferRecord] = []
         self.custom_status_codes = custom_status_codes if custom_status_codes != None else ESABaseRemediationStatusCodes()
 
     # Setters
@@ -99,6 +107,28 @@ class ESARemediationStatus():
         error_key = ESABaseRemediationStatusCodes.ERROR
         self.messages[error_key] = self.custom_status_codes.get_message_by_status_code(error_key) % error_message
 
+    def set_connection_statistics(
+        self,
+        reconnect_count: int,
+        downtime: float
+    ):
+        """
+        @param {int} reconnect_count The number of times that the SSH connection was restarted.
+        @param {float} downtime The number of seconds without SSH connection.
+
+        Sets the SSH reconnection statistics of the remediation.
+        """
+        self.reconnect_count = reconnect_count
+        self.downtime = downtime
+
+    def set_transfer_records(self, transfer_records: list[TransferRecord]):
+        """
+        @param {list} transfer_records The records of the file transfers of the remediation.
+
+        Sets the file transfer records of the remediation.
+        """
+        self.transfer_records = list(transfer_records)
+
     # Facade
 
     def get_remediation_messages(self):
@@ -106,7 +136,28 @@ class ESARemediationStatus():
         Returns a string with all the remediation messages joined by new line characters.
         Suitable for email body.
         """
-        return '\n'.join(value for value in self.messages.values())
+        messages = list(self.messages.values())
+        if self.reconnect_count > 0:
+            messages.append(f'The SSH connection was restarted { self.reconnect_count } time(s), { self.downtime:.1f}s without connection.')
+        retried_transfers = [record for record in self.transfer_records if record.retries > 0]
+        if retried_transfers:
+            messages.append(f'{ len(retried_transfers) } file transfer(s) were repeated after a reconnection.')
+        return '\n'.join(messages)
+
+    def get_transfer_statistics(self) -> dict:
+        """
+        Returns the totals of the file transfers: number of transfers, bytes of the files, bytes on the wire,
+        seconds transferring and throughput (bytes on the wire per second).
+        """
+        transferred_bytes = sum(record.transferred_bytes for record in self.transfer_records)
+        duration = sum(record.duration for record in self.transfer_records)
+        return {
+            'transfers': len(self.transfer_records),
+            'size': sum(record.size for record in self.transfer_records),
+            'transferred_bytes': transferred_bytes,
+            'duration': duration,
+            'throughput': transferred_bytes / duration if duration > 0 else 0,
+        }
 
     def get_remediation_attachments(self) -> list:
         """
@@ -0,0 +1,115 @@
+import io
+import re
+from dataclasses import dataclass, field
+from types import MappingProxyType
+
+
+@dataclass(frozen = True)
+class ESASNMPDConf:
+    """
+    @version 1.0.1
+
+    Immutable model of the SNMPD conf file of an ESA, parsed once. The relevant values (serial number, AsyncOS
+    version, model and contact) are extracted when it is parsed, and the directives of the file (the first word of
+    every line that is not a comment) are kept by name, so the lookups are dictionary reads. The lines are kept as
+    well (with the line endings translated to new lines, as the FileManager reads them), to search arbitrary regular
+    expressions without reopening the file. The directives are derived from the lines, so they are not compared or
+    hashed (the model can be used as a dictionary key).
+    The model can be converted to and from a JSON-compatible dictionary, so it can be stored and reused in later runs.
+    """
+    serial_number: str = None
+    version_number: str = None
+    model: str = None
+    contact: str = None
+    # Values of the directives by name (the first occurrence of every directive)
+    values: MappingProxyType = field(default_factory = lambda: MappingProxyType({}), compare = False)
+    lines: tuple = ()
+
+    # Regular expressions of the relevant values
+    SERIAL_NUMBER_REGEX = r'Serial #: (.*)$'
+    VERSION_NUMBER_REGEX = r'AsyncOS Version: (.*?),'
+    MODEL_REGEX = r'Model:? (.*?),'
+    CONTACT_REGEX = r'^\s*(?:[Ss]ys)?[Cc]ontact:?\s+(.*?)\s*$'
+
+    @classmethod
+    def parse(cls, content: str) -> 'ESASNMPDConf':
+        """
+        @param {str} content The content of the SNMPD conf file.
+
+        @returns {ESASNMPDConf} The parsed model.
+        """
+        lines = tuple(io.StringIO(content, newline = None).readlines())
+        values = {}
+        for line in lines:
+            directive = line.strip()
+            if not directive or directive.startswith('#'):
+                continue
+            name, _, value = directive.partition(' ')
+            values.setdefault(name, value.strip())
+        model = cls(lines = lines, values = MappingProxyType(values))
+        # The values that are not present are None
+        return cls(
+            serial_number = model.search_value(cls.SERIAL_NUMBER_REGEX) or None,
+            version_number = model.search_value(cls.VERSION_NUMBER_REGEX) or None,
+            model = model.search_value(cls.MODEL_REGEX) or None,
+            contact = model.search_value(cls.CONTACT_REGEX) or None,
+            values = model.values,
+            lines = lines,
+        )
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'ESASNMPDConf':
+        """
+        @param {dict} data The model as a dictionary (see to_dict).
+
+        @returns {ESASNMPDConf} The model.
+        """
+        return cls(
+            serial_number = data.get('serial_number'),
+            version_number = data.get('version_number'),
+            model = data.get('model'),
+            contact = data.get('contact'),
+            values = MappingProxyType(dict(data.get('values', {}))),
+            lines = tuple(data.get('lines', [])),
+        )
+
+    def to_dict(self) -> dict:
+        """
+        @returns {dict} The model as a JSON-compatible dictionary.
+        """
+        return {
+            'serial_number': self.serial_number,
+            'version_number': self.version_number,
+            'model': self.model,
+            'contact': self.contact,
+            'values': dict(self.values),
+            'lines': list(self.lines),
+        }
+
+    def get(
+        self,
+        directive: str,
+        default: str = None
+    ) -> str:
+        """
+        @param {str} directive The name of the directive (like syslocation).
+        @param {str} default The value returned if the directive is not present.
+
+        @returns {str} The value of the directive.
+        """
+        return self.values.get(directive, default)
+
+    def search_value(self, regex: str) -> str:
+        """
+        @param {str} regex The regular expression, its first group is the value.
+
+        Searches a value in the lines of the file, like the FileManager does in the file.
+
+        @returns {str} The value of the first matching line (False if there is no match).
+        """
+        expression = re.compile(regex)
+        for line in self.lines:
+            match = expression.search(line)
+            if match != None:
+                return match.group(1)
+        return False
@@ -1,55 +1,147 @@
 from enum import Enum, auto
 # SSH
 from .ESAParameters import ESASSHParameters
-from ..infrastructure.ssh_manager.SSHManager import SSHManager
+from ..infrastructure.ssh_manager.SSHSession import SSHSession, SSHSessionReconnected
+from ..infrastructure.ssh_manager.SSHConnectionPool import SSHConnectionPool
+from ..infrastructure.ssh_manager.strategy.AsyncSSHStrategy import AsyncSSHStrategy
+from ..infrastructure.ssh_manager.strategy.SSHStrategy import SSHStrategy
+from ..infrastructure.ssh_manager.readers.CommandStream import CommandStream
+from ..infrastructure.ssh_manager.readers.PromptMatcher import PromptMatcher
 # SCP file transfer
 from ..infrastructure.ssh_manager.SCPFileTransfer import SCPFileTransfer
+from ..infrastructure.ssh_manager.TransferRecord import TransferRecord
 # Utils
 from ..utils.logger.Logger import Logger
 
 
 class ESASSHAgent:
     """
-    @version 3.10.3
+    @version 3.24.4
 
     SSH agent for the ESA. It provides a predictable mechanism to initialize and keep a SSH connection.
-    File transfer functionalities via SCP are also available.
+    The connection is borrowed from a SSHConnectionPool (the default pool of the process, unless another one is
+    provided), so that several agents can talk to different ESAs from the same process.
+    File transfer functionalities via SCP (or SFTP, selectable per agent) are also available, including compressed
+    transfers (remote gzip, or a dedicated connection with SSH transport compression). Every transfer is recorded
+    (TransferRecord, with its size, duration, throughput and retries) and its progress can be followed with a callback.
+    The shell scope (normal, csh shell, CLI and configuration mode) is tracked as a state machine, so the scopes are only
+    entered when required, with the minimum number of transitions. The ESA delimiters (#, ], > and ]>) are detected
+    with a PromptMatcher, so only real prompts at the end of the output end the commands. If the connection is lost, the session restarts it
+    and the agent restores the previous scope before repeating the command (unless it was in configuration mode, 
+    because the uncommitted changes are discarded by the ESA).
+    An asyncio facade (the async_ methods) is provided as well, it drives its own connection via an AsyncSSHStrategy so
+    that a single event loop can overlap the waits of many ESAs.
     """
+    # Number of characters of the last output kept to verify the prompt
+    __LAST_OUTPUT_TAIL_SIZE = 256
+
     def __init__(
         self,
-        ssh_parameters: ESASSHParameters
+        ssh_parameters: ESASSHParameters,
+        connection_pool: SSHConnectionPool = None,
+        file_operations_decorator = None,
+        transfer_progress_callback = None
     ):
         """
         @param {str} esa_ip IP of the ESA.
         @param {str} esa_user SSH user of the ESA.
         @param {str} esa_password SSH password for the ESA user.
         @param {int} esa_ssh_port Port where the SSH service is running on ESA.
+        @param {str} file_transfer_protocol Protocol of the file transfers (scp or sftp).
+        @param {SSHConnectionPool} connection_pool The pool to borrow the connection from (the default pool if not provided).
+        @param file_operations_decorator The FileOperationsDecorator class or factory, like a tuned WithSFTPDecorator (the one of $file_transfer_protocol by default).
+        @param {Callable} transfer_progress_callback The function called with the remote path, the transferred and total bytes and the rate of the transfers.
         """
         self.esa_ip = ssh_parameters.esa_ip
         self.esa_user = ssh_parameters.esa_user
         self.esa_password = ssh_parameters.esa_password
         self.esa_ssh_port = ssh_parameters.esa_ssh_port
-        # Shell scope
+        self.file_operations_decorator = (
+            file_operations_decorator if file_operations_decorator
+            else SCPFileTransfer.get_file_operations_decorator(ssh_parameters.file_transfer_protocol)
+        )
+        self.transfer_progress_callback = transfer_progress_callback
+        # Records of the file transfers executed by the agent
+        self.transfer_records: list[TransferRecord] = []
+        self.connection_pool: SSHConnectionPool = (
+            connection_pool if connection_pool else SSHConnectionPool.get_default_pool()
+        )
+        # SSH session borrowed from the pool
+        self.ssh_session: SSHSession = None
+        self.ssh_connection = None
+        # Shell scope, nested configuration level and tail of the last output (to verify the prompt)
         self.scope = ESASSHAgentScopes._NORMAL_MODE
+        self.config_nested_level = 0
+        self.last_output_tail = ''
+        # Reconnection statistics of the session when it was borrowed
+        self.__initial_reconnect_count = 0
+        self.__initial_downtime = 0
+        # Asyncio strategy and its shell scope
+        self.async_strategy: AsyncSSHStrategy = None
+        self.async_scope = ESASSHAgentScopes._NORMAL_MODE
 
     def start_connection(self):
         """
-        Initializes the SSHManager and sets the connection to the local state.
+        Borrows a session for the ESA from the connection pool and sets the connection to the local state.
         """
-        SSHManager.initialize({  
+        self.ssh_session = self.connection_pool.checkout(self.get_host_options())
+        Logger.info('Connected via SSH')
+
+        # We copy the reference to the connection to a member variable
+        self.ssh_connection = self.ssh_session.get_connection()
+        self.scope = ESASSHAgentScopes._NORMAL_MODE
+        # The session may come from the pool, so we only report the reconnections from now on
+        self.__initial_reconnect_count = self.ssh_session.reconnect_count
+        self.__initial_downtime = self.ssh_session.downtime
+
+    def close_connection(self) -> None:
+        """Method to close the SSH connection, removing the session from the pool."""
+        self.connection_pool.discard(self.ssh_session)
+        self.__forget_session()
+
+    def release_connection(self) -> None:
+        """Method to give back the SSH session to the pool, so that the connection can be reused later."""
+        self.connection_pool.release(self.ssh_session)
+        self.__forget_session()
+
+    def get_host_options(self) -> dict:
+        """
+        @returns {dict} The options to start the connection with the ESA.
+        """
+        return {
             'hostname': self.esa_ip, 
             'username': self.esa_user, 
             'password': self.esa_password, 
             'port': self.esa_ssh_port, 
-        })
-        Logger.info('Connected via SSH')
+        }
+
+    def get_ssh_session(self) -> SSHSession:
+        """
+        @returns {SSHSession} The SSH session borrowed from the pool.
+        """
+        return self.__get_session()
 
-        # We copy the reference to the session to a member variable
-        self.ssh_connection = SSHManager.get_connection()
+    def get_reconnect_count(self) -> int:
+        """
+        @returns {int} The number of times that the SSH connection was restarted since it was started by the agent.
+        """
+        if not self.ssh_session:
+            return 0
+        return self.ssh_session.reconnect_count - self.__initial_reconnect_count
 
-    def close_connection(self) -> None:
-        """Method to close the SSH connection at SSHManager level."""
-        SSHManager.disconnect()
+    def get_downtime(self) -> float:
+        """
+        @returns {float} The number of seconds without SSH connection since it was started by the agent.
+        """
+        if not self.ssh_session:
+            return 0
+        return self.ssh_session.downtime - self.__initial_downtime
+
+    def get_transfer_records(self) -> list[TransferRecord]:
+        """
+        @returns {list} The records of the file transfers executed by the agent, in order.
+        """
+        return list(self.transfer_records)
 
     def get_ssh_connection(self):
         """
@@ -67,33 +159,176 @@ class ESASSHAgent:
     ):
         """
         @param {float} timeout The time to wait before raising a timeout exception while expecting a command output (5s by default).
-        @param {float} sleep_time The time to wait between output lectures (0.1s or 100ms by default).
+        @param {float} sleep_time Kept for compatibility, the output is read as soon as it arrives.
         @param {int} buffer_size The size of the buffer where the async output is going to be stored (4096 bytes by default).
 
-        Enters to the CLI mode wit the specified SSH channel properties.
+        Enters to the CLI mode wit the specified SSH channel properties. If the agent is already in CLI mode (and the last 
+        prompt confirms it), only the channel properties are updated, the shells are not entered again.
         """
         # We set the channel properties
-        SSHManager.set_channel_properties(timeout, sleep_time, buffer_size)
-        # Enters to the CLI mode
-        SSHManager.exec_async_command('csh', terminal_delimiter = ']')
-        SSHManager.exec_async_command('cli', terminal_delimiter = '>')
-        # We set the scope as CLI mode
-        self.scope = ESASSHAgentScopes._CLI_MODE
+        self.__get_session().set_channel_properties(timeout, sleep_time, buffer_size)
+        # The configuration mode is a CLI mode as well
+        if self.is_in_scope(ESASSHAgentScopes._CLI_MODE) or self.is_in_scope(ESASSHAgentScopes._CONFIG_MODE):
+            return
+        # The tracked scope is not confirmed by the last prompt, so we probe it with an empty command
+        if self.get_scope() != ESASSHAgentScopes._NORMAL_MODE:
+            self.__probe_scope()
+        self.ensure_scope(ESASSHAgentScopes._CLI_MODE)
 
     def close_cli_mode(self):
-        """Exits the CLI mode, setting the scope to _NORMAL_MODE."""
-        SSHManager.exec_async_command('exit', terminal_delimiter = ']')
-        SSHManager.exec_async_command('exit', terminal_delimiter = '#', close_channel_after = True)
-        # We set the scope as normal mode
-        self.scope = ESASSHAgentScopes._NORMAL_MODE
+        """Exits the CLI mode (and the configuration mode, if any), setting the scope to _NORMAL_MODE."""
+        self.ensure_scope(ESASSHAgentScopes._NORMAL_MODE)
+
+    # Session state machine
+
+    def get_scope(self) -> 'ESASSHAgentScopes':
+        """
+        Returns the current shell scope, which is reset to _NORMAL_MODE if the interactive channel was closed.
+        """
+        self.__sync_scope_with_channel()
+        return self.scope
+
+    def is_in_scope(self, scope: 'ESASSHAgentScopes') -> bool:
+        """
+        @param {ESASSHAgentScopes} scope The scope to verify.
+
+        Cheap verification of the current scope (without any round trip): the tracked scope must match and the last 
+        received output must end with the prompt of that scope.
+
+        @returns {bool}
+        """
+        if self.get_scope() != scope:
+            return False
+        return _SCOPE_PROMPT_MATCHERS[scope].match(self.last_output_tail) != None
+
+    def ensure_scope(self, target_scope: 'ESASSHAgentScopes'):
+        """
+        @param {ESASSHAgentScopes} target_scope The scope to reach (_NORMAL_MODE, _SHELL_MODE or _CLI_MODE).
+
+        Moves from the current scope to the target one with the minimum number of transitions (the configuration
+        mode is reached via enter_config_mode, because it requires the configuration command).
+        """
+        if target_scope == ESASSHAgentScopes._CONFIG_MODE:
+            raise Exception('The configuration mode must be entered via enter_config_mode')
+        if self.get_scope() == ESASSHAgentScopes._CONFIG_MODE:
+            self.exit_config_mode()
+        target_level = ESASSHAgentScopes.get_level(target_scope)
+        # We go up (csh, cli) or down (exit) one scope at a time
+        while ESASSHAgentScopes.get_level(self.scope) < target_level:
+            command, delimiter = _SCOPE_TRANSITIONS_UP[self.scope]
+            self.__exec_async_command(command, delimiter, idempotent = True)
+            self.scope = ESASSHAgentScopes.get_scope_by_level(ESASSHAgentScopes.get_level(self.scope) + 1)
+        while ESASSHAgentScopes.get_level(self.scope) > target_level:
+            command, delimiter = _SCOPE_TRANSITIONS_DOWN[self.scope]
+            next_scope = ESASSHAgentScopes.get_scope_by_level(ESASSHAgentScopes.get_level(self.scope) - 1)
+            # The channel is closed once we are back to the normal mode
+            self.__exec_async_command(
+                command, 
+                delimiter, 
+                close_channel_after = next_scope == ESASSHAgentScopes._NORMAL_MODE,
+                idempotent = True
+            )
+            self.scope = next_scope
+        Logger.debug(f'Current scope: { self.scope.name }')
+
+    def enter_config_mode(
+        self,
+        config_mode_name: str,
+        command_delimiter: str = ']>'
+    ) -> str:
+        """
+        @param {str} config_mode_name The configuration command (like destconfig, sshconfig, etc).
+        @param {str} command_delimiter The prompt delimiter of the configuration mode.
+
+        Enters to a configuration mode from the CLI mode (which is only entered if required).
+
+        @returns {str} The output of the configuration command.
+        """
+        if self.get_scope() == ESASSHAgentScopes._CONFIG_MODE:
+            raise Exception('Already in configuration mode, exit it before entering another one')
+        self.enter_cli_mode()
+        output = self.__exec_async_command(config_mode_name, command_delimiter, idempotent = True)
+        self.scope = ESASSHAgentScopes._CONFIG_MODE
+        self.config_nested_level = 1
+        return output
+
+    def increase_config_nested_level(self):
+        """Increases by one the nested configuration level (the number of \\n required to exit the configuration mode)."""
+        self.config_nested_level += 1
+
+    def exit_config_mode(self) -> str:
+        """
+        Exits the configuration mode by hitting ENTER once per nested configuration level, back to the CLI mode.
+
+        @returns {str} The output of the exit sequence.
+        """
+        if self.get_scope() != ESASSHAgentScopes._CONFIG_MODE:
+            return ''
+        # We get the escape sequence according to the nested level value
+        exit_sequence = ''.join('\n' for _ in range(self.config_nested_level))
+        output = self.__exec_async_command(exit_sequence, '>', idempotent = True)
+        self.scope = ESASSHAgentScopes._CLI_MODE
+        self.config_nested_level = 0
+        return output
+
+    def execute_command(
+        self,
+        command: str,
+        idempotent: bool = False
+    ) -> str: 
+        """
+        @param {str} command Command to execute.
+        @param {bool} idempotent Flag to indicate that the command can be executed again if the connection is restarted
+        (otherwise SSHSessionReconnected is raised).
 
-    def execute_command(self, command: str) -> str: 
+        Executes a command and keeps the outpout in the session buffer, which is also returned.
+        """
+        return self.__execute_exec_operation(
+            lambda ssh_session: ssh_session.exec_command(command, True, True, idempotent)
+        )
+
+    def execute_commands(
+        self,
+        commands: list[str],
+        max_channels: int = SSHStrategy.MAX_CHANNELS,
+        idempotent: bool = False
+    ) -> list[str]:
+        """
+        @param {list} commands Commands to execute (they must be independent, like read-only diagnostics or tails).
+        @param {int} max_channels The maximum number of channels open at the same time (MAX_CHANNELS of the strategy by default).
+        @param {bool} idempotent Flag to indicate that the commands can be executed again if the connection is restarted
+        (otherwise SSHSessionReconnected is raised).
+
+        Executes several commands concurrently, on separate channels of the same connection, and gathers their outputs.
+
+        @returns {list} The output of every command, in the same order.
+        """
+        return self.__execute_exec_operation(
+            lambda ssh_session: ssh_session.exec_commands(commands, max_channels, idempotent)
+        )
+
+    def stream_command(
+        self,
+        command: str,
+        stop_on = None,
+        timeout: float = None,
+        idempotent: bool = False
+    ) -> CommandStream:
         """
         @param {str} command Command to execute.
+        @param {str|Pattern} stop_on Text or compiled regex that stops the command once an output line matches it.
+        @param {float} timeout The maximum number of seconds to wait for new data (no limit by default).
+        @param {bool} idempotent Flag to indicate that the command can be started again if the connection is restarted
+        (otherwise SSHSessionReconnected is raised).
 
-        Executes a command and keeps the outpout in the SSHManager buffer, which is also returned.
+        Executes a command and streams its output as it arrives (useful for commands like grep or cat over huge files),
+        the output is not kept in the session buffer. The exit status is available via get_exit_status.
+
+        @returns {CommandStream} The stream of the output, iterable by lines (or by byte chunks via iter_chunks).
         """
-        return SSHManager.exec_command(command, return_output = True, clear_buffer_before = True)
+        return self.__execute_exec_operation(
+            lambda ssh_session: ssh_session.stream_command(command, stop_on, timeout, idempotent)
+        )
 
     def execute_async_command(
         self, 
@@ -102,6 +337,7 @@ class ESASSHAgent:
         timeout: float = 5,
         sleep_time: float = 0.1,
         buffer_size: int = 4096,
+        idempotent: bool = False
     ) -> str:
         """
         @param {str} command Command to execute.
@@ -109,15 +345,14 @@ class ESASSHAgent:
         @param {float} timeout The time to wait before raising a timeout exception while expecting a command output (5s by default).
         @param {float} sleep_time The time to wait between output lectures (0.1s or 100ms by default).
         @param {int} buffer_size The size of the buffer where the async output is going to be stored (4096 bytes by default).
+        @param {bool} idempotent Flag to indicate that the command can be executed again if the connection is restarted
+        (otherwise SSHSessionReconnected is raised, once the scope is restored).
 
-        Executes an async command and keeps the output in the SSHManager buffer, which is also returned.
+        Executes an async command and keeps the output in the session buffer, which is also returned.
         """
         # We set the channel properties
-        SSHManager.set_channel_properties(timeout, sleep_time, buffer_size)
-        return SSHManager.exec_async_command(
-            command,
-            terminal_delimiter = delimiter
-        )
+        self.__get_session().set_channel_properties(timeout, sleep_time, buffer_size)
+        return self.__exec_async_command(command, delimiter, idempotent = idempotent)
 
 
     def execute_cli_command(
@@ -125,30 +360,75 @@ class ESASSHAgent:
         command: str,
         command_delimiter: str = '>',
         exit_cli_mode_after: bool = False,
-        more_output_delimiter: str = '-Press Any Key For More-'
+        more_output_delimiter: str = '-Press Any Key For More-',
+        idempotent: bool = False
     ) -> str:
         """
         @param {str} command Command to execute.
         @param {str} command_delimiter The string that we expect to find after the command ends.
         @param {bool} exit_cli_mode_after Flag that indicates if we should exit CLI mode after command's execution.
         @param {str} more_output_delimiter The string that indicates us that some parts of the output were hidden.
+        @param {bool} idempotent Flag to indicate that the command can be executed again if the connection is restarted
+        (otherwise SSHSessionReconnected is raised, once the CLI mode is restored).
 
-        Executes a command in CLI mode and keeps the outpout in the SSHManager buffer, which is also returned.
+        Executes a command in CLI mode and keeps the outpout in the session buffer, which is also returned.
         """
-        # We enter CLI mode if the current scope is not CLI with the default parameters (timeout, sleep_time and buffer_size)
-        if self.scope != ESASSHAgentScopes._CLI_MODE:
+        # We enter CLI mode if the current scope is not CLI (or configuration) with the default parameters
+        if not self.__is_in_cli_scope():
             self.enter_cli_mode()
         # Executes the command at CLI level
-        output = SSHManager.exec_async_command(
+        output = self.__exec_async_command(
             command, 
-            terminal_delimiter = command_delimiter,
-            more_output_delimiter = more_output_delimiter
+            command_delimiter,
+            more_output_delimiter = more_output_delimiter,
+            idempotent = idempotent
         )
         # Exits the CLI mode if it was specified to do so
         if exit_cli_mode_after:
             self.close_cli_mode()
         return output
 
+    def execute_cli_commands(
+        self,
+        commands: list[tuple],
+        exit_cli_mode_after: bool = False,
+        more_output_delimiter: str = '-Press Any Key For More-',
+        idempotent: bool = False
+    ) -> list[str]:
+        """
+        @param {list} commands The (command, command_delimiter) tuples to execute, an optional third item (may_page) flags the 
+        commands whose output may be paginated (the commands after them are sent once their prompt arrives).
+        @param {bool} exit_cli_mode_after Flag that indicates if we should exit CLI mode after the commands execution.
+        @param {str} more_output_delimiter The string that indicates us that some parts of the output were hidden.
+        @param {bool} idempotent Flag to indicate that the whole batch can be executed again if the connection is restarted
+        (otherwise SSHSessionReconnected is raised, once the CLI mode is restored).
+
+        Executes a batch of commands in CLI mode. The commands are pipelined (written back-to-back to the shell), so the
+        batch pays a single round trip instead of one per command. The ESA delimiters are replaced by their prompt
+        matchers, which detect the pager of every pipelined command: the batch is resumed from a paginated command
+        (see ParamikoStrategy.execute_async_commands), so the commands must be safe to repeat.
+
+        @returns {list} The output of every command, in the same order.
+        """
+        if not self.__is_in_cli_scope():
+            self.enter_cli_mode()
+        commands = [
+            (command[0], _DELIMITER_PROMPT_MATCHERS.get(command[1], command[1])) + tuple(command[2:])
+            for command in commands
+        ]
+        try:
+            outputs = self.__get_session().exec_async_commands(commands, more_output_delimiter)
+        except SSHSessionReconnected:
+            self.__restore_scope_after_reconnect()
+            if not idempotent:
+                raise
+            outputs = self.__get_session().exec_async_commands(commands, more_output_delimiter)
+        if outputs:
+            self.__set_last_output(outputs[-1])
+        if exit_cli_mode_after:
+            self.close_cli_mode()
+        return outputs
+
     def commit_configuration(self, commit_message: str) -> bool:
         """
         @param {str} commit_message String that contains the message for the commit.
@@ -168,24 +448,111 @@ class ESASSHAgent:
 
     def clear_output_buffer(self):
         """
-        Clears the SSHManager output buffer (the one that stores the output from commands).
+        Clears the session output buffer (the one that stores the output from commands).
         """
-        SSHManager.clear_buffer()
+        self.__get_session().clear_buffer()
 
     def get_command_output(self) -> str:
         """
-        Returns the SSHManager output buffer, with the outputs from commands.
+        Returns the session output buffer, with the outputs from commands.
+        """
+        return self.__get_session().get_output()
+
+
+    def get_file_with_scp(
+        self, 
+        path_to_file: str,
+        destination_path: str = None
+    ):
+        """
+        @param {str} path_to_file Path of the remote file to retrieve.
+        @param {str} destination_path Local path (directory or file) where the file is stored (current directory by default).
+
+        Retrieves a file from the ESA via the SCPFileTransfer wrapper (over SCP or SFTP).
+        """
+        self.__execute_transfer(lambda scp_file_transfer: scp_file_transfer.get_file(path_to_file, destination_path))
+
+    def get_file_in_memory(
+        self,
+        path_to_file: str,
+        max_memory_size: int = 1048576,
+        compressed: bool = False
+    ):
+        """
+        @param {str} path_to_file Path of the remote file to retrieve.
+        @param {int} max_memory_size The maximum number of bytes kept in memory (the rest is spooled to a temporary file).
+        @param {bool} compressed Flag to indicate that the file is compressed with gzip on the ESA (and decompressed on the fly).
+
+        Retrieves a file from the ESA into a spooled temporary file, without writing it to the local directory.
+
+        @returns {SpooledTemporaryFile} The retrieved file, rewound to its beginning.
         """
-        return SSHManager.get_output()
+        return self.__execute_transfer(
+            lambda scp_file_transfer: scp_file_transfer.get_file_object(
+                path_to_file, max_memory_size = max_memory_size, compressed = compressed
+            )
+        )
+
+    def get_file_compressed(
+        self,
+        path_to_file: str,
+        destination_path: str = None,
+        decompress: bool = True
+    ) -> str:
+        """
+        @param {str} path_to_file Path of the remote file to retrieve.
+        @param {str} destination_path Local path (directory or file) where the file is stored (current directory by default).
+        @param {bool} decompress Flag to indicate that the file is decompressed on the fly (otherwise it is stored with the .gz extension).
 
+        Retrieves a file from the ESA compressed with gzip on the ESA, so only the compressed bytes are transferred.
 
-    def get_file_with_scp(self, path_to_file: str):
+        @returns {str} The local path of the file.
+        """
+        return self.__execute_transfer(
+            lambda scp_file_transfer: scp_file_transfer.get_compressed_file(path_to_file, destination_path, decompress)
+        )
+
+    def get_file_over_compressed_connection(
+        self,
+        path_to_file: str,
+        destination_path: str = None
+    ):
         """
         @param {str} path_to_file Path of the remote file to retrieve.
+        @param {str} destination_path Local path (directory or file) where the file is stored (current directory by default).
+
+        Retrieves a file from the ESA over a connection with SSH transport compression. The compression is negotiated
+        when the connection starts, so a dedicated connection is started for the transfer. It is closed afterwards
+        (instead of being kept idle in the pool), as the compressed connections are rarely reused.
+        """
+        compressed_session = self.connection_pool.checkout({ **self.get_host_options(), 'compress': True })
+        scp_file_transfer = self.__get_file_transfer(compressed_session.get_connection())
+        try:
+            scp_file_transfer.get_file(path_to_file, destination_path)
+        finally:
+            for transfer_record in scp_file_transfer.transfer_records:
+                transfer_record.compressed = True
+            self.__collect_transfer_records(scp_file_transfer)
+            self.connection_pool.discard(compressed_session)
+
+    def get_files_with_scp(
+        self,
+        paths_to_files: list[str],
+        destination_path: str = None,
+        max_concurrency: int = SSHStrategy.MAX_CHANNELS
+    ):
+        """
+        @param {list} paths_to_files Paths of the remote files to retrieve.
+        @param {str} destination_path Local directory where the files are stored (current directory by default).
+        @param {int} max_concurrency The maximum number of files transferred at the same time (MAX_CHANNELS of the strategy by default).
 
-        Retrieves a file from the ESA via the SCPFileTransfer wrapper.
+        Retrieves several files from the ESA concurrently, over separate channels of the same connection. The transfers
+        are capped to the free channels of the connection (the interactive channel, if open, takes one of them).
         """
-        SCPFileTransfer(self.ssh_connection).get_file(path_to_file)
+        max_concurrency = min(max_concurrency, self.__get_session().get_strategy().get_free_channels())
+        self.__execute_transfer(
+            lambda scp_file_transfer: scp_file_transfer.get_files(paths_to_files, destination_path, max_concurrency)
+        )
 
     def upload_file_with_scp(
         self, 
@@ -198,12 +565,340 @@ class ESASSHAgent:
 
         Uploads a file to the ESA, using SCPFileTransfer wrapper.
         """
-        SCPFileTransfer(self.ssh_connection).upload_file(file_to_upload, destination_path)
+        self.__execute_transfer(lambda scp_file_transfer: scp_file_transfer.upload_file(file_to_upload, destination_path))
+
+    # Asyncio facade
+
+    async def async_start_connection(self, strategy: AsyncSSHStrategy = None):
+        """
+        @param {AsyncSSHStrategy} strategy The asyncio strategy to use (AsyncsshLibraryStrategy with the ESA host options by default).
+
+        Starts the asyncio SSH connection. It is independent from the pooled connection of start_connection.
+        """
+        if strategy == None:
+            # The asyncssh library is only required by the asyncio facade, so it is imported on demand
+            from ..infrastructure.ssh_manager.strategy.AsyncsshLibraryStrategy import AsyncsshLibraryStrategy
+            strategy = AsyncsshLibraryStrategy(self.get_host_options())
+        self.async_strategy = strategy
+        await self.async_strategy.connect()
+        self.async_scope = ESASSHAgentScopes._NORMAL_MODE
+        Logger.info('Connected via SSH (asyncio)')
+
+    async def async_close_connection(self) -> None:
+        """Method to close the asyncio SSH connection."""
+        await self.__get_async_strategy().disconnect()
+        self.async_strategy = None
+        self.async_scope = ESASSHAgentScopes._NORMAL_MODE
+
+    async def async_enter_cli_mode(
+        self,
+        timeout: float = 5,
+        sleep_time: float = 0.1,
+        buffer_size: int = 4096,
+    ):
+        """
+        @param {float} timeout The time to wait before raising a timeout exception while expecting a command output (5s by default).
+        @param {float} sleep_time Kept for compatibility with enter_cli_mode, the output is awaited instead of polled.
+        @param {int} buffer_size The size of the buffer where the async output is going to be stored (4096 bytes by default).
+
+        Awaitable counterpart of enter_cli_mode.
+        """
+        await self.__get_async_strategy().set_channel_properties(timeout, sleep_time, buffer_size)
+        for scope in (ESASSHAgentScopes._NORMAL_MODE, ESASSHAgentScopes._SHELL_MODE):
+            await self.__exec_async_strategy_command(*_SCOPE_TRANSITIONS_UP[scope])
+        self.async_scope = ESASSHAgentScopes._CLI_MODE
+
+    async def async_close_cli_mode(self):
+        """Awaitable counterpart of close_cli_mode."""
+        await self.__exec_async_strategy_command(*_SCOPE_TRANSITIONS_DOWN[ESASSHAgentScopes._CLI_MODE])
+        # The channel is closed once we are back to the normal mode
+        await self.__exec_async_strategy_command(
+            *_SCOPE_TRANSITIONS_DOWN[ESASSHAgentScopes._SHELL_MODE], close_channel_after = True
+        )
+        self.async_scope = ESASSHAgentScopes._NORMAL_MODE
+
+    async def async_execute_command(self, command: str) -> str:
+        """
+        @param {str} command Command to execute.
+
+        Awaitable counterpart of execute_command.
+        """
+        return await self.__get_async_strategy().execute_command(command)
+
+    async def async_execute_async_command(
+        self,
+        command: str,
+        delimiter: str,
+        timeout: float = 5,
+        sleep_time: float = 0.1,
+        buffer_size: int = 4096,
+    ) -> str:
+        """
+        @param {str} command Command to execute.
+        @param {str} delimiter The delimiter of the command prompt.
+        @param {float} timeout The time to wait before raising a timeout exception while expecting a command output (5s by default).
+        @param {float} sleep_time Kept for compatibility with execute_async_command, the output is awaited instead of polled.
+        @param {int} buffer_size The size of the buffer where the async output is going to be stored (4096 bytes by default).
+
+        Awaitable counterpart of execute_async_command.
+        """
+        await self.__get_async_strategy().set_channel_properties(timeout, sleep_time, buffer_size)
+        return await self.__exec_async_strategy_command(command, delimiter)
+
+    async def async_execute_cli_command(
+        self,
+        command: str,
+        command_delimiter: str = '>',
+        exit_cli_mode_after: bool = False,
+        more_output_delimiter: str = '-Press Any Key For More-'
+    ) -> str:
+        """
+        @param {str} command Command to execute.
+        @param {str} command_delimiter The string that we expect to find after the command ends.
+        @param {bool} exit_cli_mode_after Flag that indicates if we should exit CLI mode after command's execution.
+        @param {str} more_output_delimiter The string that indicates us that some parts of the output were hidden.
+
+        Awaitable counterpart of execute_cli_command.
+        """
+        if self.async_scope != ESASSHAgentScopes._CLI_MODE:
+            await self.async_enter_cli_mode()
+        output = await self.__exec_async_strategy_command(
+            command,
+            command_delimiter,
+            more_output_delimiter = more_output_delimiter
+        )
+        if exit_cli_mode_after:
+            await self.async_close_cli_mode()
+        return output
+
+    # Internal helpers
+
+    async def __exec_async_strategy_command(
+        self,
+        command: str,
+        delimiter: str,
+        close_channel_after: bool = False,
+        more_output_delimiter: str = '-Press Any Key For More-'
+    ) -> str:
+        """
+        Executes an async command via the asyncio strategy. As in __exec_async_command, the ESA delimiters are replaced
+        by their prompt matchers, the other ones are searched as they are.
+        """
+        delimiter = _DELIMITER_PROMPT_MATCHERS.get(delimiter, delimiter)
+        return await self.__get_async_strategy().execute_async_command(
+            command, delimiter, close_channel_after, more_output_delimiter
+        )
+
+    def __get_async_strategy(self) -> AsyncSSHStrategy:
+        """
+        Returns the asyncio strategy, validating that the asyncio connection was started.
+        """
+        if not self.async_strategy:
+            raise Exception('Asyncio SSH connection not started')
+        return self.async_strategy
+
+    def __get_session(self) -> SSHSession:
+        """
+        Returns the borrowed SSH session, validating that the connection was started.
+        """
+        if not self.ssh_session:
+            raise Exception('SSH connection not started')
+        return self.ssh_session
+
+    def __forget_session(self) -> None:
+        """
+        Drops the references to the session once it is given back to the pool.
+        """
+        self.ssh_session = None
+        self.ssh_connection = None
+        self.__reset_scope()
+
+    def __exec_async_command(
+        self,
+        command: str,
+        delimiter: str,
+        close_channel_after: bool = False,
+        more_output_delimiter: str = '-Press Any Key For More-',
+        idempotent: bool = False
+    ) -> str:
+        """
+        Executes an async command via the session, keeping the tail of its output to verify the prompt later.
+        The ESA delimiters are replaced by their prompt matchers, the other ones are searched as they are.
+        If the connection was restarted, the scope is restored, but the command is only sent again if it is idempotent
+        (like the scope transitions), otherwise SSHSessionReconnected is raised.
+        """
+        delimiter = _DELIMITER_PROMPT_MATCHERS.get(delimiter, delimiter)
+        try:
+            output = self.__get_session().exec_async_command(command, delimiter, close_channel_after, more_output_delimiter)
+        except SSHSessionReconnected:
+            self.__restore_scope_after_reconnect()
+            if not idempotent:
+                raise
+            output = self.__get_session().exec_async_command(command, delimiter, close_channel_after, more_output_delimiter)
+        self.__set_last_output(output)
+        return output
+
+    def __execute_exec_operation(self, operation):
+        """
+        @param {function} operation Function that receives the SSH session and executes an exec channel operation.
+
+        Executes an exec channel operation. If the connection was restarted meanwhile (the operation was repeated, or
+        SSHSessionReconnected was raised), the interactive scope, which was lost with the connection, is restored.
+
+        @returns The result of the operation.
+        """
+        ssh_session = self.__get_session()
+        reconnect_count = ssh_session.reconnect_count
+        try:
+            return operation(ssh_session)
+        finally:
+            if ssh_session.reconnect_count != reconnect_count and ssh_session.is_alive():
+                self.__restore_scope_after_reconnect()
+
+    def __restore_scope_after_reconnect(self) -> None:
+        """
+        Enters again the scope that was lost with the connection. The configuration mode is not restored, because the
+        ESA discards the uncommitted changes, so the configuration steps must be repeated by the caller.
+        """
+        previous_scope = self.scope
+        self.ssh_connection = self.__get_session().get_connection()
+        self.__reset_scope()
+        if previous_scope == ESASSHAgentScopes._CONFIG_MODE:
+            raise Exception('The SSH connection was lost in configuration mode, the uncommitted changes were discarded.')
+        Logger.info(f'Restoring the { previous_scope.name } scope after the reconnection.')
+        self.ensure_scope(previous_scope)
+
+    def __execute_transfer(self, transfer):
+        """
+        @param {function} transfer Function that receives the SCPFileTransfer and executes the transfer.
+
+        Executes a file transfer, repeating it if the connection was lost and it could be restarted.
+
+        @returns The result of the transfer.
+        """
+        scp_file_transfer = self.__get_file_transfer(self.ssh_connection)
+        try:
+            result = transfer(scp_file_transfer)
+        except Exception:
+            self.__collect_transfer_records(scp_file_transfer)
+            if not self.__get_session().reconnect_if_dead():
+                raise
+            self.ssh_connection = self.__get_session().get_connection()
+            self.__reset_scope()
+            # The transfers repeated after the reconnection are recorded as retries
+            scp_file_transfer = self.__get_file_transfer(self.ssh_connection)
+            try:
+                return transfer(scp_file_transfer)
+            finally:
+                self.__collect_transfer_records(scp_file_transfer, retries = 1)
+        self.__collect_transfer_records(scp_file_transfer)
+        return result
+
+    def __get_file_transfer(self, ssh_connection) -> SCPFileTransfer:
+        """Returns a SCPFileTransfer over a connection, with the decorator and the progress callback of the agent."""
+        return SCPFileTransfer(ssh_connection, self.file_operations_decorator, self.transfer_progress_callback)
+
+    def __collect_transfer_records(
+        self,
+        scp_file_transfer: SCPFileTransfer,
+        retries: int = 0
+    ) -> None:
+        """Keeps the records of the transfers executed by a SCPFileTransfer, logging their throughput."""
+        for transfer_record in scp_file_transfer.transfer_records:
+            transfer_record.retries = retries
+            Logger.debug(f'File transfer: { transfer_record }')
+            self.transfer_records.append(transfer_record)
+
+    def __set_last_output(self, output: str) -> None:
+        """Keeps the tail of the last output, which contains the current prompt."""
+        self.last_output_tail = output[-self.__LAST_OUTPUT_TAIL_SIZE:]
+
+    def __is_in_cli_scope(self) -> bool:
+        """Determines if the CLI commands can be executed right away (CLI or configuration mode)."""
+        return self.get_scope() in (ESASSHAgentScopes._CLI_MODE, ESASSHAgentScopes._CONFIG_MODE)
+
+    def __sync_scope_with_channel(self) -> None:
+        """Resets the scope if the interactive channel was closed (the shells are gone with it)."""
+        if self.scope == ESASSHAgentScopes._NORMAL_MODE or not self.ssh_session:
+            return
+        if not self.ssh_session.is_channel_open():
+            Logger.debug('Interactive channel closed, resetting the scope.')
+            self.__reset_scope()
+
+    def __probe_scope(self) -> None:
+        """
+        Sends an empty command and waits for the prompt of the tracked scope. If the prompt does not arrive, the
+        channel is closed, so that the scopes are entered again from the normal mode.
+        """
+        try:
+            self.__exec_async_command('', ESASSHAgentScopes.get_prompt(self.scope), idempotent = True)
+        except Exception:
+            Logger.debug(f'The { self.scope.name } prompt was not received, restarting the interactive channel.')
+            self.__get_session().get_strategy().close_channel()
+            self.__reset_scope()
+
+    def __reset_scope(self) -> None:
+        """Sets the scope back to the normal mode."""
+        self.scope = ESASSHAgentScopes._NORMAL_MODE
+        self.config_nested_level = 0
+        self.last_output_tail = ''
     
 
 class ESASSHAgentScopes(Enum):
-    """SSH scopes definition."""
-    _CLI_MODE = auto()
+    """SSH scopes definition, from the outermost to the innermost one."""
     _NORMAL_MODE = auto()
+    _SHELL_MODE = auto()
+    _CLI_MODE = auto()
+    _CONFIG_MODE = auto()
+
+    @staticmethod
+    def get_level(scope: 'ESASSHAgentScopes') -> int:
+        """Returns the nesting level of a scope."""
+        return list(ESASSHAgentScopes).index(scope)
+
+    @staticmethod
+    def get_scope_by_level(level: int) -> 'ESASSHAgentScopes':
+        """Returns the scope of a nesting level."""
+        return list(ESASSHAgentScopes)[level]
+
+    @staticmethod
+    def get_prompt(scope: 'ESASSHAgentScopes') -> str:
+        """Returns the characters that end the prompt of a scope."""
+        return _SCOPE_PROMPTS[scope]
+
+
+# Prompt ending of every scope
+_SCOPE_PROMPTS = {
+    ESASSHAgentScopes._NORMAL_MODE: '#',
+    ESASSHAgentScopes._SHELL_MODE: ']',
+    ESASSHAgentScopes._CLI_MODE: '>',
+    ESASSHAgentScopes._CONFIG_MODE: ']>',
+}
+
+# Prompts of every scope, to verify the current scope from the last output
+_SCOPE_PROMPT_MATCHERS = {
+    ESASSHAgentScopes._NORMAL_MODE: PromptMatcher.get_esa_prompt_matcher(PromptMatcher.NORMAL),
+    ESASSHAgentScopes._SHELL_MODE: PromptMatcher.get_esa_prompt_matcher(PromptMatcher.SHELL),
+    ESASSHAgentScopes._CLI_MODE: PromptMatcher.get_esa_prompt_matcher(PromptMatcher.CLI),
+    ESASSHAgentScopes._CONFIG_MODE: PromptMatcher.get_esa_prompt_matcher(PromptMatcher.CONFIG, PromptMatcher.CLUSTER_NOTICE),
+}
 
+# Prompts detected for every ESA delimiter (> is also found at the end of the configuration prompt)
+_DELIMITER_PROMPT_MATCHERS = {
+    '#': PromptMatcher.get_esa_prompt_matcher(PromptMatcher.NORMAL),
+    ']': PromptMatcher.get_esa_prompt_matcher(PromptMatcher.SHELL),
+    '>': PromptMatcher.get_esa_prompt_matcher(
+        PromptMatcher.CLI, PromptMatcher.CONFIG, PromptMatcher.CLUSTER_NOTICE, PromptMatcher.PAGER
+    ),
+    ']>': PromptMatcher.get_esa_prompt_matcher(PromptMatcher.CONFIG, PromptMatcher.CLUSTER_NOTICE, PromptMatcher.PAGER),
+}
 
+# Transitions between scopes: (command, prompt delimiter) to go one level up or down from a scope
+_SCOPE_TRANSITIONS_UP = {
+    ESASSHAgentScopes._NORMAL_MODE: ('csh', ']'),
+    ESASSHAgentScopes._SHELL_MODE: ('cli', '>'),
+}
+_SCOPE_TRANSITIONS_DOWN = {
+    ESASSHAgentScopes._CLI_MODE: ('exit', ']'),
+    ESASSHAgentScopes._SHELL_MODE: ('exit', '#'),
+}
@@ -6,7 +6,7 @@ from ...utils.logger.Logger import Logger
 
 class BaseConfig:
     """
-    @version 1.2.2
+    @version 1.3.0
 
     Base class of the configuration options, it implements the base methods and business logic.
     """
@@ -43,19 +43,20 @@ class BaseConfig:
         """
         Enters to configuration mode of the specific mode provided as argument.
         """
-        self.esa_ssh_agent.enter_cli_mode(sleep_time = 0.2)
-        self.esa_ssh_agent.execute_cli_command(self.config_mode_name, command_delimiter = self.CONFIG_MODE_DELIMITER)
+        # The agent enters the CLI mode only if required, and tracks the configuration scope
+        self.esa_ssh_agent.enter_config_mode(self.config_mode_name, command_delimiter = self.CONFIG_MODE_DELIMITER)
         # We update the flag that indicates if we are in config mode
         self.is_in_config_mode = True
+        self.config_nested_level = self.esa_ssh_agent.config_nested_level
         Logger.info(f'Switched to { self.config_mode_name } mode.')
 
     def exit_config_mode(self) -> None:
         """Facade method to exit configuration mode by hitting ENTER."""
-        # We get the escape sequence according to the nested level value, this indicates the required number of \n chars to exi configuration mode
-        exit_sequence = ''.join('\n' for _ in range(self.config_nested_level))
-        self.esa_ssh_agent.execute_cli_command(exit_sequence, command_delimiter = '>')
+        # The agent hits ENTER once per nested configuration level, back to the CLI mode
+        self.esa_ssh_agent.exit_config_mode()
         # We update the flag that indicates if we are in config mode
         self.is_in_config_mode = False
+        self.config_nested_level = 1
         Logger.info(f'Exiting { self.config_mode_name } mode.')
 
     def introduce_configuration_value(self, value: str) -> str:
@@ -70,7 +71,8 @@ class BaseConfig:
 
     def increase_nested_config_level(self):
         """Method to increase by one the nested config level (it will indicate the number of \n to enter to exit configuration mode)."""
-        self.config_nested_level += 1
+        self.esa_ssh_agent.increase_config_nested_level()
+        self.config_nested_level = self.esa_ssh_agent.config_nested_level
     
     def leave_default_configuration_value(self) -> str:
         """Facade method to leave a default value by hitting ENTER (which is made after each command by ssh_agent)."""
@@ -9,7 +9,7 @@ from ....utils.validators.IteratorValidator import IteratorValidator
 
 class HeimdallService(Service):
     """
-    @version 1.0.0
+    @version 1.1.0
 
     Implementation of the manager for the heimdall_svc service.
     """
@@ -41,7 +41,8 @@ class HeimdallService(Service):
             f'{ self.service_path } -{ service_status } { service_name }'
         )
         # We wait the specified or default time and return the output
-        time.sleep(sleep_time_after_command)
+        if sleep_time_after_command > 0:
+            time.sleep(sleep_time_after_command)
         return output
 
     def is_service_active(self, service_name: str) -> bool:
@@ -50,7 +51,8 @@ class HeimdallService(Service):
 
         Method to determine if the service is active via a regular expression to find a PID other than -1.
         """
-        status = self.set_service_status(service_name, 's')
+        # The status query does not change the service, so there is nothing to wait for after it
+        status = self.set_service_status(service_name, 's', sleep_time_after_command = 0)
         regex = re.compile(r'\'pid\': (\-?\d+), ')
         service_pid = regex.findall(status).pop(0)
         return int(service_pid) > -1
@@ -66,9 +68,12 @@ class HeimdallService(Service):
         @param {str} service_name The name of the service to execute.
 
         Method to wait until a service is up and running. It only waits until the timeout is reached, then an exception is raised.
+        The status is checked right away and then with adaptive backoff (starting at $sleep_time), and the timeout
+        includes the time spent by the status commands.
         """
-        iterations_validator = IteratorValidator.iterator_with_timeout(timeout, sleep_time)
-        while not self.is_service_active(service_name):
-            next(iterations_validator)
-        return
+        IteratorValidator.wait_until(
+            lambda: self.is_service_active(service_name),
+            timeout,
+            initial_sleep_time = sleep_time
+        )
         
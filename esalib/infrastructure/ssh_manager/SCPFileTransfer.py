@@ -1,36 +1,177 @@
-# SCP decorator
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+# File operations decorators
 from .decorators.WithSCPDecorator import WithSCPDecorator
+from .decorators.WithSFTPDecorator import WithSFTPDecorator
+# SSH strategies
+from .strategy.SSHStrategy import SSHStrategy
+# Transfer statistics
+from .TransferRecord import TransferRecord
 
 
 class SCPFileTransfer:
     """
-    @version 2.5.5
+    @version 2.11.2
     
     Wrapper for the SCP decorator for SSH transport. It simplifies the usage of this functionality by 
     encapsulating the decoration of the SSH connection.
+    Several files can be retrieved concurrently (get_files): every transfer uses its own channel of the same
+    transport, so the total time is close to the slowest transfer instead of the sum of all of them.
+    The decoration is SCP by default, another FileOperationsDecorator (like WithSFTPDecorator) can be provided.
+    The files can also be retrieved in memory (get_file_object), into a spooled temporary file that only touches the
+    disk if it exceeds its maximum memory size.
+    The files can be compressed on the remote host while they are transferred (get_compressed_file), being
+    decompressed on the fly or kept as .gz files (which the FileManager opens with its gzip strategy).
+    Every transfer is measured: a TransferRecord (size, bytes on the wire, duration and throughput) is collected in
+    $transfer_records, and the progress callback (if any) is called with the remote path, the transferred and total
+    bytes and the current rate in bytes per second.
     """
+    # File operations decorators by protocol name
+    FILE_OPERATIONS_DECORATORS = {
+        'scp': WithSCPDecorator,
+        'sftp': WithSFTPDecorator,
+    }
+
     def __init__(
         self,
-        ssh_connection
+        ssh_connection,
+        file_operations_decorator = WithSCPDecorator,
+        progress_callback = None
     ):
         """
         @param ssh_connection The SSH connection instance.
+        @param file_operations_decorator The FileOperationsDecorator class (or a factory that receives the connection), SCP by default.
+        @param {Callable} progress_callback The function called with the remote path, the transferred and total bytes and the rate of every transfer.
         """
         self.ssh_connection = ssh_connection
-        # We decorate the strategy with file transfer functionality with SCP
-        self.ssh_manager_with_scp = WithSCPDecorator(self.ssh_connection)
+        self.progress_callback = progress_callback
+        self.transfer_records: list[TransferRecord] = []
+        self.__records_lock = threading.Lock()
+        # We decorate the strategy with file transfer functionality (SCP by default)
+        self.ssh_manager_with_scp = file_operations_decorator(self.ssh_connection)
+
+    @staticmethod
+    def get_file_operations_decorator(protocol: str):
+        """
+        @param {str} protocol The name of the protocol (scp or sftp).
+
+        @returns The FileOperationsDecorator class of the protocol.
+        """
+        if protocol not in SCPFileTransfer.FILE_OPERATIONS_DECORATORS:
+            raise Exception(f'Unsupported file transfer protocol: { protocol }')
+        return SCPFileTransfer.FILE_OPERATIONS_DECORATORS[protocol]
 
     def get_file(
         self,
-        source_file
+        source_file,
+        destination_path: str = None
     ):
         """
         @param {str} source_file Path to the source file, including it's name and extension
+        @param {str} destination_path Local path (directory or file) where the file is stored (current directory by default).
 
-        Method that applies the WithSCPDecorator to the SSH connection to retrieve a file.
+        Method that applies the file operations decorator to the SSH connection to retrieve a file.
         """
         # We get the file
-        self.ssh_manager_with_scp.retrieve_file(source_file)
+        self.__measure_transfer(
+            source_file,
+            'get',
+            lambda progress: self.ssh_manager_with_scp.retrieve_file(source_file, destination_path, progress)
+        )
+
+    def get_file_object(
+        self,
+        source_file,
+        file_object = None,
+        max_memory_size: int = 1048576,
+        compressed: bool = False
+    ):
+        """
+        @param {str} source_file Path to the source file, including it's name and extension
+        @param {IO} file_object The binary file-like object where the file is written (a new spooled temporary file by default).
+        @param {int} max_memory_size The maximum size kept in memory by the default spooled temporary file (1MB by default).
+        @param {bool} compressed Flag to indicate that the file is compressed with gzip on the remote host (and decompressed on the fly).
+
+        Method that retrieves a file into a file-like object, without writing it to the local directory.
+
+        @returns {IO} The file-like object, rewound to its beginning.
+        """
+        if file_object == None:
+            file_object = tempfile.SpooledTemporaryFile(max_size = max_memory_size)
+        if compressed:
+            retrieve = lambda progress: self.ssh_manager_with_scp.retrieve_compressed_file_object(
+                source_file, file_object, progress_callback = progress
+            )
+        else:
+            retrieve = lambda progress: self.ssh_manager_with_scp.retrieve_file_object(source_file, file_object, progress)
+        self.__measure_transfer(source_file, 'get', retrieve, compressed)
+        file_object.seek(0)
+        return file_object
+
+    def get_compressed_file(
+        self,
+        source_file: str,
+        destination_path: str = None,
+        decompress: bool = True
+    ) -> str:
+        """
+        @param {str} source_file Path to the source file, including it's name and extension
+        @param {str} destination_path Local path (directory or file) where the file is stored (current directory by default).
+        @param {bool} decompress Flag to indicate that the file is decompressed on the fly (otherwise it is stored with the .gz extension).
+
+        Method that retrieves a file compressed with gzip on the remote host.
+
+        @returns {str} The local path of the file.
+        """
+        local_path = os.path.basename(source_file)
+        if destination_path:
+            local_path = os.path.join(destination_path, local_path) if os.path.isdir(destination_path) else destination_path
+        if not decompress and not local_path.endswith('.gz'):
+            local_path += '.gz'
+        try:
+            with open(local_path, 'wb') as local_file:
+                self.__measure_transfer(
+                    source_file,
+                    'get',
+                    lambda progress: self.ssh_manager_with_scp.retrieve_compressed_file_object(
+                        source_file, local_file, decompress, progress
+                    ),
+                    compressed = True
+                )
+        except Exception:
+            # We do not leave a partial file behind
+            if os.path.exists(local_path):
+                os.remove(local_path)
+            raise
+        return local_path
+
+    def get_files(
+        self,
+        source_files: list[str],
+        destination_path: str = None,
+        max_concurrency: int = SSHStrategy.MAX_CHANNELS
+    ):
+        """
+        @param {list} source_files Paths to the source files, including their names and extensions.
+        @param {str} destination_path Local directory where the files are stored (current directory by default).
+        @param {int} max_concurrency The maximum number of files transferred at the same time (MAX_CHANNELS of the strategy by default).
+
+        Method that retrieves several files concurrently, every one of them over its own channel of the SSH connection.
+        If any transfer fails, the first error is raised once all of them finished.
+        """
+        if not source_files:
+            return
+        max_workers = max(1, min(max_concurrency, len(source_files)))
+        with ThreadPoolExecutor(max_workers = max_workers, thread_name_prefix = 'scp_transfer') as executor:
+            futures = [
+                executor.submit(self.get_file, source_file, destination_path)
+                for source_file in source_files
+            ]
+        for future in futures:
+            future.result()
 
     def upload_file(
         self,
@@ -41,8 +182,51 @@ class SCPFileTransfer:
         @param {str} file_to_upload Path to the local file, where the file to upload is located, including it's name and extension
         @param {str} destination_path Remote path where the uploaded file will be installed.
 
-        Method that applies the WithSCPDecorator to the SSH connection to send a file.
+        Method that applies the file operations decorator to the SSH connection to send a file.
         """
-        self.ssh_manager_with_scp.send_file(file_to_upload, destination_path)
+        self.__measure_transfer(
+            destination_path,
+            'put',
+            lambda progress: self.ssh_manager_with_scp.send_file(file_to_upload, destination_path, progress)
+        )
+
+    # Internal helpers
+
+    def __measure_transfer(
+        self,
+        remote_path: str,
+        direction: str,
+        transfer,
+        compressed: bool = False
+    ):
+        """
+        Executes a transfer (a function that receives the progress callback of the decorator), reporting its progress
+        and collecting its TransferRecord even if it fails.
+        """
+        record = TransferRecord(
+            remote_path,
+            direction,
+            getattr(self.ssh_manager_with_scp, 'PROTOCOL', None) or type(self.ssh_manager_with_scp).__name__,
+            compressed
+        )
+        start_time = time.monotonic()
+
+        def report_progress(transferred_bytes: int, total_bytes: int = None):
+            record.transferred_bytes = transferred_bytes
+            record.size = total_bytes if total_bytes != None else transferred_bytes
+            if self.progress_callback:
+                elapsed_time = time.monotonic() - start_time
+                rate = transferred_bytes / elapsed_time if elapsed_time > 0 else 0
+                self.progress_callback(remote_path, transferred_bytes, total_bytes, rate)
+
+        try:
+            return transfer(report_progress)
+        except Exception:
+            record.succeeded = False
+            raise
+        finally:
+            record.duration = time.monotonic() - start_time
+            with self.__records_lock:
+                self.transfer_records.append(record)
 
 
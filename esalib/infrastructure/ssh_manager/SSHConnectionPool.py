@@ -0,0 +1,239 @@
+import threading
+import time
+# SSH
+from .SSHSession import SSHSession
+from .strategy.ParamikoStrategy import ParamikoStrategy
+
+
+class SSHConnectionPool:
+    """
+    @version 1.1.1
+
+    Thread-safe pool of SSH sessions keyed by (host, port, user, compression), the connections with SSH transport
+    compression are not shared with the uncompressed ones. Every session has its own strategy, channel and
+    output buffer, so a single process can talk to several devices at the same time.
+    A session is borrowed with checkout and given back with release (to be reused) or discard (to close it).
+    The pool is bounded by max_size, the idle sessions are closed once idle_timeout is reached and the sessions
+    are health-checked before being handed out again.
+    A default pool is provided (get_default_pool) to be shared by all the agents of the process.
+    """
+    # Default pool instance (Singleton)
+    __default_pool = None
+    __default_pool_lock = threading.Lock()
+
+    def __init__(
+        self,
+        max_size: int = 32,
+        idle_timeout: float = 300,
+        checkout_timeout: float = 30,
+        strategy_class = ParamikoStrategy
+    ):
+        """
+        @param {int} max_size The maximum number of sessions (idle and borrowed) in the pool.
+        @param {float} idle_timeout The number of seconds that a session can be idle before being closed.
+        @param {float} checkout_timeout The maximum number of seconds to wait for a free slot when the pool is full.
+        @param {class} strategy_class The SSH strategy class used to create the new sessions (ParamikoStrategy by default).
+        """
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.checkout_timeout = checkout_timeout
+        self.strategy_class = strategy_class
+        # Internal state
+        self.__condition = threading.Condition()
+        self.__idle_sessions: dict[tuple, list[SSHSession]] = {}
+        self.__borrowed_sessions: set[SSHSession] = set()
+        # Number of sessions that are being connected (slots reserved outside the lock)
+        self.__pending_connections = 0
+
+    @staticmethod
+    def get_default_pool() -> 'SSHConnectionPool':
+        """
+        Method to get the default pool instance, it is created the first time it is requested.
+
+        @returns {SSHConnectionPool}
+        """
+        with SSHConnectionPool.__default_pool_lock:
+            if not SSHConnectionPool.__default_pool:
+                SSHConnectionPool.__default_pool = SSHConnectionPool()
+            return SSHConnectionPool.__default_pool
+
+    @staticmethod
+    def get_session_key(host_options: dict) -> tuple:
+        """
+        @param {dict} host_options The options to start the connection with the remote host.
+
+        @returns {tuple} The key of the session (host, port, user, compression).
+        """
+        return (
+            host_options.get('hostname'),
+            int(host_options.get('port', 22)),
+            host_options.get('username'),
+            bool(host_options.get('compress', False)),
+        )
+
+    def checkout(self, host_options: dict) -> SSHSession:
+        """
+        @param {dict} host_options The options to start the connection with the remote host.
+
+        Borrows a session for the host. An idle session is reused if it passes the health check, otherwise a new
+        connection is started. If the pool is full, the least recently used idle session is closed to make room,
+        and if every session is borrowed, we wait until one is given back (up to checkout_timeout).
+
+        @returns {SSHSession} The borrowed session.
+        """
+        key = self.get_session_key(host_options)
+        deadline = time.monotonic() + self.checkout_timeout
+        # The evicted and dead sessions are closed once the lock is released, a slow disconnect must not block the pool
+        sessions_to_close = []
+        try:
+            with self.__condition:
+                while True:
+                    sessions_to_close.extend(self.__evict_idle_sessions())
+                    session = self.__pop_idle_session(key)
+                    if session:
+                        # Health check, the dead sessions are discarded
+                        if session.is_alive():
+                            self.__borrowed_sessions.add(session)
+                            session.touch()
+                            return session
+                        sessions_to_close.append(session)
+                        continue
+                    # We reserve a slot for the new connection
+                    if self.__get_size() < self.max_size:
+                        self.__pending_connections += 1
+                        break
+                    session = self.__evict_least_recently_used_idle_session()
+                    if session:
+                        sessions_to_close.append(session)
+                        continue
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise Exception('No SSH sessions available in the pool')
+                    self.__condition.wait(remaining)
+        finally:
+            self.__close_sessions(sessions_to_close)
+        # We connect outside the lock, to not block the other hosts during the handshake
+        session = SSHSession(self.strategy_class(host_options), key)
+        try:
+            session.connect()
+        except Exception:
+            with self.__condition:
+                self.__pending_connections -= 1
+                self.__condition.notify()
+            raise
+        with self.__condition:
+            self.__pending_connections -= 1
+            self.__borrowed_sessions.add(session)
+        return session
+
+    def release(self, session: SSHSession):
+        """
+        @param {SSHSession} session The borrowed session.
+
+        Gives back a session to the pool, so that it can be reused by another agent for the same host.
+        """
+        if not session:
+            return
+        session.reset()
+        with self.__condition:
+            self.__borrowed_sessions.discard(session)
+            self.__idle_sessions.setdefault(session.key, []).append(session)
+            self.__condition.notify()
+
+    def discard(self, session: SSHSession):
+        """
+        @param {SSHSession} session The borrowed session.
+
+        Closes a session and removes it from the pool.
+        """
+        if not session:
+            return
+        with self.__condition:
+            self.__borrowed_sessions.discard(session)
+            self.__condition.notify()
+        self.__close_session(session)
+
+    def evict_idle_sessions(self):
+        """
+        Closes the sessions that have been idle for longer than idle_timeout.
+        """
+        with self.__condition:
+            expired_sessions = self.__evict_idle_sessions()
+        self.__close_sessions(expired_sessions)
+
+    def close_all(self):
+        """
+        Closes all the idle sessions and forgets the borrowed ones (which must be closed by their borrowers).
+        """
+        with self.__condition:
+            idle_sessions = [session for sessions in self.__idle_sessions.values() for session in sessions]
+            self.__idle_sessions = {}
+            self.__borrowed_sessions = set()
+            self.__condition.notify_all()
+        self.__close_sessions(idle_sessions)
+
+    def get_size(self) -> int:
+        """
+        @returns {int} The number of sessions in the pool (idle and borrowed).
+        """
+        with self.__condition:
+            return self.__get_size()
+
+    # Internal helpers (the lock must be acquired by the caller)
+
+    def __get_size(self) -> int:
+        """Returns the number of sessions in the pool, including the ones being connected."""
+        idle_sessions = sum(len(sessions) for sessions in self.__idle_sessions.values())
+        return idle_sessions + len(self.__borrowed_sessions) + self.__pending_connections
+
+    def __pop_idle_session(self, key: tuple) -> SSHSession:
+        """Returns the most recently used idle session for the key, if any."""
+        sessions = self.__idle_sessions.get(key)
+        if not sessions:
+            return None
+        session = sessions.pop()
+        if not sessions:
+            del self.__idle_sessions[key]
+        return session
+
+    def __evict_idle_sessions(self) -> list[SSHSession]:
+        """Removes the sessions whose idle time is over, they are returned to be closed outside the lock."""
+        now = time.monotonic()
+        evicted_sessions = []
+        for key in list(self.__idle_sessions.keys()):
+            sessions = self.__idle_sessions[key]
+            expired_sessions = [session for session in sessions if now - session.last_used >= self.idle_timeout]
+            if not expired_sessions:
+                continue
+            self.__idle_sessions[key] = [session for session in sessions if session not in expired_sessions]
+            if not self.__idle_sessions[key]:
+                del self.__idle_sessions[key]
+            evicted_sessions.extend(expired_sessions)
+        return evicted_sessions
+
+    def __evict_least_recently_used_idle_session(self) -> SSHSession:
+        """Removes the least recently used idle session and returns it to be closed outside the lock (None if there are no idle sessions)."""
+        idle_sessions = [session for sessions in self.__idle_sessions.values() for session in sessions]
+        if not idle_sessions:
+            return None
+        session = min(idle_sessions, key = lambda idle_session: idle_session.last_used)
+        self.__idle_sessions[session.key].remove(session)
+        if not self.__idle_sessions[session.key]:
+            del self.__idle_sessions[session.key]
+        return session
+
+    # Internal helpers (the lock must not be held by the caller)
+
+    @classmethod
+    def __close_sessions(cls, sessions: list[SSHSession]):
+        """Closes the evicted sessions."""
+        for session in sessions:
+            cls.__close_session(session)
+
+    @staticmethod
+    def __close_session(session: SSHSession):
+        """Closes a session, ignoring the errors of already dropped connections."""
+        try:
+            session.disconnect()
+        except Exception:
+            pass
@@ -1,23 +1,25 @@
 # SSH
 from .SSHConnection import SSHConnection
+from .SSHSession import SSHSession
+from .readers.CommandStream import CommandStream
 from .strategy.ParamikoStrategy import ParamikoStrategy
 # Strategy contract
 from .strategy.SSHStrategy import SSHStrategy
 
 class SSHManager:
     """
-    @version 3.5.1
+    @version 3.11.1
     
     Class to establish an SSH connection with a device implementing the Singleton pattern, to keep a single 
     instance of the connection through all the process. 
     It is also a container for the different strategies, to support various implementations or libraries. 
-    Finally, it also provides a functionality to keep the output of the entered commands in a buffer, 
-    which can also be cleared or retrieved on demand.
+    Finally, it also provides a functionality to keep the output of the entered commands in a bounded buffer, 
+    which can also be cleared or retrieved on demand (whole, per command or only its last characters or lines).
+    The actual work is delegated to a single SSHSession, to handle several hosts at the same time use the
+    SSHConnectionPool instead.
     """
-    # Strategy static parameter
-    __strategy = None
-    # Reference to SSH connection
-    __connection = None
+    # Session static parameter (strategy, connection and output buffer)
+    __session: SSHSession = None
 
     @staticmethod
     def initialize(
@@ -29,8 +31,7 @@ class SSHManager:
         Method to set the instance in a Singleton-compliant way, so that this can be invoked anywhere and,
         ideally, only once.
         """
-        SSHManager.buffer = ''
-        SSHManager.__strategy = strategy
+        SSHManager.__session = SSHSession(strategy)
         # We set the connection for the provided strategy
         SSHManager.__set_connection()
 
@@ -45,8 +46,7 @@ class SSHManager:
         ideally, only once. It is an alternate way of initializing the SSH manager without a concrete strategy
         it defaults to the Paramiko, so it only receives the host options for that strategy.
         """
-        SSHManager.buffer = ''
-        SSHManager.__strategy = ParamikoStrategy(host_options)
+        SSHManager.__session = SSHSession(ParamikoStrategy(host_options))
         # We set the connection for the provided strategy
         SSHManager.__set_connection() 
 
@@ -57,7 +57,7 @@ class SSHManager:
         
         Method to set the SSH strategy to apply (basically related to the library in use)
         """
-        SSHManager.__strategy = strategy
+        SSHManager.__session = SSHSession(strategy)
         # We set the connection once again, using the new strategy
         SSHManager.__set_connection()
 
@@ -68,23 +68,23 @@ class SSHManager:
 
         @returns {SSHStrategy}
         """
-        return SSHManager.__strategy
+        return SSHManager.__session.get_strategy() if SSHManager.__session else None
 
     @staticmethod
-    def __connect():
+    def get_session() -> SSHSession:
         """
-        Method to start the connection.
+        Method to get the session that holds the strategy, connection and output buffer.
 
-        @returns {object} SSH connection.
+        @returns {SSHSession}
         """
-        return SSHManager.__strategy.connect()
+        return SSHManager.__session
 
     @staticmethod
     def disconnect():
         """
         Method to close the connection.
         """
-        SSHManager.__strategy.disconnect()
+        SSHManager.__session.disconnect()
         SSHConnection.set_connection(None)
 
     @staticmethod
@@ -94,10 +94,8 @@ class SSHManager:
         """
         # We set the connection instance in the Singleton container (SSHConnection)
         SSHConnection.set_connection(
-            SSHManager.__connect() if SSHManager.__strategy else None
+            SSHManager.__session.connect() if SSHManager.__session.get_strategy() else None
         )
-        # We set the connection reference locally
-        SSHManager.__connection = SSHConnection.get_connection()
 
     @staticmethod
     def get_connection():
@@ -106,31 +104,62 @@ class SSHManager:
 
         @returns {object} SSH connection.
         """
-        return SSHManager.__connection
+        return SSHManager.__session.get_connection() if SSHManager.__session else None
     
     @staticmethod
     def exec_command(
         command: str, 
         return_output: bool = True,
-        clear_buffer_before: bool = True
+        clear_buffer_before: bool = True,
+        idempotent: bool = False
     ):
         """
         @param {str} command The command to execute.
         @param {bool} return_output Flag to indicate that the output of the command is returned (enabled by default).
         @param {bool} clear_buffer_befor Flag to indicate that the output buffer should be cleared before the execution 
         of that command, to get the output relative to that command only (enabled by default).
+        @param {bool} idempotent Flag to indicate that the command can be executed again if the connection is restarted.
         
         Method to execute a command. It writes the result to the buffer.
         """
-        # We validate the startegy existance before executing the command
-        if not SSHManager.__strategy:
-            raise Exception('Strategy must be specified.')
-        # We clear the output buffer (unless it is disabled)
-        if clear_buffer_before: SSHManager.clear_buffer()
-        # We execute the command and store the output
-        SSHManager.buffer += SSHManager.__strategy.execute_command(command)
-        # We return the output unless it was not indicated
-        if return_output: return SSHManager.buffer
+        return SSHManager.__get_session().exec_command(command, return_output, clear_buffer_before, idempotent)
+
+    @staticmethod
+    def exec_commands(
+        commands: list[str],
+        max_channels: int = SSHStrategy.MAX_CHANNELS,
+        idempotent: bool = False
+    ) -> list[str]:
+        """
+        @param {list} commands The commands to execute (they must be independent, like read-only diagnostics).
+        @param {int} max_channels The maximum number of channels open at the same time (MAX_CHANNELS of the strategy by default).
+        @param {bool} idempotent Flag to indicate that the commands can be executed again if the connection is restarted.
+
+        Method to execute several commands concurrently, on separate channels of the same connection.
+
+        @returns {list} The output of every command.
+        """
+        return SSHManager.__get_session().exec_commands(commands, max_channels, idempotent)
+
+    @staticmethod
+    def stream_command(
+        command: str,
+        stop_on = None,
+        timeout: float = None,
+        idempotent: bool = False
+    ) -> CommandStream:
+        """
+        @param {str} command The command to execute.
+        @param {str|Pattern} stop_on Text or compiled regex that stops the command once an output line matches it.
+        @param {float} timeout The maximum number of seconds to wait for new data (no limit by default).
+        @param {bool} idempotent Flag to indicate that the command can be started again if the connection is restarted.
+
+        Method to execute a command streaming its output (it is not written to the buffer), so huge outputs are
+        processed in constant memory.
+
+        @returns {CommandStream} The stream of the output, iterable by lines (or by byte chunks via iter_chunks).
+        """
+        return SSHManager.__get_session().stream_command(command, stop_on, timeout, idempotent)
 
     @staticmethod
     def exec_async_command(
@@ -147,17 +176,26 @@ class SSHManager:
 
         Method to execute an async command (a command whose output may be delayed).
         """
-        # We validate the startegy existance before executing the command
-        if not SSHManager.__strategy:
-            raise Exception('Strategy must be specified.')
-        # We execute the command and return the output
-        return SSHManager.__strategy.execute_async_command(
+        return SSHManager.__get_session().exec_async_command(
             command,
             terminal_delimiter,
             close_channel_after,
             more_output_delimiter
         )
 
+    @staticmethod
+    def exec_async_commands(
+        commands: list[tuple],
+        more_output_delimiter: str = '-Press Any Key For More-'
+    ) -> list[str]:
+        """
+        @param {list} commands The (command, terminal_delimiter[, may_page]) tuples to execute.
+        @param {str} more_output_delimiter The string that indicates us that some parts of the output were hidden.
+
+        Method to execute a batch of async commands, pipelined if the strategy supports it.
+        """
+        return SSHManager.__get_session().exec_async_commands(commands, more_output_delimiter)
+
     @staticmethod
     def set_channel_properties(
         timeout: float,
@@ -171,11 +209,7 @@ class SSHManager:
 
         Sets the channel properties at strategy level.
         """
-        # We validate the startegy existance before executing the command
-        if not SSHManager.__strategy:
-            raise Exception('Strategy must be specified.')
-        # We set the properties at channel level
-        SSHManager.__strategy.set_channel_properties(
+        SSHManager.__get_session().set_channel_properties(
             timeout,
             sleep_time,
             buffer_size
@@ -189,11 +223,55 @@ class SSHManager:
 
         @returns {str} The output buffer.
         """
-        return SSHManager.buffer
+        return SSHManager.__get_session().get_output()
+
+    @staticmethod
+    def get_command_output(index: int = -1) -> str:
+        """
+        @param {int} index The position of the command in the output buffer (the last one by default).
+
+        Method to return the output of a single command, without rebuilding the whole buffer.
+
+        @returns {str}
+        """
+        return SSHManager.__get_session().get_command_output(index)
+
+    @staticmethod
+    def get_output_tail(size: int) -> str:
+        """
+        @param {int} size The number of characters to return.
+
+        Method to return the last characters of the output buffer.
+
+        @returns {str}
+        """
+        return SSHManager.__get_session().get_output_tail(size)
+
+    @staticmethod
+    def get_output_tail_lines(lines: int) -> list[str]:
+        """
+        @param {int} lines The number of lines to return.
+
+        Method to return the last lines of the output buffer.
+
+        @returns {list}
+        """
+        return SSHManager.__get_session().get_output_tail_lines(lines)
 
     @staticmethod
     def clear_buffer():
         """
         Method to clear the output buffer
         """
-        SSHManager.buffer = ''
+        SSHManager.__get_session().clear_buffer()
+
+    @staticmethod
+    def __get_session() -> SSHSession:
+        """
+        Method to get the session, validating the strategy existance before executing any command.
+
+        @returns {SSHSession}
+        """
+        if not SSHManager.__session:
+            raise Exception('Strategy must be specified.')
+        return SSHManager.__session
@@ -0,0 +1,398 @@
+import time
+# Strategy contract
+from .strategy.SSHStrategy import SSHStrategy
+# Output store
+from .buffers.OutputBuffer import OutputBuffer
+from .readers.CommandStream import CommandStream
+# Utils
+from ...utils.logger.Logger import Logger
+from ...utils.validators.IteratorValidator import IteratorValidator, IterationLimitReached
+
+
+class SSHSessionReconnected(Exception):
+    """Custom exception to raise when the connection was lost while executing a command that cannot be repeated blindly, and it was restarted."""
+    def __init__(self, command: str):
+        super().__init__(f'[ERROR]: The SSH connection was lost while executing [{ command }], it was restarted.')
+
+
+class SSHSession:
+    """
+    @version 1.7.1
+
+    Container for the SSH connection with a single host. It keeps its own strategy, connection and output buffer,
+    so that several hosts can be handled from the same process (see SSHConnectionPool).
+    It provides the same command execution methods as the SSHManager, but at instance level.
+    The output of the commands is kept in a bounded OutputBuffer, which also gives access to the output of a single
+    command and to the last characters or lines.
+    If the connection is lost, it is restarted with exponential backoff (auto_reconnect), and SSHSessionReconnected is
+    raised, because the command may have been executed already (and the shell state is lost), so only the caller knows
+    if it can be repeated. The exec commands flagged as idempotent (like the read-only diagnostics) are executed again.
+    """
+
+    def __init__(
+        self,
+        strategy: SSHStrategy,
+        key: tuple = None,
+        output_buffer: OutputBuffer = None
+    ):
+        """
+        @param {SSHStrategy} strategy Strategy to use as SSH implementation.
+        @param {tuple} key The key that identifies the session in the pool (host, port, user, compression).
+        @param {OutputBuffer} output_buffer The store for the output of the commands (a 1M characters buffer by default).
+        """
+        self.strategy: SSHStrategy = strategy
+        self.key: tuple = key
+        self.connection = None
+        self.buffer: OutputBuffer = output_buffer if output_buffer != None else OutputBuffer()
+        # Monotonic time of the last usage, used for the idle timeout eviction
+        self.last_used: float = time.monotonic()
+        # Reconnection policy and statistics
+        self.auto_reconnect: bool = True
+        self.reconnect_attempts: int = 5
+        self.reconnect_base_delay: float = 1
+        self.reconnect_max_delay: float = 30
+        self.reconnect_count: int = 0
+        self.downtime: float = 0
+
+    def connect(self):
+        """
+        Method to start the connection via the strategy.
+
+        @returns {object} SSH connection.
+        """
+        self.connection = self.strategy.connect()
+        return self.connection
+
+    def disconnect(self):
+        """
+        Method to close the connection.
+        """
+        if self.connection:
+            self.strategy.disconnect()
+        self.connection = None
+
+    def get_connection(self):
+        """
+        Method to get the connection instance reference.
+
+        @returns {object} SSH connection.
+        """
+        return self.connection
+
+    def get_strategy(self) -> SSHStrategy:
+        """
+        Method to get the SSH strategy of the session.
+
+        @returns {SSHStrategy}
+        """
+        return self.strategy
+
+    def is_alive(self) -> bool:
+        """
+        Health check of the session, it validates that the connection is set and that the strategy considers it alive.
+
+        @returns {bool}
+        """
+        if not self.connection:
+            return False
+        try:
+            return self.strategy.is_connection_alive()
+        except Exception:
+            return False
+
+    def reconnect(self):
+        """
+        Restarts the connection with the same strategy, retrying with exponential backoff and jitter. The time
+        without connection and the number of reconnections are recorded (the failed ones included). If every attempt
+        fails, the exception of the last one is raised.
+
+        @returns {object} SSH connection.
+        """
+        start_time = time.monotonic()
+        try:
+            self.strategy.disconnect()
+        except Exception:
+            pass
+        self.connection = None
+        attempts = IteratorValidator.iterator_with_backoff(
+            self.reconnect_attempts, 
+            self.reconnect_base_delay, 
+            self.reconnect_max_delay
+        )
+        last_exception = None
+        try:
+            for attempt in attempts:
+                try:
+                    self.connect()
+                    break
+                except Exception as exception:
+                    last_exception = exception
+                    Logger.warning(f'Reconnection attempt { attempt + 1 } failed: { exception }')
+        except IterationLimitReached as exception:
+            raise last_exception if last_exception != None else exception
+        finally:
+            self.reconnect_count += 1
+            self.downtime += time.monotonic() - start_time
+        Logger.info(f'SSH connection restarted after { time.monotonic() - start_time:.1f}s.')
+        return self.connection
+
+    def reconnect_if_dead(self) -> bool:
+        """
+        Restarts the connection if it is dead and the auto reconnection is enabled.
+
+        @returns {bool} True if the connection was restarted.
+        """
+        if not self.auto_reconnect or not self.connection or self.is_alive():
+            return False
+        Logger.warning('The SSH connection was lost, reconnecting.')
+        self.reconnect()
+        return True
+
+    def is_channel_open(self) -> bool:
+        """
+        Determines if the interactive channel of the strategy is still open.
+
+        @returns {bool}
+        """
+        return self.strategy.is_channel_open()
+
+    def reset(self):
+        """
+        Resets the session to a clean state (without interactive channel and with an empty buffer), so that it can
+        be borrowed again from the pool.
+        """
+        self.strategy.close_channel()
+        self.clear_buffer()
+        self.touch()
+
+    def touch(self):
+        """
+        Updates the last usage time of the session.
+        """
+        self.last_used = time.monotonic()
+
+    def exec_command(
+        self,
+        command: str,
+        return_output: bool = True,
+        clear_buffer_before: bool = True,
+        idempotent: bool = False
+    ):
+        """
+        @param {str} command The command to execute.
+        @param {bool} return_output Flag to indicate that the output of the command is returned (enabled by default).
+        @param {bool} clear_buffer_before Flag to indicate that the output buffer should be cleared before the execution
+        of that command, to get the output relative to that command only (enabled by default).
+        @param {bool} idempotent Flag to indicate that the command can be executed again if the connection is restarted.
+
+        Method to execute a command. It writes the result to the buffer, whose bound only limits the kept history:
+        the output of the command is returned in full.
+        """
+        self.__validate_strategy()
+        self.touch()
+        # We clear the output buffer (unless it is disabled)
+        if clear_buffer_before: self.clear_buffer()
+        # We execute the command and store the output
+        output = self.__execute_with_reconnect(idempotent, command, self.strategy.execute_command, command)
+        self.buffer.append(output, command)
+        # We return the output unless it was not indicated (the buffered history only if it was not cleared before)
+        if return_output: return output if clear_buffer_before else self.buffer.get_value()
+
+    def exec_commands(
+        self,
+        commands: list[str],
+        max_channels: int = SSHStrategy.MAX_CHANNELS,
+        idempotent: bool = False
+    ) -> list[str]:
+        """
+        @param {list} commands The commands to execute (they must be independent, like read-only diagnostics).
+        @param {int} max_channels The maximum number of channels open at the same time (MAX_CHANNELS of the strategy by default).
+        @param {bool} idempotent Flag to indicate that the commands can be executed again if the connection is restarted.
+
+        Method to execute several commands concurrently over the same connection (if the strategy supports it).
+        The output of every command is written to the buffer, in the same order as the commands.
+
+        @returns {list} The output of every command.
+        """
+        self.__validate_strategy()
+        self.touch()
+        outputs = self.__execute_with_reconnect(
+            idempotent, ', '.join(commands), self.strategy.execute_commands, commands, max_channels
+        )
+        for command, output in zip(commands, outputs):
+            self.buffer.append(output, command)
+        return outputs
+
+    def stream_command(
+        self,
+        command: str,
+        stop_on = None,
+        timeout: float = None,
+        idempotent: bool = False
+    ) -> CommandStream:
+        """
+        @param {str} command The command to execute.
+        @param {str|Pattern} stop_on Text or compiled regex that stops the command once an output line matches it.
+        @param {float} timeout The maximum number of seconds to wait for new data (no limit by default).
+        @param {bool} idempotent Flag to indicate that the command can be started again if the connection is restarted.
+
+        Method to execute a command streaming its output (it is not written to the buffer).
+
+        @returns {CommandStream} The stream of the output, iterable by lines (or by byte chunks via iter_chunks).
+        """
+        self.__validate_strategy()
+        self.touch()
+        return self.__execute_with_reconnect(idempotent, command, self.strategy.stream_command, command, stop_on, timeout)
+
+    def exec_async_command(
+        self,
+        command: str,
+        terminal_delimiter: str = '~$',
+        close_channel_after: bool = False,
+        more_output_delimiter: str = '-Press Any Key For More-'
+    ):
+        """
+        @param {str} command The command to execute.
+        @param {str} terminal_delimiter The characters sequence that comes before the cursor at the terminal (like ~$ in Linux).
+        @param {bool} close_channel_after Flag to indicate if the channel should be closed after the command execution.
+        @param {str} more_output_delimiter The string that indicates us that some parts of the output were hidden.
+
+        Method to execute an async command (a command whose output may be delayed).
+        """
+        self.__validate_strategy()
+        self.touch()
+        try:
+            return self.strategy.execute_async_command(
+                command,
+                terminal_delimiter,
+                close_channel_after,
+                more_output_delimiter
+            )
+        except Exception:
+            if not self.reconnect_if_dead():
+                raise
+            raise SSHSessionReconnected(command)
+
+    def exec_async_commands(
+        self,
+        commands: list[tuple],
+        more_output_delimiter: str = '-Press Any Key For More-'
+    ) -> list[str]:
+        """
+        @param {list} commands The (command, terminal_delimiter[, may_page]) tuples to execute.
+        @param {str} more_output_delimiter The string that indicates us that some parts of the output were hidden.
+
+        Method to execute a batch of async commands, pipelined if the strategy supports it.
+
+        @returns {list} The output of every command.
+        """
+        self.__validate_strategy()
+        self.touch()
+        try:
+            return self.strategy.execute_async_commands(commands, more_output_delimiter)
+        except Exception:
+            if not self.reconnect_if_dead():
+                raise
+            raise SSHSessionReconnected(', '.join(command[0] for command in commands))
+
+    def set_channel_properties(
+        self,
+        timeout: float,
+        sleep_time: float,
+        buffer_size: int
+    ):
+        """
+        @param {float} timeout The maximum number of seconds to wait before resolution.
+        @param {float} sleep_time The number of seconds to wait before reading the buffer again, when waiting for an output.
+        @param {int} buffer_size The number of bytes to read from the channel output.
+
+        Sets the channel properties at strategy level.
+        """
+        self.__validate_strategy()
+        self.strategy.set_channel_properties(
+            timeout,
+            sleep_time,
+            buffer_size
+        )
+
+    def get_output(self) -> str:
+        """
+        Method to return the output buffer.
+
+        @returns {str} The output buffer.
+        """
+        return self.buffer.get_value()
+
+    def get_command_output(self, index: int = -1) -> str:
+        """
+        @param {int} index The position of the command in the output buffer (the last one by default).
+
+        Method to return the output of a single command, without rebuilding the whole buffer.
+
+        @returns {str}
+        """
+        return self.buffer.get_command_output(index)
+
+    def get_output_tail(self, size: int) -> str:
+        """
+        @param {int} size The number of characters to return.
+
+        Method to return the last characters of the output buffer.
+
+        @returns {str}
+        """
+        return self.buffer.get_tail(size)
+
+    def get_output_tail_lines(self, lines: int) -> list[str]:
+        """
+        @param {int} lines The number of lines to return.
+
+        Method to return the last lines of the output buffer.
+
+        @returns {list}
+        """
+        return self.buffer.get_tail_lines(lines)
+
+    def get_output_buffer(self) -> OutputBuffer:
+        """
+        Method to get the output store of the session.
+
+        @returns {OutputBuffer}
+        """
+        return self.buffer
+
+    def clear_buffer(self):
+        """
+        Method to clear the output buffer
+        """
+        self.buffer.clear()
+
+    # Internal helpers
+
+    def __execute_with_reconnect(
+        self,
+        idempotent: bool,
+        command: str,
+        function,
+        *args
+    ):
+        """
+        Executes an exec channel operation. If it failed because the connection was lost and it could be restarted,
+        it is executed again if it is idempotent, otherwise SSHSessionReconnected is raised (the command may have been
+        executed before the connection was lost).
+        """
+        try:
+            return function(*args)
+        except Exception:
+            if not self.reconnect_if_dead():
+                raise
+            if not idempotent:
+                raise SSHSessionReconnected(command)
+            return function(*args)
+
+    def __validate_strategy(self):
+        """
+        Validates the strategy existance before executing any command.
+        """
+        if not self.strategy:
+            raise Exception('Strategy must be specified.')
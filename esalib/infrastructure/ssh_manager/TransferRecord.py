@@ -0,0 +1,30 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class TransferRecord:
+    """Class to encapsulate the statistics of a single file transfer."""
+    remote_path: str
+    # Direction of the transfer (get or put)
+    direction: str
+    # Protocol of the transfer (scp or sftp)
+    protocol: str
+    compressed: bool = False
+    # Bytes of the file, and bytes on the wire (fewer for the compressed transfers)
+    size: int = 0
+    transferred_bytes: int = 0
+    duration: float = 0
+    retries: int = 0
+    succeeded: bool = True
+
+    def get_throughput(self) -> float:
+        """Returns the bytes on the wire per second."""
+        return self.transferred_bytes / self.duration if self.duration > 0 else 0
+
+    def __str__(self) -> str:
+        return (
+            f'{ self.direction } { self.remote_path } ({ self.protocol }{ ", compressed" if self.compressed else "" }): '
+            f'{ self.size } bytes, { self.transferred_bytes } on the wire in { self.duration:.2f}s '
+            f'({ self.get_throughput() / 1024:.1f} KB/s){ f", { self.retries } retries" if self.retries else "" }'
+            f'{ "" if self.succeeded else ", failed" }'
+        )
@@ -0,0 +1,262 @@
+import tempfile
+from bisect import bisect_left, bisect_right
+from collections import deque
+
+
+class OutputBuffer:
+    """
+    @version 1.1.0
+
+    Bounded store for the output of the executed commands. The output is kept as a list of chunks (one per append)
+    instead of a single string, so appending does not copy the previous output.
+    Once the retained output exceeds $max_size characters the oldest chunks are evicted: they are dropped, or written
+    to a temporary file if $spill_to_file is enabled (the memory usage stays bounded and the whole output is still
+    available). The start and end offsets of every command output are recorded, so the output of a single command,
+    or the last characters or lines, can be retrieved without rebuilding the whole buffer.
+    The offsets are absolute positions (number of characters appended since the last clear). The spilled chunks are
+    stored as UTF-8 bytes and the byte position of every chunk is recorded, so a slice of the spilled output is read
+    by seeking to its first chunk instead of reading the file from its beginning.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 1048576,
+        spill_to_file: bool = False,
+        max_commands: int = 1024
+    ):
+        """
+        @param {int} max_size The maximum number of characters kept in memory (1M by default).
+        @param {bool} spill_to_file Flag to indicate that the evicted chunks are written to a temporary file instead of dropped.
+        @param {int} max_commands The maximum number of command slices recorded.
+        """
+        self.max_size: int = max_size
+        self.spill_to_file: bool = spill_to_file
+        self.max_commands: int = max_commands
+        self.__chunks: deque[str] = deque()
+        # Absolute offset of the first chunk kept in memory, and number of characters kept in memory
+        self.__memory_start: int = 0
+        self.__memory_size: int = 0
+        # Absolute offset of the first character available (in the spill file or in memory)
+        self.__first_offset: int = 0
+        self.__spill_file = None
+        # Absolute offset and byte position of every spilled chunk, and size of the spill file in bytes
+        self.__spill_offsets: list[int] = []
+        self.__spill_positions: list[int] = []
+        self.__spill_size: int = 0
+        # (command, start offset, end offset) of the latest commands
+        self.__commands: deque[tuple] = deque(maxlen = max_commands)
+
+    def append(
+        self,
+        text: str,
+        command: str = None
+    ) -> None:
+        """
+        @param {str} text The output to add to the buffer.
+        @param {str} command The command that produced the output, to record its slice.
+        """
+        start = self.get_end_offset()
+        if text:
+            self.__chunks.append(text)
+            self.__memory_size += len(text)
+            self.__evict_chunks()
+        self.__commands.append((command, start, start + len(text)))
+
+    def get_value(self) -> str:
+        """
+        Returns the whole output available (the spilled output included).
+
+        @returns {str}
+        """
+        return self.__read_spill_file(self.__first_offset, self.__memory_start) + ''.join(self.__chunks)
+
+    def get_slice(
+        self,
+        start: int,
+        end: int = None
+    ) -> str:
+        """
+        @param {int} start The absolute offset of the first character.
+        @param {int} end The absolute offset after the last character (the end of the buffer by default).
+
+        Returns the output between two absolute offsets. The characters that were already dropped are not returned.
+
+        @returns {str}
+        """
+        end = self.get_end_offset() if end == None else min(end, self.get_end_offset())
+        start = max(start, self.__first_offset)
+        if start >= end:
+            return ''
+        output = self.__read_spill_file(start, min(end, self.__memory_start)) if start < self.__memory_start else ''
+        # Only the chunks that overlap the requested range are joined
+        offset = self.__memory_start
+        parts = []
+        for chunk in self.__chunks:
+            chunk_end = offset + len(chunk)
+            if chunk_end > start and offset < end:
+                parts.append(chunk[max(0, start - offset):end - offset])
+            if chunk_end >= end:
+                break
+            offset = chunk_end
+        return output + ''.join(parts)
+
+    def get_tail(self, size: int) -> str:
+        """
+        @param {int} size The number of characters to return.
+
+        Returns the last characters of the output, reading only the required chunks.
+
+        @returns {str}
+        """
+        parts = []
+        remaining = size
+        for chunk in reversed(self.__chunks):
+            if remaining <= 0:
+                break
+            parts.append(chunk[-remaining:])
+            remaining -= len(chunk)
+        output = ''.join(reversed(parts))
+        if remaining > 0 and self.__memory_start > self.__first_offset:
+            output = self.__read_spill_file(max(self.__first_offset, self.__memory_start - remaining), self.__memory_start) + output
+        return output
+
+    def get_tail_lines(self, lines: int) -> list[str]:
+        """
+        @param {int} lines The number of lines to return.
+
+        Returns the last lines of the output, reading backwards only the chunks required to get them.
+
+        @returns {list}
+        """
+        if lines <= 0:
+            return []
+        parts = []
+        line_breaks = 0
+        for chunk in reversed(self.__chunks):
+            parts.append(chunk)
+            line_breaks += chunk.count('\n')
+            # An extra line break is required, because the output may end with a line break
+            if line_breaks > lines:
+                break
+        output = ''.join(reversed(parts))
+        if line_breaks <= lines and self.__memory_start > self.__first_offset:
+            output = self.get_value()
+        return output.splitlines()[-lines:]
+
+    def get_command_output(self, index: int = -1) -> str:
+        """
+        @param {int} index The position of the command in the recorded commands (the last one by default).
+
+        Returns the output of a single command.
+
+        @returns {str}
+        """
+        if not self.__commands:
+            return ''
+        _, start, end = self.__commands[index]
+        return self.get_slice(start, end)
+
+    def get_commands(self) -> list[tuple]:
+        """
+        Returns the (command, start offset, end offset) slices of the recorded commands.
+
+        @returns {list}
+        """
+        return list(self.__commands)
+
+    def get_end_offset(self) -> int:
+        """
+        Returns the absolute offset after the last character of the output.
+
+        @returns {int}
+        """
+        return self.__memory_start + self.__memory_size
+
+    def get_memory_size(self) -> int:
+        """
+        Returns the number of characters kept in memory.
+
+        @returns {int}
+        """
+        return self.__memory_size
+
+    def clear(self) -> None:
+        """
+        Removes the whole output, the command slices and the spill file.
+        """
+        self.__chunks.clear()
+        self.__commands.clear()
+        self.__memory_start = 0
+        self.__memory_size = 0
+        self.__first_offset = 0
+        if self.__spill_file:
+            self.__spill_file.close()
+            self.__spill_file = None
+        self.__spill_offsets = []
+        self.__spill_positions = []
+        self.__spill_size = 0
+
+    def __len__(self) -> int:
+        return self.get_end_offset() - self.__first_offset
+
+    def __str__(self) -> str:
+        return self.get_value()
+
+    # Internal helpers
+
+    def __evict_chunks(self) -> None:
+        """
+        Evicts the oldest chunks until the memory size is under the limit (the last chunk is always kept, trimmed
+        to the limit if required).
+        """
+        while self.__memory_size > self.max_size:
+            chunk = self.__chunks[0]
+            excess = self.__memory_size - self.max_size
+            # The chunk is split if only a part of it must be evicted (or if it is the only one)
+            evicted = chunk if len(chunk) <= excess and len(self.__chunks) > 1 else chunk[:excess]
+            if len(evicted) == len(chunk):
+                self.__chunks.popleft()
+            else:
+                self.__chunks[0] = chunk[len(evicted):]
+            if self.spill_to_file:
+                self.__write_spill_file(evicted)
+            self.__memory_start += len(evicted)
+            self.__memory_size -= len(evicted)
+        if not self.spill_to_file:
+            self.__first_offset = self.__memory_start
+
+    def __get_spill_file(self):
+        """Returns the temporary file that receives the evicted chunks (it is created on the first eviction)."""
+        if not self.__spill_file:
+            self.__spill_file = tempfile.TemporaryFile(mode = 'w+b')
+        return self.__spill_file
+
+    def __write_spill_file(self, chunk: str) -> None:
+        """Appends an evicted chunk to the spill file, recording its absolute offset and byte position."""
+        data = chunk.encode('utf-8')
+        spill_file = self.__get_spill_file()
+        spill_file.seek(self.__spill_size)
+        spill_file.write(data)
+        self.__spill_offsets.append(self.__memory_start)
+        self.__spill_positions.append(self.__spill_size)
+        self.__spill_size += len(data)
+
+    def __read_spill_file(
+        self,
+        start: int,
+        end: int
+    ) -> str:
+        """
+        Reads the spilled output between two absolute offsets, only the chunks that overlap them are read (from the
+        byte position of the first one).
+        """
+        if not self.__spill_file or start >= end:
+            return ''
+        first_chunk = bisect_right(self.__spill_offsets, start) - 1
+        last_chunk = bisect_left(self.__spill_offsets, end)
+        first_position = self.__spill_positions[first_chunk]
+        last_position = self.__spill_positions[last_chunk] if last_chunk < len(self.__spill_positions) else self.__spill_size
+        self.__spill_file.seek(first_position)
+        output = self.__spill_file.read(last_position - first_position).decode('utf-8')
+        chunk_offset = self.__spill_offsets[first_chunk]
+        return output[start - chunk_offset:end - chunk_offset]
@@ -1,15 +1,25 @@
+import shlex
+import zlib
 from abc import ABCMeta, abstractmethod
 # SSH
 from ..SSHConnection import SSHConnection
 
 class FileOperationsDecorator():
     """
-    @version 2.3.1
+    @version 2.6.0
 
     Especification for the decorator to apply file operations to a SSH strategy.
     It provides the signature for the methods to retrieve or send files (where the retrieve_file 
     method must be implemented mandatorily)
+    The files can also be retrieved into a file-like object (retrieve_file_object), by default streaming the output
+    of a remote cat over an exec channel of the connection.
+    The files can be compressed on the remote host (gzip -c) and decompressed on the fly, so highly compressible
+    files (like logs) transfer a fraction of their size (retrieve_compressed_file_object).
+    Every transfer method accepts a progress callback, which is called with the bytes transferred so far and the total
+    bytes of the file (None if it is unknown, like for the compressed streams until they finish).
     """
+    # Name of the protocol of the decorator (for the transfer records)
+    PROTOCOL = None
     __metaclass__ = ABCMeta
 
     # Constructor, it receives a host options object.
@@ -25,15 +35,83 @@ class FileOperationsDecorator():
         self, 
         source_file: str, 
         destination_path: str = None,
+        progress_callback = None
     ): raise NotImplementedError
 
+    # Method to retrieve a file into a binary file-like object (like a BytesIO), without touching the local disk
+    def retrieve_file_object(
+        self,
+        source_file: str,
+        file_object,
+        progress_callback = None
+    ):
+        self.__stream_remote_command(
+            f'cat { shlex.quote(source_file) }', source_file, file_object, progress_callback = progress_callback
+        )
+
+    # Method to retrieve a file compressed with gzip on the remote host into a binary file-like object, decompressing
+    # it on the fly (or keeping the gzip data if $decompress is disabled). It returns the number of transferred bytes
+    def retrieve_compressed_file_object(
+        self,
+        source_file: str,
+        file_object,
+        decompress: bool = True,
+        progress_callback = None
+    ) -> int:
+        # The wbits value 31 selects the gzip container
+        decompressor = zlib.decompressobj(wbits = 31) if decompress else None
+        transferred_bytes = self.__stream_remote_command(
+            f'gzip -c { shlex.quote(source_file) }',
+            source_file,
+            file_object,
+            decompressor.decompress if decompressor else None,
+            progress_callback
+        )
+        if decompressor:
+            file_object.write(decompressor.flush())
+        return transferred_bytes
+
     # Method to upload a file to a remote host
     @abstractmethod
     def send_file(
         self,
         source_file: str,
-        destination_path: str
+        destination_path: str,
+        progress_callback = None
     ): pass
 
+    # Internal helpers
 
-
+    def __stream_remote_command(
+        self,
+        command: str,
+        source_file: str,
+        file_object,
+        transform = None,
+        progress_callback = None
+    ) -> int:
+        """
+        Writes the output of a remote command to a file-like object (transformed if required), returning its size.
+        The progress is reported after every chunk, and with the written size as the total once the command finished.
+        """
+        transferred_bytes = 0
+        written_bytes = 0
+        channel = self.ssh_connection.open_session()
+        try:
+            channel.exec_command(command)
+            for data in iter(lambda: channel.recv(32768), b''):
+                transferred_bytes += len(data)
+                if transform:
+                    data = transform(data)
+                file_object.write(data)
+                written_bytes += len(data)
+                if progress_callback:
+                    progress_callback(transferred_bytes, None)
+            exit_status = channel.recv_exit_status()
+        finally:
+            channel.close()
+        if exit_status != 0:
+            raise Exception(f'The file { source_file } could not be retrieved (exit status { exit_status })')
+        if progress_callback:
+            progress_callback(transferred_bytes, written_bytes)
+        return transferred_bytes
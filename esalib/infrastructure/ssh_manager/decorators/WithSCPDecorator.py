@@ -5,12 +5,14 @@ from ..decorators.FileOperationsDecorator import FileOperationsDecorator
 
 class WithSCPDecorator(FileOperationsDecorator):
     """
-    @version 3.5.3
+    @version 3.7.0
 
     SSH strategy, implementing netmiko library for multi-vendor support with SCP functionality (via a decorator).
     It receives an options list with the following shape:
 
     """
+    # Name of the protocol of the decorator (for the transfer records)
+    PROTOCOL = 'scp'
 
     def __init__(self, ssh_connection):
         """
@@ -21,33 +23,48 @@ class WithSCPDecorator(FileOperationsDecorator):
     def retrieve_file(
         self, 
         source_file, 
+        destination_path: str = None,
+        progress_callback = None
     ):
         """
         @param {str} source_file  The remote path, the path where the remote file is located
+        @param {str} destination_path The local path (directory or file) where the file is stored (current directory by default).
+        @param {Callable} progress_callback The function called with the transferred and total bytes while the file is retrieved.
 
         Facade method to retrieve the file from a remote host, it starts the SCP connection and retrieves the 
         files by calling the respective methods with the appropiate options.
         """
-        scp_client = SCPClient(self.ssh_connection)
-        scp_client.get(source_file)
+        scp_client = SCPClient(self.ssh_connection, progress = self.__get_scp_progress(progress_callback))
+        scp_client.get(source_file, destination_path if destination_path else '')
         scp_client.close()
 
     def send_file(
         self, 
         source_file: str, 
-        destination_path: str
+        destination_path: str,
+        progress_callback = None
     ):
         """
         @param {str} source_file The local path of the file to send to the rempote host.
         @param {str} destination_file The remote path, the path where the uploaded file will be installed.
+        @param {Callable} progress_callback The function called with the transferred and total bytes while the file is sent.
 
         Facade method to upload a file from a remote host, it starts the SCP connection and transfer the files 
         by calling the respective methods with the appropiate options.
         """
-        scp_client = SCPClient(self.ssh_connection)
+        scp_client = SCPClient(self.ssh_connection, progress = self.__get_scp_progress(progress_callback))
         scp_client.put(source_file, destination_path)
         scp_client.close()
 
+    # Internal helpers
+
+    @staticmethod
+    def __get_scp_progress(progress_callback):
+        """Adapts a progress callback to the signature of SCPClient (file name, size and sent bytes)."""
+        if not progress_callback:
+            return None
+        return lambda file_name, size, sent: progress_callback(sent, size)
+
 
 
 
@@ -0,0 +1,226 @@
+import hashlib
+import json
+import os
+import posixpath
+import shlex
+import stat
+from paramiko import SFTPClient
+# File operations contract
+from ..decorators.FileOperationsDecorator import FileOperationsDecorator
+
+
+class WithSFTPDecorator(FileOperationsDecorator):
+    """
+    @version 1.2.2
+
+    File operations over SFTP (via a decorator), an alternative to SCP for large files or high-latency links.
+    The files are read in chunks of $chunk_size bytes, keeping up to $max_requests read requests outstanding (pipelined
+    reads), so the transfer is not limited by the round trip time.
+    The data is written to a local .part file, which is renamed once the transfer is complete. If the transfer is
+    interrupted, the next one resumes from the end of the .part file, but only if the remote file did not change since
+    the .part file was started (its size and modification time are kept in a .part.json file next to it).
+    The SHA-256 checksum of the retrieved file can be verified against the remote one (computed with a remote command).
+    The files retrieved into file-like objects are read with prefetched requests too (getfo).
+    """
+    # Name of the protocol of the decorator (for the transfer records)
+    PROTOCOL = 'sftp'
+
+    # Suffix of the partially retrieved files
+    PART_FILE_SUFFIX = '.part'
+
+    # Suffix of the files that keep the remote size and modification time of the partially retrieved files
+    PART_METADATA_SUFFIX = '.part.json'
+
+    # Remote command to get the SHA-256 checksum of a file (FreeBSD sha256, with the GNU sha256sum as fallback)
+    __REMOTE_CHECKSUM_COMMAND = 'sha256 -q %(path)s 2>/dev/null || sha256sum %(path)s'
+
+    def __init__(
+        self,
+        ssh_connection,
+        chunk_size: int = 32768,
+        max_requests: int = 64,
+        resume: bool = True,
+        verify_checksum: bool = False
+    ):
+        """
+        @param {SSHConnection} ssh_connection The reference to the SSH connection, it is used as the transport for SFTPClient.
+        @param {int} chunk_size The number of bytes requested by every read (32KB by default, the usual maximum of the servers).
+        @param {int} max_requests The maximum number of read requests outstanding at the same time.
+        @param {bool} resume Flag to indicate that the interrupted transfers are resumed from the .part file (enabled by default).
+        @param {bool} verify_checksum Flag to indicate that the checksum of the retrieved files is verified (disabled by default).
+        """
+        self.ssh_connection = ssh_connection
+        self.chunk_size: int = chunk_size
+        self.max_requests: int = max_requests
+        self.resume: bool = resume
+        self.verify_checksum: bool = verify_checksum
+
+    def retrieve_file(
+        self,
+        source_file,
+        destination_path: str = None,
+        progress_callback = None
+    ):
+        """
+        @param {str} source_file  The remote path, the path where the remote file is located
+        @param {str} destination_path The local path (directory or file) where the file is stored (current directory by default).
+        @param {Callable} progress_callback The function called with the transferred and total bytes after every batch of reads (a resumed transfer only counts the bytes after the .part file).
+
+        Facade method to retrieve the file from a remote host, it reads the file with pipelined requests into the .part
+        file (resuming it if possible), verifies its checksum if required and renames it.
+        """
+        local_path = self.__get_local_path(source_file, destination_path)
+        part_path = local_path + self.PART_FILE_SUFFIX
+        sftp_client = SFTPClient.from_transport(self.ssh_connection)
+        try:
+            remote_attributes = sftp_client.stat(source_file)
+            remote_size = remote_attributes.st_size
+            offset = self.__get_resume_offset(part_path, remote_attributes)
+            if offset == 0:
+                self.__save_part_metadata(part_path, remote_attributes)
+            initial_offset = offset
+            with sftp_client.open(source_file, 'rb') as remote_file, open(part_path, 'ab' if offset else 'wb') as part_file:
+                while offset < remote_size:
+                    # Every batch prefetches up to $max_requests chunks at the same time, the data is yielded in order
+                    batch_end = min(remote_size, offset + self.chunk_size * self.max_requests)
+                    chunks = [
+                        (chunk_offset, min(self.chunk_size, batch_end - chunk_offset))
+                        for chunk_offset in range(offset, batch_end, self.chunk_size)
+                    ]
+                    for data in remote_file.readv(chunks):
+                        part_file.write(data)
+                    # The written data is flushed, so an interrupted transfer can be resumed from it
+                    part_file.flush()
+                    offset = batch_end
+                    if progress_callback:
+                        progress_callback(offset - initial_offset, remote_size - initial_offset)
+        finally:
+            sftp_client.close()
+        if self.verify_checksum:
+            self.__verify_checksum(source_file, part_path)
+        os.replace(part_path, local_path)
+        os.remove(part_path + self.PART_METADATA_SUFFIX)
+
+    def retrieve_file_object(
+        self,
+        source_file: str,
+        file_object,
+        progress_callback = None
+    ):
+        """
+        @param {str} source_file The remote path, the path where the remote file is located.
+        @param {IO} file_object The binary file-like object where the file is written.
+        @param {Callable} progress_callback The function called with the transferred and total bytes while the file is retrieved.
+
+        Facade method to retrieve the file from a remote host into a file-like object, with prefetched reads.
+        """
+        sftp_client = SFTPClient.from_transport(self.ssh_connection)
+        try:
+            sftp_client.getfo(source_file, file_object, callback = progress_callback)
+        finally:
+            sftp_client.close()
+
+    def send_file(
+        self,
+        source_file: str,
+        destination_path: str,
+        progress_callback = None
+    ):
+        """
+        @param {str} source_file The local path of the file to send to the rempote host.
+        @param {str} destination_file The remote path (directory or file), the path where the uploaded file will be installed.
+        @param {Callable} progress_callback The function called with the transferred and total bytes while the file is sent.
+
+        Facade method to upload a file to a remote host over SFTP.
+        """
+        sftp_client = SFTPClient.from_transport(self.ssh_connection)
+        try:
+            if self.__is_remote_directory(sftp_client, destination_path):
+                destination_path = posixpath.join(destination_path, os.path.basename(source_file))
+            sftp_client.put(source_file, destination_path, callback = progress_callback)
+        finally:
+            sftp_client.close()
+
+    # Internal helpers
+
+    @staticmethod
+    def __get_local_path(
+        source_file: str,
+        destination_path: str
+    ) -> str:
+        """Returns the local path of a retrieved file, the destination can be a directory (like SCP)."""
+        if not destination_path:
+            return os.path.basename(source_file)
+        if os.path.isdir(destination_path):
+            return os.path.join(destination_path, os.path.basename(source_file))
+        return destination_path
+
+    def __get_resume_offset(
+        self,
+        part_path: str,
+        remote_attributes
+    ) -> int:
+        """Returns the offset to resume the transfer from (0 if there is no .part file, or if the remote file changed since it was started)."""
+        if not self.resume or not os.path.exists(part_path):
+            return 0
+        try:
+            with open(part_path + self.PART_METADATA_SUFFIX) as metadata_file:
+                part_metadata = json.load(metadata_file)
+        except (OSError, ValueError):
+            return 0
+        if part_metadata != self.__get_part_metadata(remote_attributes):
+            return 0
+        part_size = os.path.getsize(part_path)
+        return part_size if part_size <= remote_attributes.st_size else 0
+
+    def __save_part_metadata(
+        self,
+        part_path: str,
+        remote_attributes
+    ) -> None:
+        """Stores the size and modification time of the remote file next to a new .part file."""
+        with open(part_path + self.PART_METADATA_SUFFIX, 'w') as metadata_file:
+            json.dump(self.__get_part_metadata(remote_attributes), metadata_file)
+
+    @staticmethod
+    def __get_part_metadata(remote_attributes) -> dict:
+        """Returns the attributes of the remote file that identify the version a .part file belongs to."""
+        return { 'size': remote_attributes.st_size, 'mtime': remote_attributes.st_mtime }
+
+    def __verify_checksum(
+        self,
+        source_file: str,
+        part_path: str
+    ) -> None:
+        """Compares the SHA-256 checksum of the retrieved file with the remote one, the .part file is removed if they differ."""
+        local_checksum = hashlib.sha256()
+        with open(part_path, 'rb') as part_file:
+            for data in iter(lambda: part_file.read(1048576), b''):
+                local_checksum.update(data)
+        remote_checksum = self.__get_remote_checksum(source_file)
+        if remote_checksum != local_checksum.hexdigest():
+            os.remove(part_path)
+            os.remove(part_path + self.PART_METADATA_SUFFIX)
+            raise Exception(f'The checksum of { source_file } does not match the remote one ({ remote_checksum })')
+
+    def __get_remote_checksum(self, source_file: str) -> str:
+        """Executes the remote checksum command in its own channel, returning the hexadecimal digest."""
+        channel = self.ssh_connection.open_session()
+        try:
+            channel.exec_command(self.__REMOTE_CHECKSUM_COMMAND % { 'path': shlex.quote(source_file) })
+            output = b''.join(iter(lambda: channel.recv(4096), b'')).decode(errors = 'replace')
+        finally:
+            channel.close()
+        lines = output.strip().splitlines()
+        return lines[-1].split()[0].lower() if lines else None
+
+    @staticmethod
+    def __is_remote_directory(
+        sftp_client: SFTPClient,
+        remote_path: str
+    ) -> bool:
+        """Determines if a remote path is an existing directory."""
+        try:
+            return stat.S_ISDIR(sftp_client.stat(remote_path).st_mode)
+        except IOError:
+            return False
@@ -0,0 +1,179 @@
+import codecs
+import select
+import time
+from typing import Union
+# Readers
+from .OutputScanner import OutputScanner
+from .PromptMatcher import PromptMatcher
+# Utils
+from ....utils.validators.IteratorValidator import IteratorValidator, IterationTimeout
+
+
+class ChannelReader:
+    """
+    @version 1.5.0
+
+    Event-driven reader for interactive shell channels. Instead of sleeping a fixed time before every read, it
+    waits until the channel is readable (via recv_ready or select over the channel file descriptor), so it returns
+    as soon as the device answers.
+    The received chunks are scanned by an OutputScanner, which only scans the newly received data (plus the few
+    characters required to match a delimiter split between two reads), so long outputs are not rescanned. The bytes
+    are decoded with an incremental decoder, which keeps the incomplete multibyte sequences between reads.
+    The reader is meant to live as long as the channel, to keep the decoder state between commands, as well as the
+    data received after a delimiter when the outputs of pipelined commands are split (keep_remainder).
+    The terminal delimiter can also be a PromptMatcher, in that case the read ends once the output ends with one of its
+    prompts and the device has nothing else to send (the name of the prompt is kept in matched_prompt).
+    """
+
+    def __init__(
+        self,
+        channel,
+        encoding: str = 'utf-8'
+    ):
+        """
+        @param {Channel} channel The channel to read from (it must implement recv, send and fileno).
+        @param {str} encoding The encoding of the channel output (utf-8 by default).
+        """
+        self.channel = channel
+        self.decoder = codecs.getincrementaldecoder(encoding)(errors = 'replace')
+        # Text received after the delimiter of the last read (only when keep_remainder is requested)
+        self.pending_text = ''
+        # Number of times the more output delimiter was answered
+        self.pages_requested = 0
+        # Name of the prompt that ended the last read (only when a PromptMatcher is used)
+        self.matched_prompt: str = None
+
+    def read_until(
+        self,
+        terminal_delimiter: Union[str, PromptMatcher],
+        more_output_delimiter: str = None,
+        timeout: float = 5,
+        buffer_size: int = 4096,
+        keep_remainder: bool = False,
+        next_command: str = None,
+        answer_pager: bool = True
+    ) -> str:
+        """
+        @param {str|PromptMatcher} terminal_delimiter The characters sequence that comes before the cursor at the terminal (like ~$ in Linux), or a PromptMatcher.
+        @param {str} more_output_delimiter The string that indicates us that some parts of the output were hidden.
+        @param {float} timeout The maximum number of seconds to wait for the terminal delimiter.
+        @param {int} buffer_size The maximum number of bytes to read from the channel on every read.
+        @param {bool} keep_remainder Flag to indicate that the output ends at the terminal delimiter, the data received 
+        after it is kept for the next read (useful to split the outputs of pipelined commands).
+        @param {str} next_command The command that was sent after this one without waiting for its prompt (see OutputScanner).
+        @param {bool} answer_pager Flag to indicate that the pager is answered, otherwise the read stops at the pager (matched_prompt is PAGER).
+
+        Receives data from the channel until the terminal delimiter is found, requesting the hidden parts of the output
+        (by sending the space char) every time the more output delimiter shows up. An IterationTimeout exception is
+        raised if the delimiter is not received before the timeout.
+
+        @returns {str} The received output.
+        """
+        scanner = OutputScanner(terminal_delimiter, more_output_delimiter, next_command)
+        self.matched_prompt = None
+        deadline = time.monotonic() + timeout
+        while True:
+            # We process the remainder of the previous read before receiving new data
+            if self.pending_text:
+                text, self.pending_text = self.pending_text, ''
+            else:
+                text = self.decoder.decode(self.__receive(deadline, buffer_size))
+            if not text:
+                continue
+            result = scanner.feed(text, self.__is_readable)
+            # If we found the more_output_delimiter, we request the next chunk of the output by sending the space char
+            if result == OutputScanner.PAGER and not answer_pager:
+                self.matched_prompt = PromptMatcher.PAGER
+                return scanner.get_output()
+            if result == OutputScanner.PAGER:
+                self.channel.send(b' ')
+                self.pages_requested += 1
+            elif result == OutputScanner.DONE:
+                self.matched_prompt = scanner.matched_prompt
+                if keep_remainder:
+                    self.pending_text = scanner.remainder
+                    return scanner.get_output()
+                return scanner.get_output() + scanner.remainder
+
+    def discard_until_quiet(
+        self,
+        terminal_delimiter: Union[str, PromptMatcher],
+        more_output_delimiter: str = None,
+        quiet_time: float = 1,
+        timeout: float = 30,
+        buffer_size: int = 4096
+    ) -> str:
+        """
+        @param {str|PromptMatcher} terminal_delimiter The terminal delimiter of the current prompt, or a PromptMatcher.
+        @param {str} more_output_delimiter The string that indicates us that some parts of the output were hidden.
+        @param {float} quiet_time The number of seconds without data after which the channel is considered quiet.
+        @param {float} timeout The maximum number of seconds to wait for the channel to be quiet.
+        @param {int} buffer_size The maximum number of bytes to read from the channel on every read.
+
+        Reads and discards the data until the device stops sending it, answering the pager, so the next command starts
+        from a clean prompt (for instance, after the pager consumed the input of pipelined commands).
+
+        @returns {str} The discarded output.
+        """
+        chunks = [self.pending_text]
+        self.pending_text = ''
+        scanner = OutputScanner(terminal_delimiter, more_output_delimiter)
+        deadline = time.monotonic() + timeout
+        while self.__wait_until_readable(quiet_time):
+            text = self.decoder.decode(self.__receive(deadline, buffer_size))
+            chunks.append(text)
+            result = scanner.feed(text, self.__is_readable)
+            if result == OutputScanner.PAGER:
+                self.channel.send(b' ')
+                self.pages_requested += 1
+            elif result == OutputScanner.DONE:
+                scanner = OutputScanner(terminal_delimiter, more_output_delimiter)
+        return ''.join(chunks)
+
+    # Internal helpers
+
+    def __is_readable(self) -> bool:
+        """Determines if the channel has data ready to read, without waiting."""
+        recv_ready = getattr(self.channel, 'recv_ready', None)
+        if recv_ready:
+            return recv_ready()
+        readable, _, __ = select.select([self.channel], [], [], 0)
+        return len(readable) > 0
+
+    def __receive(
+        self,
+        deadline: float,
+        buffer_size: int
+    ) -> bytes:
+        """
+        @param {float} deadline The monotonic time at which the wait is over.
+        @param {int} buffer_size The maximum number of bytes to read.
+
+        Waits until the channel has data to read (or the deadline is reached) and reads it.
+        """
+        remaining = deadline - time.monotonic()
+        if remaining <= 0 or not self.__wait_until_readable(remaining):
+            raise IterationTimeout()
+        data = self.channel.recv(buffer_size)
+        # An empty read means that the remote side closed the channel
+        if not data:
+            raise Exception('Channel closed before the terminal delimiter was received')
+        return data
+
+    def __wait_until_readable(self, timeout: float) -> bool:
+        """
+        @param {float} timeout The maximum number of seconds to wait.
+
+        Blocks until the channel is readable, without polling. The channels without file descriptor are polled with
+        adaptive backoff instead.
+        """
+        recv_ready = getattr(self.channel, 'recv_ready', None)
+        if recv_ready and recv_ready():
+            return True
+        if recv_ready and not hasattr(self.channel, 'fileno'):
+            try:
+                return IteratorValidator.wait_until(recv_ready, timeout)
+            except IterationTimeout:
+                return False
+        readable, _, __ = select.select([self.channel], [], [], timeout)
+        return len(readable) > 0
@@ -0,0 +1,149 @@
+import codecs
+import re
+import socket
+from typing import Union
+# Utils
+from ....utils.validators.IteratorValidator import IterationTimeout
+
+
+class CommandStream:
+    """
+    @version 1.0.0
+
+    Streaming output of a command executed in its own exec channel. The output is yielded as it arrives, either as
+    raw byte chunks (iter_chunks) or as decoded lines (iter_lines, also the default iteration), so huge outputs are
+    processed in constant memory.
+    The channel is only read when the consumer requests the next item, so a slow consumer applies backpressure: once
+    the channel window is full, the remote side stops sending until the data is consumed.
+    The stream can stop the remote command early once a line matches $stop_on (the channel is closed and the exit
+    status is not available in that case). An IterationTimeout exception is raised if no data is received for
+    $timeout seconds.
+    """
+
+    def __init__(
+        self,
+        channel,
+        stop_on: Union[str, re.Pattern] = None,
+        timeout: float = None,
+        buffer_size: int = 32768,
+        encoding: str = 'utf-8'
+    ):
+        """
+        @param {Channel} channel The exec channel of the command (it must implement recv, settimeout, recv_exit_status and close).
+        @param {str|Pattern} stop_on Text or compiled regex that stops the command once a line matches it.
+        @param {float} timeout The maximum number of seconds to wait for new data (no limit by default).
+        @param {int} buffer_size The maximum number of bytes to read from the channel on every read.
+        @param {str} encoding The encoding of the command output (utf-8 by default).
+        """
+        self.channel = channel
+        self.stop_on = stop_on
+        self.buffer_size: int = buffer_size
+        self.encoding: str = encoding
+        # The line that matched $stop_on (if any)
+        self.match: str = None
+        self.is_stopped_early: bool = False
+        self.is_finished: bool = False
+        self.__exit_status: int = None
+        self.channel.settimeout(timeout)
+
+    def __iter__(self):
+        return self.iter_lines()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def iter_chunks(self):
+        """
+        Yields the raw byte chunks of the output as they arrive.
+
+        @returns {Generator}
+        """
+        while not self.is_finished:
+            try:
+                chunk = self.channel.recv(self.buffer_size)
+            except socket.timeout:
+                raise IterationTimeout()
+            # An empty read means that the command finished (or that the channel was closed)
+            if not chunk:
+                self.__finish()
+                return
+            yield chunk
+
+    def iter_lines(self):
+        """
+        Yields the decoded lines of the output (without the line break) as they arrive. If $stop_on is set, the
+        stream stops after the first matching line, which is yielded as well.
+
+        @returns {Generator}
+        """
+        decoder = codecs.getincrementaldecoder(self.encoding)(errors = 'replace')
+        pending = ''
+        for chunk in self.iter_chunks():
+            lines = (pending + decoder.decode(chunk)).split('\n')
+            # The last item is an incomplete line, it is completed by the next chunks
+            pending = lines.pop()
+            for line in lines:
+                yield line
+                if self.__is_match(line):
+                    self.stop()
+                    return
+        pending += decoder.decode(b'', final = True)
+        if pending:
+            yield pending
+            if self.__is_match(pending):
+                self.stop()
+
+    def read(self) -> bytes:
+        """
+        Reads the whole remaining output (for small outputs only, it is kept in memory).
+
+        @returns {bytes}
+        """
+        return b''.join(self.iter_chunks())
+
+    def get_exit_status(self) -> int:
+        """
+        Returns the exit status of the command, the remaining output is discarded if it was not consumed.
+        If the command was stopped early, there is no exit status (None).
+
+        @returns {int}
+        """
+        if self.is_stopped_early:
+            return None
+        for _ in self.iter_chunks():
+            pass
+        return self.__exit_status
+
+    def stop(self) -> None:
+        """
+        Stops the remote command by closing its channel.
+        """
+        if not self.is_finished:
+            self.is_stopped_early = True
+        self.close()
+
+    def close(self) -> None:
+        """
+        Closes the channel of the command.
+        """
+        self.is_finished = True
+        self.channel.close()
+
+    # Internal helpers
+
+    def __finish(self) -> None:
+        """Marks the stream as finished, getting the exit status of the command."""
+        self.__exit_status = self.channel.recv_exit_status()
+        self.close()
+
+    def __is_match(self, line: str) -> bool:
+        """Determines if a line matches the stop condition (and keeps it)."""
+        if self.stop_on == None:
+            return False
+        is_match = self.stop_on in line if isinstance(self.stop_on, str) else self.stop_on.search(line) != None
+        if is_match:
+            self.match = line
+        return is_match
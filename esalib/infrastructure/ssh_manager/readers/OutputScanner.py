@@ -0,0 +1,159 @@
+from typing import Callable, Union
+# Readers
+from .PromptMatcher import PromptMatcher
+
+
+class OutputScanner:
+    """
+    @version 1.1.0
+
+    Incremental scanner of the output of an interactive shell, it detects the end of a command output (the terminal
+    delimiter or a PromptMatcher prompt) and the pager. It does not read anything, the received text is fed to it, so
+    the same delimiter logic is shared by the blocking readers (ChannelReader) and the asyncio strategies.
+    Only the newly received text (plus the few characters required to match a delimiter split between two chunks) is
+    scanned for the string delimiters, and only the end of the output is checked against the prompts.
+    When the command is followed by other pipelined commands ($next_command), the output ends at the first prompt
+    followed by the echo of the next command, and any pager is reported, as the device would take the input of the
+    next commands as the key to continue.
+    """
+    # Results of feed
+    PAGER   = 'pager'
+    DONE    = 'done'
+
+    def __init__(
+        self,
+        terminal_delimiter: Union[str, PromptMatcher],
+        more_output_delimiter: str = None,
+        next_command: str = None
+    ):
+        """
+        @param {str|PromptMatcher} terminal_delimiter The characters sequence that comes before the cursor at the terminal (like ~$ in Linux), or a PromptMatcher.
+        @param {str} more_output_delimiter The string that indicates us that some parts of the output were hidden.
+        @param {str} next_command The command sent after this one without waiting for its prompt (only used with a PromptMatcher).
+        """
+        self.terminal_delimiter = terminal_delimiter
+        self.more_output_delimiter: str = more_output_delimiter
+        self.next_command: str = next_command
+        # Text received after the end of the output (the output of the next pipelined commands)
+        self.remainder: str = ''
+        # Name of the prompt that ended the output (only when a PromptMatcher is used)
+        self.matched_prompt: str = None
+        # Internal state
+        self.__chunks: list[str] = []
+        self.__tail: str = ''
+        self.__overlap: int = (
+            0 if isinstance(terminal_delimiter, PromptMatcher)
+            else max(len(terminal_delimiter), len(more_output_delimiter or '')) - 1
+        )
+
+    def feed(
+        self,
+        text: str,
+        has_more_data: Callable[[], bool] = None
+    ) -> str:
+        """
+        @param {str} text The newly received text.
+        @param {Callable} has_more_data The function to determine if more data is already waiting, the prompts are only checked when it returns False.
+
+        Scans the new text.
+
+        @returns {str} DONE if the output is complete, PAGER if the pager must be answered (None otherwise).
+        """
+        if isinstance(self.terminal_delimiter, PromptMatcher):
+            return self.__feed_until_prompt(text, has_more_data)
+        # We only scan the new text and the tail of the previous one
+        window = self.__tail + text
+        position = self.find_delimiter_in_window(self.terminal_delimiter, window, len(self.__tail))
+        if position != -1:
+            # The end of the delimiter, relative to the new text
+            delimiter_end = position + len(self.terminal_delimiter) - len(self.__tail)
+            self.__chunks.append(text[:delimiter_end])
+            self.remainder = text[delimiter_end:]
+            return self.DONE
+        self.__chunks.append(text)
+        self.__tail = window[-self.__overlap:] if self.__overlap > 0 else ''
+        if (
+            self.more_output_delimiter
+            and self.find_delimiter_in_window(self.more_output_delimiter, window, len(window) - len(text)) != -1
+        ):
+            return self.PAGER
+        return None
+
+    def get_output(self) -> str:
+        """
+        @returns {str} The output received so far, up to the terminal delimiter (the remainder is not included).
+        """
+        return ''.join(self.__chunks)
+
+    @staticmethod
+    def find_delimiter_in_window(
+        delimiter: str,
+        window: str,
+        tail_length: int
+    ) -> int:
+        """
+        @param {str} delimiter The delimiter to find.
+        @param {str} window The tail of the previous text followed by the new text.
+        @param {int} tail_length The length of the previous text tail in the window.
+
+        Finds the delimiter in the window, skipping the part of the tail that cannot be part of a new occurrence.
+
+        @returns {int} The position of the delimiter in the window (-1 if not found).
+        """
+        start = max(0, tail_length - (len(delimiter) - 1))
+        return window.find(delimiter, start)
+
+    # Internal helpers
+
+    def __feed_until_prompt(
+        self,
+        text: str,
+        has_more_data: Callable[[], bool]
+    ) -> str:
+        """
+        Keeps the end of the output and checks it against the prompts of the matcher once the device stops sending
+        data (or, for a pipelined command, once the echo of the next command follows a prompt). The pager is answered
+        if the matcher detects it (or, otherwise, if the output ends with the more output delimiter).
+        """
+        prompt_matcher: PromptMatcher = self.terminal_delimiter
+        self.__chunks.append(text)
+        window = self.__tail + text
+        if self.next_command != None:
+            prompt, prompt_end = prompt_matcher.search_before(window, self.next_command)
+            output_window = window[:prompt_end] if prompt != None else window
+            if self.__is_pager_in(output_window):
+                return self.PAGER
+            if prompt != None:
+                self.__split_remainder(window[prompt_end:])
+                self.matched_prompt = prompt
+                return self.DONE
+        self.__tail = window[-(prompt_matcher.window_size + len(self.next_command or '')):]
+        # More data is on its way, so the output cannot end here
+        if has_more_data and has_more_data():
+            return None
+        prompt = prompt_matcher.match(self.__tail)
+        is_pager = prompt == PromptMatcher.PAGER or (
+            prompt == None
+            and not prompt_matcher.has_prompt(PromptMatcher.PAGER)
+            and self.more_output_delimiter
+            and self.__tail.rstrip().endswith(self.more_output_delimiter)
+        )
+        if is_pager:
+            return self.PAGER
+        if prompt != None:
+            self.matched_prompt = prompt
+            return self.DONE
+        return None
+
+    def __is_pager_in(self, output: str) -> bool:
+        """Determines if the pager shows up anywhere in the output (the more output delimiter is used if the matcher has no pager)."""
+        prompt_matcher: PromptMatcher = self.terminal_delimiter
+        if prompt_matcher.has_prompt(PromptMatcher.PAGER):
+            return prompt_matcher.contains(output, PromptMatcher.PAGER)
+        return bool(self.more_output_delimiter) and self.more_output_delimiter in output
+
+    def __split_remainder(self, remainder: str):
+        """Moves the end of the received text (the output of the next commands) to the remainder."""
+        output = ''.join(self.__chunks)
+        self.__chunks = [output[:len(output) - len(remainder)]]
+        self.remainder = remainder
@@ -0,0 +1,141 @@
+import re
+from typing import Union
+
+
+class PromptMatcher:
+    """
+    @version 1.1.0
+
+    Prompt detection engine for interactive shells. It holds a set of named, compiled regexes which are anchored to
+    the end of the received output, so a prompt is only detected when the device stops writing after it (a ] or >
+    inside the command output does not end the read).
+    Only the last $window_size characters of the output are scanned, so the cost of every check does not depend on
+    the output length. The prompts are checked in order, and the name of the first one that matches is returned.
+    The outputs of pipelined commands are split at the first prompt followed by the echo of the next command instead,
+    because the device does not stop writing after the intermediate prompts.
+    """
+    # Names of the ESA prompts
+    NORMAL          = 'normal'
+    SHELL           = 'shell'
+    CLI             = 'cli'
+    CONFIG          = 'config'
+    PAGER           = 'pager'
+    CLUSTER_NOTICE  = 'cluster_notice'
+
+    # ESA prompts definition, the ^ matches at the start of every line (the cluster notice goes first, because it also
+    # ends with the configuration prompt)
+    ESA_PROMPTS: dict[str, str] = {
+        CLUSTER_NOTICE: r'NOTICE: This configuration command has not yet been configured[\s\S]*\]>[ \t]*',
+        PAGER: r'-Press Any Key For More-[ \t]*',
+        CONFIG: r'^[^\n]*\[[^\]\n]*\]>[ \t]*',
+        CLI: r'^(?:[\w.\-]+|\([^)\n]+\))>[ \t]*',
+        SHELL: r'^[^\n>]*\][ \t]*',
+        NORMAL: r'^[^\n]*#[ \t]*',
+    }
+
+    def __init__(
+        self,
+        prompts: dict[str, Union[str, re.Pattern]],
+        window_size: int = 1024
+    ):
+        """
+        @param {dict} prompts The prompt regexes (or compiled patterns) by name, in priority order.
+        @param {int} window_size The number of characters at the end of the output where the prompts are searched.
+        """
+        self.window_size: int = window_size
+        self.prompts: dict[str, re.Pattern] = {
+            name: self.__compile_end_anchored(prompt) for name, prompt in prompts.items()
+        }
+        # Unanchored prompts, to find the intermediate prompts (compiled once)
+        self.__unanchored_prompts: dict[str, re.Pattern] = {
+            name: self.__compile_unanchored(prompt) for name, prompt in prompts.items()
+        }
+
+    @staticmethod
+    def get_esa_prompt_matcher(*names: str) -> 'PromptMatcher':
+        """
+        @param {str} names The names of the ESA prompts to detect (all of them if not provided).
+
+        Returns a matcher for the ESA prompts, keeping their priority order.
+
+        @returns {PromptMatcher}
+        """
+        return PromptMatcher({
+            name: prompt for name, prompt in PromptMatcher.ESA_PROMPTS.items() if not names or name in names
+        })
+
+    def match(self, output: str) -> str:
+        """
+        @param {str} output The received output (only its end is scanned).
+
+        Determines which prompt the output ends with.
+
+        @returns {str} The name of the matched prompt (None if the output does not end with a prompt).
+        """
+        window = output[-self.window_size:]
+        for name, prompt in self.prompts.items():
+            if prompt.search(window):
+                return name
+        return None
+
+    def search_before(
+        self,
+        output: str,
+        text: str
+    ) -> tuple:
+        """
+        @param {str} output The received output.
+        @param {str} text The text that must follow the prompt (like the echo of the next pipelined command).
+
+        Finds the first prompt followed by the text (the pager is not a prompt here).
+
+        @returns {tuple} The name of the prompt and the position where it ends ((None, -1) if there is no such prompt).
+        """
+        prompt_name, prompt_start, prompt_end = None, len(output), -1
+        for name, prompt in self.__unanchored_prompts.items():
+            if name == self.PAGER:
+                continue
+            match = re.search(f'(?:{ prompt.pattern })(?={ re.escape(text) })', output, prompt.flags)
+            if match != None and match.start() < prompt_start:
+                prompt_name, prompt_start, prompt_end = name, match.start(), match.end()
+        return prompt_name, prompt_end
+
+    def contains(
+        self,
+        output: str,
+        name: str
+    ) -> bool:
+        """
+        @param {str} output The received output.
+        @param {str} name The name of the prompt.
+
+        Determines if the prompt shows up anywhere in the output (not only at its end).
+
+        @returns {bool}
+        """
+        prompt = self.__unanchored_prompts.get(name)
+        return prompt != None and prompt.search(output) != None
+
+    def has_prompt(self, name: str) -> bool:
+        """
+        @param {str} name The name of the prompt.
+
+        @returns {bool} True if the matcher detects the prompt.
+        """
+        return name in self.prompts
+
+    # Internal helpers
+
+    @staticmethod
+    def __compile_end_anchored(prompt: Union[str, re.Pattern]) -> re.Pattern:
+        """Compiles a prompt regex anchored to the end of the output (in multiline mode, unless it is already compiled)."""
+        if isinstance(prompt, re.Pattern):
+            return re.compile(f'(?:{ prompt.pattern })\\Z', prompt.flags)
+        return re.compile(f'(?:{ prompt })\\Z', re.MULTILINE)
+
+    @staticmethod
+    def __compile_unanchored(prompt: Union[str, re.Pattern]) -> re.Pattern:
+        """Compiles a prompt regex without the end anchor (in multiline mode, unless it is already compiled)."""
+        if isinstance(prompt, re.Pattern):
+            return prompt
+        return re.compile(prompt, re.MULTILINE)
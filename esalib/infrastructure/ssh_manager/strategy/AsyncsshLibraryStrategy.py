@@ -0,0 +1,150 @@
+import asyncio
+import time
+from typing import Union
+import asyncssh
+# SSH
+from .AsyncSSHStrategy import AsyncSSHStrategy
+# Readers
+from ..readers.OutputScanner import OutputScanner
+from ..readers.PromptMatcher import PromptMatcher
+# Utils
+from ....utils.validators.IteratorValidator import IterationTimeout
+
+class AsyncsshLibraryStrategy(AsyncSSHStrategy):
+    """
+    @version 1.1.0
+
+    Asyncio SSH strategy, implementing the asyncssh library. Every session is a set of coroutines in the event loop
+    instead of a thread, so hundreds of sessions can be driven concurrently from a single loop.
+    The outputs of the interactive shell are scanned with the same OutputScanner as the ChannelReader, so the terminal
+    delimiter can be a PromptMatcher as well.
+    It receives the same options list as the ParamikoStrategy:
+
+    host = {
+        'hostname': '10.10.10.10',
+        'username': 'user',
+        'password': 'password',
+        'port': 22
+    }
+    """
+
+    def __init__(self, options):
+        self.options = options
+        self.connection: asyncssh.SSHClientConnection = None
+        self.process: asyncssh.SSHClientProcess = None
+        # Default channel properties
+        self.timeout = 5
+        self.sleep_time = 0.1
+        self.buffer_size = 4096
+
+    async def connect(self):
+        """
+        Connect method specific for the asyncssh library. Like the ParamikoStrategy, unknown host keys are accepted.
+        """
+        self.connection = await asyncssh.connect(
+            self.options['hostname'],
+            port = int(self.options.get('port', 22)),
+            username = self.options.get('username'),
+            password = self.options.get('password'),
+            known_hosts = None
+        )
+        return self.connection
+
+    def get_connection(self):
+        """
+        Method to get the connection instance
+        """
+        return self.connection
+
+    async def disconnect(self):
+        """
+        Disconnect method specific for the asyncssh library.
+        """
+        self.connection.close()
+        await self.connection.wait_closed()
+
+    async def execute_command(self, command: str) -> str:
+        """
+        @param {str} command The command to execute.
+
+        Execute command, specific for the asyncssh library.
+        """
+        result = await self.connection.run(command)
+        return result.stdout
+
+    async def execute_async_command(
+        self,
+        command: str,
+        terminal_delimiter: Union[str, PromptMatcher],
+        close_channel_after: bool,
+        more_output_delimiter: str,
+    ) -> str:
+        """
+        @param {str} command The command to execute.
+        @param {str|PromptMatcher} terminal_delimiter The characters sequence that comes before the cursor at the terminal (like ~$ in Linux).
+        @param {bool} close_channel_after Flag to indicate if the channel should be closed after the command execution.
+        @param {str} more_output_delimiter The string that indicates us that some parts of the output were hidden.
+
+        Executes commands whose output could be delayed or by steps in an interactive shell (with a terminal, like the
+        paramiko invoke_shell), waiting for the whole output based on the terminal delimiter sequence.
+        """
+        # We open the interactive shell, to get more control over the command output reception
+        if not self.process or self.process.is_closing():
+            self.process = await self.connection.create_process(term_type = 'vt100')
+        # We execute the command, and wait until it is complete to get the output
+        self.process.stdin.write(f'{ command }\n')
+        output = await self.__get_async_command_output(terminal_delimiter, more_output_delimiter)
+        # We close the channel and return the output
+        if close_channel_after:
+            self.process.close()
+            self.process = None
+        return output
+
+    async def set_channel_properties(
+        self,
+        timeout: float,
+        sleep_time: float,
+        buffer_size: int
+    ) -> None:
+        """
+        @param {float} timeout The maximum number of seconds to wait before resolution.
+        @param {float} sleep_time Kept for the contract compatibility, the output is awaited instead of polled.
+        @param {int} buffer_size The number of characters to read from the channel output.
+        """
+        self.timeout = timeout
+        self.sleep_time = sleep_time
+        self.buffer_size = buffer_size
+
+    # Internal helpers
+
+    async def __get_async_command_output(
+        self,
+        terminal_delimiter: Union[str, PromptMatcher],
+        more_output_delimiter: str
+    ) -> str:
+        """
+        @param {str|PromptMatcher} terminal_delimiter The characters sequence that comes before the cursor at the terminal (like ~$ in Linux).
+        @param {str} more_output_delimiter The string that indicates us that some parts of the output were hidden.
+
+        Awaits the output of an async or delayed output command until we find the terminal delimiter, requesting the
+        hidden parts of the output with the space char. The output is scanned by an OutputScanner, the prompts are checked
+        on every read (there is no way to know if more data is waiting). An IterationTimeout is raised if $timeout is reached.
+        """
+        scanner = OutputScanner(terminal_delimiter, more_output_delimiter)
+        deadline = time.monotonic() + self.timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise IterationTimeout()
+            try:
+                text = await asyncio.wait_for(self.process.stdout.read(self.buffer_size), remaining)
+            except asyncio.TimeoutError:
+                raise IterationTimeout()
+            # An empty read means that the remote side closed the channel
+            if not text:
+                raise Exception('Channel closed before the terminal delimiter was received')
+            result = scanner.feed(text)
+            if result == OutputScanner.PAGER:
+                self.process.stdin.write(' ')
+            elif result == OutputScanner.DONE:
+                return scanner.get_output() + scanner.remainder
@@ -4,7 +4,7 @@ from .SSHStrategy import SSHStrategy
 
 class NetmikoStrategy(SSHStrategy):
     """
-    @version 2.1.0
+    @version 2.2.0
 
     SSH strategy, implementing netmiko library for multi-vendor support.
     It receives an options list with the following shape:
@@ -42,6 +42,12 @@ class NetmikoStrategy(SSHStrategy):
         Disconnect method specific for the netmiko library.
         """
         return self.connection.disconnect()
+
+    def is_connection_alive(self) -> bool:
+        """
+        Health check specific for the netmiko library.
+        """
+        return self.connection.is_alive()
     
     def execute_command(self, command: str) -> str:
         """
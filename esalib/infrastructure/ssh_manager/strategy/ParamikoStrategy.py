@@ -1,13 +1,16 @@
+from concurrent.futures import ThreadPoolExecutor
 from paramiko import SSHClient, AutoAddPolicy
 from paramiko.channel import Channel
 # SSH
 from .SSHStrategy import SSHStrategy
-# Utils
-from ....utils.validators.IteratorValidator import IteratorValidator
+# Readers
+from ..readers.ChannelReader import ChannelReader
+from ..readers.CommandStream import CommandStream
+from ..readers.PromptMatcher import PromptMatcher
 
 class ParamikoStrategy(SSHStrategy):
     """
-    @version 2.3.2
+    @version 2.12.1
     
     SSH strategy, implementing paramiko library for multi-vendor support.
     It receives an options list with the following shape:
@@ -18,11 +21,23 @@ class ParamikoStrategy(SSHStrategy):
         'password': 'password',
         'port': 22
     }
+
+    The transport sends keepalive messages every $keepalive_interval seconds, so idle connections are not dropped
+    by firewalls and a dead peer is detected (the transport becomes inactive).
     """
+    # Seconds between the keepalive messages of the transport (0 to disable them)
+    DEFAULT_KEEPALIVE_INTERVAL = 15
 
     def __init__(self, options):
         self.options = options
+        self.connection: SSHClient = None
         self.channel: Channel = None
+        self.channel_reader: ChannelReader = None
+        # Default channel properties
+        self.timeout = 5
+        self.sleep_time = 0.1
+        self.buffer_size = 4096
+        self.keepalive_interval = self.DEFAULT_KEEPALIVE_INTERVAL
     
     def connect(self):
         """
@@ -31,7 +46,17 @@ class ParamikoStrategy(SSHStrategy):
         self.connection = SSHClient()
         self.connection.set_missing_host_key_policy(AutoAddPolicy())
         self.connection.connect(**self.options)
-        return self.connection.get_transport()
+        transport = self.connection.get_transport()
+        transport.set_keepalive(self.keepalive_interval)
+        return transport
+
+    def set_keepalive(self, keepalive_interval: int) -> None:
+        """
+        @param {int} keepalive_interval Seconds between the keepalive messages of the transport (0 to disable them).
+        """
+        self.keepalive_interval = keepalive_interval
+        if self.connection and self.connection.get_transport():
+            self.connection.get_transport().set_keepalive(keepalive_interval)
 
     def get_connection(self):
         """
@@ -43,7 +68,38 @@ class ParamikoStrategy(SSHStrategy):
         """
         Disconnect method specific for the paramiko library.
         """
+        self.channel = None
+        self.channel_reader = None
         return self.connection.close()
+
+    def is_connection_alive(self) -> bool:
+        """
+        Health check specific for the paramiko library, it validates that the transport is still active and that
+        the peer can be reached (an ignore message is sent, which fails if the socket is broken).
+        """
+        transport = self.connection.get_transport() if self.connection else None
+        if transport is None or not transport.is_active():
+            return False
+        try:
+            transport.send_ignore()
+        except Exception:
+            return False
+        return transport.is_active()
+
+    def is_channel_open(self) -> bool:
+        """
+        Determines if the interactive channel (opened by execute_async_command) is still active.
+        """
+        return self.channel is not None and self.channel.active
+
+    def close_channel(self) -> None:
+        """
+        Closes the interactive channel (opened by execute_async_command), if any.
+        """
+        if self.channel:
+            self.channel.close()
+        self.channel = None
+        self.channel_reader = None
     
     def execute_command(self, command: str) -> str:
         """
@@ -55,6 +111,44 @@ class ParamikoStrategy(SSHStrategy):
         # We return the decoded output from stdout
         return stdout.read().decode()
 
+    def execute_commands(
+        self,
+        commands: list[str],
+        max_channels: int = SSHStrategy.MAX_CHANNELS,
+    ) -> list[str]:
+        """
+        @param {list} commands The commands to execute (they must be independent, like read-only diagnostics).
+        @param {int} max_channels The maximum number of channels open at the same time (MAX_CHANNELS by default).
+
+        Executes several commands concurrently, every one of them in its own exec channel of the same transport, so
+        there are no extra handshakes and the latencies overlap. The number of channels is capped to the free channels
+        of the connection (see get_free_channels).
+
+        @returns {list} The output of every command, in the same order.
+        """
+        if not commands:
+            return []
+        max_workers = max(1, min(max_channels, self.get_free_channels(), len(commands)))
+        with ThreadPoolExecutor(max_workers = max_workers, thread_name_prefix = 'ssh_channel') as executor:
+            return list(executor.map(self.execute_command, commands))
+
+    def stream_command(
+        self,
+        command: str,
+        stop_on = None,
+        timeout: float = None,
+    ) -> CommandStream:
+        """
+        @param {str} command The command to execute.
+        @param {str|Pattern} stop_on Text or compiled regex that stops the command once an output line matches it.
+        @param {float} timeout The maximum number of seconds to wait for new data (no limit by default).
+
+        Executes a command in its own exec channel, specific for the paramiko library, returning its output as a stream.
+        """
+        channel = self.connection.get_transport().open_session()
+        channel.exec_command(command)
+        return CommandStream(channel, stop_on, timeout)
+
     def execute_async_command(
         self, 
         command: str,
@@ -64,16 +158,14 @@ class ParamikoStrategy(SSHStrategy):
     ):
         """
         @param {str} command The command to execute.
-        @param {str} terminal_delimiter The characters sequence that comes before the cursor at the terminal (like ~$ in Linux).
+        @param {str|PromptMatcher} terminal_delimiter The characters sequence that comes before the cursor at the terminal (like ~$ in Linux), or a PromptMatcher.
         @param {bool} close_channel_after Flag to indicate if the channel should be closed after the command execution.
         @param {str} more_output_delimiter The string that indicates us that some parts of the output were hidden.
         
         Executes commands whose output could be delayed or by steps, specific for the paramiko library. We  make use of the 
         async_command_output helper, to wait for the whole output based on the terminal delimiter sequence (like ~$ in Linux).
         """
-        # We open a new a channel, to get more control over the command output reception
-        if not self.channel or not self.channel.active:
-            self.channel = self.connection.invoke_shell()
+        self.__open_channel_if_closed()
         # We execute the command, and wait until it is complete to get the output
         self.channel.send(f'{ command }\n')
         output = self.__get_async_command_output(terminal_delimiter, more_output_delimiter)
@@ -83,6 +175,56 @@ class ParamikoStrategy(SSHStrategy):
         return output
 
 
+    def execute_async_commands(
+        self,
+        commands: list[tuple],
+        more_output_delimiter: str,
+    ) -> list[str]:
+        """
+        @param {list} commands The (command, terminal_delimiter) tuples to execute. An optional third item (may_page) flags the
+        commands whose output may be paginated.
+        @param {str} more_output_delimiter The string that indicates us that some parts of the output were hidden.
+
+        Pipelines a batch of commands: they are written to the shell channel back-to-back, without waiting for the prompt
+        of the previous one, and the combined output is split per command at the prompt boundaries (with a PromptMatcher,
+        at the first prompt followed by the echo of the next command).
+        As the pager reads the key to continue from the same input as the commands, the pager is never answered while
+        other commands are pipelined after the paginated one: the pipeline stops there, the output produced by the
+        consumed input is discarded once the device is quiet, and the batch is resumed from the paginated command, which
+        is executed on its own. So the commands of a batch must be safe to repeat (like the show commands). A command
+        flagged with may_page closes the pipelined segment in advance: the next commands are only sent once its prompt arrives.
+
+        @returns {list} The output of every command, in the same order.
+        """
+        self.__open_channel_if_closed()
+        outputs = []
+        pending_commands = list(commands)
+        while pending_commands:
+            segment = self.__get_pipeline_segment(pending_commands)
+            # We send all the commands of the segment at once
+            self.channel.send(''.join(f'{ command[0] }\n' for command in segment))
+            for index, command in enumerate(segment):
+                is_last_command = index == len(segment) - 1
+                output = self.channel_reader.read_until(
+                    command[1],
+                    more_output_delimiter,
+                    timeout = self.timeout,
+                    buffer_size = self.buffer_size,
+                    keep_remainder = True,
+                    next_command = None if is_last_command else segment[index + 1][0],
+                    answer_pager = is_last_command
+                )
+                if self.channel_reader.matched_prompt == PromptMatcher.PAGER:
+                    # The pager took the input of the next commands, we resume the batch from the paginated command alone
+                    self.channel_reader.discard_until_quiet(
+                        command[1], more_output_delimiter, timeout = self.timeout, buffer_size = self.buffer_size
+                    )
+                    pending_commands[0] = (command[0], command[1], True)
+                    break
+                outputs.append(output)
+                pending_commands.pop(0)
+        return outputs
+
     def set_channel_properties(
         self, 
         timeout: float, 
@@ -93,6 +235,8 @@ class ParamikoStrategy(SSHStrategy):
         @param {float} timeout The maximum number of seconds to wait before resolution.
         @param {float} sleep_time The number of seconds to wait before reading the buffer again, when waiting for an output.
         @param {int} buffer_size The number of bytes to read from the channel output.
+
+        The async output is read as soon as the channel is readable, so sleep_time is only kept for the contract compatibility.
         """
         self.timeout = timeout
         self.sleep_time = sleep_time
@@ -101,6 +245,28 @@ class ParamikoStrategy(SSHStrategy):
 
     # Internal helpers
 
+    def __open_channel_if_closed(self):
+        """
+        Opens a new interactive channel (with its reader) if there is no active one, to get more control over the
+        command output reception.
+        """
+        if not self.channel or not self.channel.active:
+            self.channel = self.connection.invoke_shell()
+            self.channel_reader = ChannelReader(self.channel)
+
+    @staticmethod
+    def __get_pipeline_segment(commands: list[tuple]) -> list[tuple]:
+        """
+        @param {list} commands The (command, terminal_delimiter[, may_page]) tuples to execute.
+
+        Returns the first segment of commands that can be pipelined, every command that may be paginated ends a segment.
+        """
+        for index, command in enumerate(commands):
+            may_page = len(command) > 2 and command[2]
+            if may_page:
+                return commands[:index + 1]
+        return commands[:]
+
     def __get_async_command_output(
         self, 
         terminal_delimiter: str,
@@ -108,22 +274,16 @@ class ParamikoStrategy(SSHStrategy):
     ) -> str:
         """
         @param {str} terminal_delimiter The characters sequence that comes before the cursor at the terminal (like ~$ in Linux).
+        @param {str} more_output_delimiter The string that indicates us that some parts of the output were hidden.
 
         Waits for the output of an async or delayed output command, we receive data until we find the terminal delimiter.
-        We wait for $sleep_time seconds on every iteration and we stop the process if $timeout is reached, which is validated with
-        the IteratorValidator timeout generator util.
+        The data is read as soon as it arrives via the ChannelReader, and the process stops if $timeout is reached.
         """
         if not self.channel or not self.channel.active:
             raise Exception('Channel is not open')
-        # We initialize the response and the iterator validator (which is a generator function, so it must be initialized)
-        response = ''
-        iterations_validator = IteratorValidator.iterator_with_timeout(self.timeout, self.sleep_time)
-        # We receive data from the channel until we find the terminal delimiter (The characters before the stdin cursor)
-        while response.find(terminal_delimiter) == -1:
-            response += self.channel.recv(self.buffer_size).decode()
-            # If we found the more_output_delimiter, we request all the output by chunks by sending the space char
-            if response.find(more_output_delimiter) != -1:
-                self.channel.send(' ')
-            # We update the iterations and validate the constraint via the generator
-            next(iterations_validator)
-        return response
\ No newline at end of file
+        return self.channel_reader.read_until(
+            terminal_delimiter,
+            more_output_delimiter,
+            timeout = self.timeout,
+            buffer_size = self.buffer_size
+        )
@@ -2,12 +2,16 @@ from abc import ABCMeta, abstractmethod
 
 class SSHStrategy:
     """
-    version 3.4.1
+    version 3.10.0
     
     Contract for the SSH strategies, it specifies the methods that must be implemented, as well as the parameters that they receive.
     """
     __metaclass__ = ABCMeta
 
+    # Maximum number of channels open at the same time over a connection, the interactive channel included (the SSH
+    # servers limit the sessions per connection, MaxSessions)
+    MAX_CHANNELS = 4
+
     # Constructor, it receives a host options object.
     @abstractmethod
     def __init__(
@@ -41,6 +45,27 @@ class SSHStrategy:
         more_output_delimiter: str,
     ) -> str: pass
 
+    # Method to execute a batch of independent commands, it must return the output of every command. By default they are
+    # executed one by one, strategies can run them concurrently (up to max_channels at the same time).
+    def execute_commands(
+        self,
+        commands: list[str],
+        max_channels: int,
+    ) -> list[str]:
+        return [self.execute_command(command) for command in commands]
+
+    # Method to execute a batch of commands whose output could be delayed, it receives (command, terminal_delimiter) tuples
+    # and it must return the output of every command. By default they are executed one by one, strategies can pipeline them.
+    def execute_async_commands(
+        self,
+        commands: list[tuple],
+        more_output_delimiter: str,
+    ) -> list[str]:
+        return [
+            self.execute_async_command(command[0], command[1], False, more_output_delimiter)
+            for command in commands
+        ]
+
     # Method to set the channel properties (for execute_async_command and other methods)
     @abstractmethod
     def set_channel_properties(
@@ -50,5 +75,23 @@ class SSHStrategy:
         buffer_size: int
     ) -> None: pass
 
+    # Method to execute a command streaming its output (it must return a CommandStream), strategies without exec channels
+    # do not support it.
+    def stream_command(
+        self,
+        command: str,
+        stop_on = None,
+        timeout: float = None,
+    ): raise Exception('Streaming is not supported by this strategy')
+
+    # Health check of the connection, strategies should override it to detect dropped connections.
+    def is_connection_alive(self) -> bool: return True
+
+    # Method to determine if the interactive channel is open, strategies without channel information must not override it.
+    def is_channel_open(self) -> bool: return True
 
+    # Method to close the interactive channel (if any), so that the connection can be reused from a clean state.
+    def close_channel(self) -> None: pass
 
+    # Number of channels that can be opened besides the interactive one, the concurrent commands and transfers are capped to it.
+    def get_free_channels(self) -> int: return self.MAX_CHANNELS - (1 if self.is_channel_open() else 0)
@@ -0,0 +1,386 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+
+class FileCache:
+    """
+    @version 1.3.1
+
+    Local cache for remote files, keyed by a namespace (like the device serial number) and the remote path. Every entry
+    keeps the remote size and modification time of the cached copy, so that a file is only transferred again when
+    it changed in the remote host.
+    The total size of the cache is bounded: the least recently used entries are evicted once it is exceeded.
+    The freshness policy avoids the remote validation of the entries: an entry validated (or stored) in the current
+    run is considered current for the rest of the run, and so is an entry validated less than $max_age seconds ago.
+    The index of the entries is stored as JSON in the cache directory, so the cache is shared across runs (and it
+    is thread-safe, so it can be shared by the devices of a fleet).
+    The append-only remote files (like logs) can be updated incrementally: the new bytes are appended to the cached copy.
+    The files retrieved in memory (binary file-like objects) can be stored and copied back as well.
+    Every entry can keep metadata derived from its file (like a parsed model), which is stored in the index and
+    discarded when a new copy of the file is stored.
+    """
+    # Name of the index file
+    INDEX_FILE_NAME = 'index.json'
+    # Suffix of the temporary files of the incremental updates
+    TEMPORARY_FILE_SUFFIX = '.part'
+
+    def __init__(
+        self,
+        directory: str,
+        max_size: int = 1073741824,
+        max_age: float = 0,
+        validate_once_per_run: bool = True
+    ):
+        """
+        @param {str} directory The local directory of the cache.
+        @param {int} max_size The maximum size of the cached files in bytes (1GB by default).
+        @param {float} max_age The number of seconds an entry is considered current without validating it (0 by default, always validated).
+        @param {bool} validate_once_per_run Flag to indicate that an entry is only validated once per run (enabled by default).
+        """
+        self.directory: str = directory
+        self.max_size: int = max_size
+        self.max_age: float = max_age
+        self.validate_once_per_run: bool = validate_once_per_run
+        self.__lock = threading.RLock()
+        # Keys of the entries validated or stored in this run
+        self.__validated_keys: set[str] = set()
+        os.makedirs(self.directory, exist_ok = True)
+        self.__entries: dict[str, dict] = self.__load_index()
+
+    @staticmethod
+    def get_key(
+        namespace: str,
+        remote_path: str
+    ) -> str:
+        """
+        @param {str} namespace The namespace of the file (like the device serial number).
+        @param {str} remote_path The path of the file in the remote host.
+
+        @returns {str} The key of the entry.
+        """
+        return f'{ namespace }:{ remote_path }'
+
+    def is_fresh(
+        self,
+        namespace: str,
+        remote_path: str
+    ) -> bool:
+        """
+        @param {str} namespace The namespace of the file (like the device serial number).
+        @param {str} remote_path The path of the file in the remote host.
+
+        Determines if an entry can be used without validating it against the remote file (freshness policy).
+
+        @returns {bool}
+        """
+        key = self.get_key(namespace, remote_path)
+        with self.__lock:
+            entry = self.__get_existing_entry(key)
+            if entry == None:
+                return False
+            if self.validate_once_per_run and key in self.__validated_keys:
+                return True
+            return time.time() - entry['validated_at'] < self.max_age
+
+    def is_current(
+        self,
+        namespace: str,
+        remote_path: str,
+        remote_size: int,
+        remote_mtime: float
+    ) -> bool:
+        """
+        @param {str} namespace The namespace of the file (like the device serial number).
+        @param {str} remote_path The path of the file in the remote host.
+        @param {int} remote_size The current size of the remote file.
+        @param {float} remote_mtime The current modification time of the remote file.
+
+        Validates an entry against the current size and modification time of the remote file. A current entry is
+        marked as validated.
+
+        @returns {bool}
+        """
+        key = self.get_key(namespace, remote_path)
+        with self.__lock:
+            entry = self.__get_existing_entry(key)
+            if entry == None or entry['remote_size'] != remote_size or entry['remote_mtime'] != remote_mtime:
+                return False
+            entry['validated_at'] = time.time()
+            self.__validated_keys.add(key)
+            self.__save_index()
+            return True
+
+    def get(
+        self,
+        namespace: str,
+        remote_path: str,
+        destination_path: str
+    ) -> str:
+        """
+        @param {str} namespace The namespace of the file (like the device serial number).
+        @param {str} remote_path The path of the file in the remote host.
+        @param {str|IO} destination_path The local path (directory or file), or the binary file-like object, where the cached copy is copied.
+
+        Copies the cached file to the destination, updating its last usage (for the LRU eviction).
+
+        @returns {str|IO} The path of the copy or the rewound file-like object (None if the entry does not exist).
+        """
+        key = self.get_key(namespace, remote_path)
+        with self.__lock:
+            entry = self.__get_existing_entry(key)
+            if entry == None:
+                return None
+            entry['last_used'] = time.time()
+            self.__save_index()
+            if not isinstance(destination_path, str):
+                with open(self.__get_cached_file_path(key), 'rb') as cached_file:
+                    shutil.copyfileobj(cached_file, destination_path)
+                destination_path.seek(0)
+                return destination_path
+            if os.path.isdir(destination_path):
+                destination_path = os.path.join(destination_path, os.path.basename(remote_path))
+            shutil.copyfile(self.__get_cached_file_path(key), destination_path)
+            return destination_path
+
+    def put(
+        self,
+        namespace: str,
+        remote_path: str,
+        local_file: str,
+        remote_size: int = None,
+        remote_mtime: float = None,
+        remote_inode: int = None
+    ) -> None:
+        """
+        @param {str} namespace The namespace of the file (like the device serial number).
+        @param {str} remote_path The path of the file in the remote host.
+        @param {str|IO} local_file The path of the retrieved file, or a binary file-like object with its content.
+        @param {int} remote_size The size of the remote file when it was retrieved.
+        @param {float} remote_mtime The modification time of the remote file when it was retrieved.
+        @param {int} remote_inode The inode of the remote file when it was retrieved (to detect the rotations).
+
+        Stores a copy of a retrieved file, evicting the least recently used entries if the cache is full.
+        """
+        key = self.get_key(namespace, remote_path)
+        with self.__lock:
+            cached_file_path = self.__get_cached_file_path(key)
+            if isinstance(local_file, str):
+                shutil.copyfile(local_file, cached_file_path)
+            else:
+                local_file.seek(0)
+                with open(cached_file_path, 'wb') as cached_file:
+                    shutil.copyfileobj(local_file, cached_file)
+                local_file.seek(0)
+            now = time.time()
+            self.__entries[key] = {
+                'size': os.path.getsize(cached_file_path),
+                'remote_size': remote_size,
+                'remote_mtime': remote_mtime,
+                'remote_inode': remote_inode,
+                'validated_at': now,
+                'last_used': now,
+            }
+            self.__validated_keys.add(key)
+            self.__evict(keep_key = key)
+            self.__save_index()
+
+    def append(
+        self,
+        namespace: str,
+        remote_path: str,
+        chunks,
+        remote_mtime: float = None
+    ) -> int:
+        """
+        @param {str} namespace The namespace of the file (like the device serial number).
+        @param {str} remote_path The path of the file in the remote host.
+        @param {Iterable} chunks The byte chunks appended to the remote file since the cached copy was retrieved.
+        @param {float} remote_mtime The modification time of the remote file.
+
+        Appends the new bytes of an append-only remote file to its cached copy, the remote size is increased
+        accordingly. The chunks are streamed into a temporary file without holding the lock, so a slow transfer does
+        not block the rest of the cache, and they are only appended once they were read completely. If the cached
+        copy changed in the meantime, nothing is appended.
+
+        @returns {int} The number of appended bytes.
+        """
+        key = self.get_key(namespace, remote_path)
+        with self.__lock:
+            entry = self.__get_existing_entry(key)
+            if entry == None:
+                raise Exception(f'There is no cached copy of { remote_path } to append to')
+            previous_size = entry['size']
+        file_descriptor, temporary_path = tempfile.mkstemp(dir = self.directory, suffix = self.TEMPORARY_FILE_SUFFIX)
+        try:
+            appended_bytes = 0
+            with os.fdopen(file_descriptor, 'wb') as temporary_file:
+                for chunk in chunks:
+                    temporary_file.write(chunk)
+                    appended_bytes += len(chunk)
+            with self.__lock:
+                entry = self.__get_existing_entry(key)
+                if entry == None or entry['size'] != previous_size:
+                    raise Exception(f'The cached copy of { remote_path } changed while the new bytes were retrieved')
+                with open(self.__get_cached_file_path(key), 'ab') as cached_file:
+                    with open(temporary_path, 'rb') as temporary_file:
+                        shutil.copyfileobj(temporary_file, cached_file)
+                now = time.time()
+                entry['size'] += appended_bytes
+                entry['remote_size'] += appended_bytes
+                entry['remote_mtime'] = remote_mtime
+                entry['validated_at'] = now
+                entry['last_used'] = now
+                self.__validated_keys.add(key)
+                self.__evict(keep_key = key)
+                self.__save_index()
+                return appended_bytes
+        finally:
+            os.remove(temporary_path)
+
+    def get_entry(
+        self,
+        namespace: str,
+        remote_path: str
+    ) -> dict:
+        """
+        @param {str} namespace The namespace of the file (like the device serial number).
+        @param {str} remote_path The path of the file in the remote host.
+
+        @returns {dict} A copy of the entry (size, remote_size, remote_mtime and remote_inode), None if it does not exist.
+        """
+        with self.__lock:
+            entry = self.__get_existing_entry(self.get_key(namespace, remote_path))
+            return dict(entry) if entry != None else None
+
+    def set_metadata(
+        self,
+        namespace: str,
+        remote_path: str,
+        name: str,
+        value
+    ) -> None:
+        """
+        @param {str} namespace The namespace of the file (like the device serial number).
+        @param {str} remote_path The path of the file in the remote host.
+        @param {str} name The name of the metadata.
+        @param value The JSON-compatible value of the metadata.
+
+        Sets a metadata value of an entry (nothing is done if the entry does not exist).
+        """
+        with self.__lock:
+            entry = self.__get_existing_entry(self.get_key(namespace, remote_path))
+            if entry == None:
+                return
+            entry.setdefault('metadata', {})[name] = value
+            self.__save_index()
+
+    def get_metadata(
+        self,
+        namespace: str,
+        remote_path: str,
+        name: str
+    ):
+        """
+        @param {str} namespace The namespace of the file (like the device serial number).
+        @param {str} remote_path The path of the file in the remote host.
+        @param {str} name The name of the metadata.
+
+        @returns The metadata value of the entry (None if the entry or the value does not exist).
+        """
+        with self.__lock:
+            entry = self.__get_existing_entry(self.get_key(namespace, remote_path))
+            return entry.get('metadata', {}).get(name) if entry != None else None
+
+    def read_tail(
+        self,
+        namespace: str,
+        remote_path: str,
+        size: int
+    ) -> bytes:
+        """
+        @param {str} namespace The namespace of the file (like the device serial number).
+        @param {str} remote_path The path of the file in the remote host.
+        @param {int} size The number of bytes to read.
+
+        @returns {bytes} The last bytes of the cached copy.
+        """
+        with self.__lock:
+            with open(self.__get_cached_file_path(self.get_key(namespace, remote_path)), 'rb') as cached_file:
+                cached_file.seek(0, os.SEEK_END)
+                cached_file.seek(max(0, cached_file.tell() - size))
+                return cached_file.read()
+
+    def remove(
+        self,
+        namespace: str,
+        remote_path: str
+    ) -> None:
+        """
+        @param {str} namespace The namespace of the file (like the device serial number).
+        @param {str} remote_path The path of the file in the remote host.
+
+        Removes an entry and its cached file.
+        """
+        with self.__lock:
+            self.__remove_entry(self.get_key(namespace, remote_path))
+            self.__save_index()
+
+    def get_size(self) -> int:
+        """
+        @returns {int} The total size of the cached files in bytes.
+        """
+        with self.__lock:
+            return sum(entry['size'] for entry in self.__entries.values())
+
+    # Internal helpers
+
+    def __get_existing_entry(self, key: str) -> dict:
+        """Returns the entry of a key, if its cached file still exists."""
+        entry = self.__entries.get(key)
+        if entry != None and not os.path.exists(self.__get_cached_file_path(key)):
+            self.__entries.pop(key)
+            return None
+        return entry
+
+    def __evict(self, keep_key: str = None) -> None:
+        """Evicts the least recently used entries until the total size is under the limit."""
+        total_size = sum(entry['size'] for entry in self.__entries.values())
+        for key in sorted(self.__entries, key = lambda key: self.__entries[key]['last_used']):
+            if total_size <= self.max_size:
+                break
+            if key == keep_key:
+                continue
+            total_size -= self.__entries[key]['size']
+            self.__remove_entry(key)
+
+    def __remove_entry(self, key: str) -> None:
+        """Removes an entry and its cached file."""
+        self.__entries.pop(key, None)
+        self.__validated_keys.discard(key)
+        cached_file_path = self.__get_cached_file_path(key)
+        if os.path.exists(cached_file_path):
+            os.remove(cached_file_path)
+
+    def __get_cached_file_path(self, key: str) -> str:
+        """Returns the path of the cached file of a key (the key is hashed, so it is a valid file name)."""
+        return os.path.join(self.directory, hashlib.sha256(key.encode()).hexdigest())
+
+    def __load_index(self) -> dict:
+        """Loads the index of the entries (empty if it does not exist or it is corrupted)."""
+        try:
+            with open(os.path.join(self.directory, self.INDEX_FILE_NAME)) as index_file:
+                return json.load(index_file)
+        except (OSError, ValueError):
+            return {}
+
+    def __save_index(self) -> None:
+        """Saves the index of the entries, replacing the previous one atomically."""
+        index_path = os.path.join(self.directory, self.INDEX_FILE_NAME)
+        with open(index_path + '.tmp', 'w') as index_file:
+            json.dump(self.__entries, index_file)
+        os.replace(index_path + '.tmp', index_path)
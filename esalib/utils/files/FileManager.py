@@ -1,5 +1,9 @@
+import codecs
+import mmap
 import os
 import re
+import time
+from collections import deque
 # Compressed files handler
 from ..files.compressed_files.CompressedFileManager import CompressedFileManager
 # Utils
@@ -8,23 +12,74 @@ from ..logger.Logger import Logger
 
 class FileManager:
     """
-    @version 1.7.3
+    @version 1.12.2
 
     Class to handle the most common operations for files in a predictable and decoupled-from-implementation way.
     It also supports compressed files, handling the file according to it's extension making use of the 
     strategy pattern via the CompressedFileManager wrapper, which decides which strategy to use.
+    Instead of a path, a binary file-like object (like a BytesIO or a SpooledTemporaryFile with a retrieved file) can
+    be managed, so files retrieved in memory are searched without touching the disk. The object is rewound on every
+    open, and it is not closed until the file is deleted.
+    The regex searches in uncompressed files memory-map the file and run a bytes regex over the mapped buffer, in
+    windows of $search_window_size bytes that end at a line boundary, so the lines are not decoded one by one. Every
+    candidate line is verified with the original regex, so the results are the same as the ones of the line by line
+    search, which remains for the compressed files, the file-like objects and the regexes that cannot be adapted to
+    the UTF-8 bytes (like the non-ASCII or case-insensitive ones).
+    Several literals and regexes can be searched in a single pass (search_patterns): the lines are prefiltered with
+    the alternation of all of them, and only the matching lines are checked against every pattern.
+    The chronological files (like logs) can be searched newest-first (search_lines_in_reverse): the file is read in
+    blocks backwards from its end, and the search stops at the first matches or once its line or time budget is spent.
+    They can also be searched within a time window (search_lines_in_time_window): the first line of the window is
+    found with a binary search over the byte offsets (parsing the timestamp of the line at every offset, with the
+    provided parser), so only the lines of the window are decoded and matched.
     """
+    # Results of the multi-pattern search: first match, number of matching lines or all the matches of every pattern
+    SEARCH_FIRST = 'first'
+    SEARCH_COUNT = 'count'
+    SEARCH_ALL = 'all'
+
+    # Regex of the backreferences, which cannot be combined in an alternation (their groups are renumbered)
+    __BACKREFERENCE_REGEX = re.compile(r'\\[1-9]|\(\?P=')
+
+    # Bytes regex of a multibyte UTF-8 character (its leading byte and its continuation bytes)
+    __MULTIBYTE_CHARACTER = r'[\xc0-\xff][\x80-\xbf]*'
+    # Bytes versions of the regex elements that match differently in the decoded lines: the ones that match a single
+    # character must match a whole multibyte character (their ASCII part never matches its bytes, so there is only
+    # one way to match it), the word boundaries may be next to a non-ASCII character and the end of line may be a CRLF
+    __BYTES_ELEMENTS = {
+        '.': rf'(?:[^\n\x80-\xff]|{ __MULTIBYTE_CHARACTER })',
+        '$': r'(?=\r?$)',
+        r'\d': rf'(?:\d|{ __MULTIBYTE_CHARACTER })',
+        r'\D': rf'(?:[^\d\x80-\xff]|{ __MULTIBYTE_CHARACTER })',
+        r'\w': rf'(?:\w|{ __MULTIBYTE_CHARACTER })',
+        r'\W': rf'(?:[^\w\x80-\xff]|{ __MULTIBYTE_CHARACTER })',
+        r'\s': rf'(?:[\s\x1c-\x1f]|{ __MULTIBYTE_CHARACTER })',
+        r'\S': rf'(?:[^\s\x80-\xff]|{ __MULTIBYTE_CHARACTER })',
+        r'\b': r'(?:\b|(?<=[\x80-\xff])|(?=[\x80-\xff]))',
+        r'\B': r'(?:\B|(?<=[\x80-\xff])|(?=[\x80-\xff]))',
+    }
+    __UNICODE_CLASS_ESCAPES = (r'\d', r'\D', r'\w', r'\W', r'\s', r'\S')
+    # Escapes of non-ASCII characters (and octal escapes), and inline flags, which cannot be adapted to the bytes
+    __NON_ASCII_ESCAPE_REGEX = re.compile(r'\\(?:x[89a-fA-F]|[uUN]|[0-3][0-7]{2})')
+    __INLINE_FLAGS_REGEX = re.compile(r'\(\?[aiLmsux-]')
+
     def __init__(
         self, 
         path_to_file,
+        file_name: str = None,
+        search_window_size: int = 16777216,
     ):
         """
-        @param {str} path_to_file The path to the file to manage.
+        @param {str|IO} path_to_file The path to the file to manage, or a binary file-like object.
+        @param {str} file_name The name of the file, for file-like objects (their name attribute by default).
+        @param {int} search_window_size The number of bytes searched at once in the memory-mapped files (16MB by default, extended to the end of the line).
 
-        The file extension and file name are determined based on the provided path.
+        The file extension and file name are determined based on the provided path (or name).
         """
         self.path_to_file = path_to_file
-        self.file_name = ''
+        self.search_window_size: int = search_window_size
+        self.file = None
+        self.file_name = file_name if file_name else ''
         self.file_extension = ''
         # We set the file extension internally
         self.__set_file_name()
@@ -38,8 +93,18 @@ class FileManager:
         Method to open a file and get the reference to it. It supports compressed files, applying 
         the concrete strategy to get the file content via the CompressedFileManager facade.
         """
+        # We rewind the file-like objects, they are read from the beginning on every open
+        if self.__is_file_object():
+            self.path_to_file.seek(0)
+            if 'w' in mode:
+                self.path_to_file.truncate()
         # We open the file normally if it is not compressed (this is indicated by the extension)
-        if not self.__is_compressed_file():
+        if self.__is_file_object() and not self.__is_compressed_file():
+            self.file = (
+                self.path_to_file if 'b' in mode
+                else codecs.getreader('utf-8')(self.path_to_file, errors = 'replace')
+            )
+        elif not self.__is_compressed_file():
             self.file = open(self.path_to_file, mode)
         # If the file is compressed, we manage it via the CompressedFileHandler
         else: 
@@ -52,18 +117,26 @@ class FileManager:
     
     def close(self):
         """
-        Method to close an open file.
+        Method to close an open file (the file-like objects are not closed, only their compressed or text readers).
         """
-        if self.file:
+        if not self.file:
+            return
+        # The reader of a file-like object is only dropped, because closing it would close the object
+        if self.__is_file_object() and not self.__is_compressed_file():
+            self.path_to_file.flush()
+        else:
             self.file.close()
 
     def delete_file(self):
         """
         Method to delete a file located in the given path after performing a validation to assure that
-        the file exists.
+        the file exists. A file-like object is closed, which releases its memory (or its temporary file).
         """
         if not self.file_exists():
             return
+        if self.__is_file_object():
+            self.path_to_file.close()
+            return
         os.remove(self.path_to_file)
 
     def rename_file(self, new_file_name: str):
@@ -76,8 +149,10 @@ class FileManager:
         
     def file_exists(self) -> bool:
         """
-        Method that indicates if the file exists in the specified path.
+        Method that indicates if the file exists in the specified path (or if the file-like object is not closed).
         """
+        if self.__is_file_object():
+            return not self.path_to_file.closed
         return os.path.exists(self.path_to_file)
 
     def search_value_with_regex(self, regex: str) -> str:
@@ -103,6 +178,131 @@ class FileManager:
         result = self.__search_with_regex(regex, search_value = False)
         return result != None
 
+    def search_patterns(
+        self,
+        regexes: list[str] = None,
+        literals: list[str] = None,
+        mode: str = SEARCH_FIRST
+    ) -> dict:
+        """
+        @param {list} regexes The regular expressions to search.
+        @param {list} literals The literal strings to search.
+        @param {str} mode The result for every pattern: the first match (first), the number of matching lines (count) or the matches of all the lines (all).
+
+        Searches several patterns reading the file only once. The lines are prefiltered with the alternation of all
+        the patterns, and every candidate line is checked against the patterns that are still pending (in first mode,
+        the search stops once all the patterns were found). The value of a match is its first group (or the whole
+        match if the regex has no groups), and only the first match of every line is taken.
+
+        @returns {dict} The result by pattern: the first value (None if not found), the count, or the list of values.
+        """
+        if mode not in (self.SEARCH_FIRST, self.SEARCH_COUNT, self.SEARCH_ALL):
+            raise Exception(f'Unsupported search mode: { mode }')
+        expressions = {
+            **{ regex: re.compile(regex) for regex in (regexes if regexes else []) },
+            **{ literal: re.compile(re.escape(literal)) for literal in (literals if literals else []) },
+        }
+        results = { pattern: self.__get_initial_search_result(mode) for pattern in expressions }
+        pending = dict(expressions)
+        lines = self.__iterate_candidate_lines(self.__get_prefilter_regex(expressions))
+        try:
+            for line in lines:
+                if not pending:
+                    break
+                for pattern, expression in list(pending.items()):
+                    match = expression.search(line)
+                    if match == None:
+                        continue
+                    value = match.group(1) if expression.groups else match.group(0)
+                    if mode == self.SEARCH_FIRST:
+                        results[pattern] = value
+                        pending.pop(pattern)
+                    elif mode == self.SEARCH_COUNT:
+                        results[pattern] += 1
+                    else:
+                        results[pattern].append(value)
+        finally:
+            lines.close()
+        return results
+
+    def search_lines_in_reverse(
+        self,
+        regex: str,
+        max_count: int = 1,
+        max_lines: int = None,
+        max_seconds: float = None,
+        block_size: int = 65536
+    ) -> list[str]:
+        """
+        @param {str} regex The regular expression in string format.
+        @param {int} max_count The maximum number of matching lines to return (1 by default, the search stops at the first hit).
+        @param {int} max_lines The maximum number of lines to read from the end of the file (all of them by default).
+        @param {float} max_seconds The maximum number of seconds of the search (unlimited by default).
+        @param {int} block_size The number of bytes read at once from the end of the file.
+
+        Searches a regex in the lines of the file, newest-first: the file is read in blocks backwards from its end, so
+        a recent line is found after reading only the tail of the file. The compressed files cannot be read backwards,
+        so they are read forwards (keeping the last matches), and the time budget does not apply to them.
+
+        @returns {list} The matching lines (without the new line character), from the newest to the oldest.
+        """
+        expression = re.compile(regex)
+        if self.__is_compressed_file():
+            return self.__search_lines_forwards_keeping_the_last(expression, max_count, max_lines)
+        deadline = time.monotonic() + max_seconds if max_seconds != None else None
+        matching_lines = []
+        lines = self.__iterate_lines_in_reverse(block_size)
+        try:
+            for read_lines, line in enumerate(lines):
+                if max_lines != None and read_lines >= max_lines:
+                    break
+                if deadline != None and time.monotonic() > deadline:
+                    Logger.debug(f'The reverse search stopped after { read_lines } lines, the time budget was spent.')
+                    break
+                if expression.search(line):
+                    matching_lines.append(line.rstrip('\n'))
+                    if max_count != None and len(matching_lines) >= max_count:
+                        break
+        finally:
+            lines.close()
+        return matching_lines
+
+    def search_lines_in_time_window(
+        self,
+        regex: str,
+        timestamp_parser,
+        start = None,
+        end = None,
+        max_count: int = None
+    ) -> list[str]:
+        """
+        @param {str} regex The regular expression in string format.
+        @param {Callable} timestamp_parser The function that returns the timestamp of a line (None if the line has no timestamp).
+        @param {datetime} start The first timestamp of the window (the beginning of the file by default).
+        @param {datetime} end The last timestamp of the window (the end of the file by default).
+        @param {int} max_count The maximum number of matching lines to return (all of them by default).
+
+        Searches a regex in the lines of a chronological file whose timestamps are within a window (both ends
+        included). The lines without timestamp belong to the previous line with timestamp (like multi-line messages).
+        The first line of the window is found with a binary search over the byte offsets, and the search stops after
+        the last line of the window, so the cost is logarithmic in the size of the file plus the size of the window.
+        The compressed files cannot be read at arbitrary offsets, so they are read from the beginning.
+
+        @returns {list} The matching lines (without the new line character), in chronological order.
+        """
+        expression = re.compile(regex)
+        matching_lines = []
+        lines = self.__iterate_lines_in_time_window(timestamp_parser, start, end)
+        try:
+            for line in lines:
+                if expression.search(line):
+                    matching_lines.append(line.rstrip('\n'))
+                    if max_count != None and len(matching_lines) >= max_count:
+                        break
+        finally:
+            lines.close()
+        return matching_lines
+
     def read_file_content(self, mode = 'rt'):
         """
         @param {str} mode The mode to open the file.
@@ -178,35 +378,372 @@ class FileManager:
         # We set the default result to False if the search_value flag is disabled, because we are looking for a bool value of the ocurrence
         result = None if not search_value else False
         expression = re.compile(regex)
-        # We open and analyze the file, searching for the regex pattern
+        lines = self.__iterate_candidate_lines(regex)
+        try:
+            for line in lines:
+                match = expression.search(line)
+                if match != None:
+                    result = (
+                        match.group(1) 
+                            if search_value
+                            else True
+                    )
+                    Logger.debug(f'Search with regex in file result = { result }')
+                    break
+        finally:
+            lines.close()
+        return result
+
+    def __get_prefilter_regex(self, expressions: dict[str, re.Pattern]) -> str:
+        """
+        @param {dict} expressions The compiled expressions by pattern.
+
+        Method to build the alternation of the expressions, which matches every line where any of them matches.
+        The expressions with backreferences or inline flags cannot be combined, then there is no prefilter (None).
+        """
+        if not expressions:
+            return None
+        sources = [expression.pattern for expression in expressions.values()]
+        if any(self.__BACKREFERENCE_REGEX.search(source) for source in sources):
+            return None
+        prefilter_regex = '|'.join(f'(?:{ source })' for source in sources)
+        try:
+            re.compile(prefilter_regex)
+        except re.error:
+            return None
+        return prefilter_regex
+
+    def __get_initial_search_result(self, mode: str):
+        """Method to get the result of a pattern that was not found, according to the search mode."""
+        if mode == self.SEARCH_COUNT:
+            return 0
+        if mode == self.SEARCH_ALL:
+            return []
+        return None
+
+    def __iterate_candidate_lines(self, prefilter_regex: str):
+        """
+        @param {str} prefilter_regex The regular expression that every matching line must contain (None to read all the lines).
+
+        Method to iterate the lines of the file that may match a regex. The uncompressed files are searched over a
+        memory map (if the regex can be applied to bytes), so only the candidate lines are decoded. Otherwise, all the
+        lines are read (and decoded) one by one.
+        """
+        bytes_expression = self.__get_bytes_expression(prefilter_regex) if prefilter_regex != None else None
+        if bytes_expression != None:
+            yield from self.__iterate_memory_map_candidates(bytes_expression)
+            return
+        # We open the file and read it line by line (not delegating to the reader, which would close the file-like objects)
         self.open()
-        for line in self.file:
-            match = expression.search(line)
-            if match != None:
-                result = (
-                    match.group(1) 
-                        if search_value
-                        else True
-                )
-                Logger.debug(f'Search with regex in file result = { result }')
+        try:
+            for line in self.file:
+                # The reader of the file-like objects does not translate the CRLF line endings (like the text mode does)
+                yield line[:-2] + '\n' if line.endswith('\r\n') else line
+        finally:
+            # We close the file
+            self.close()
+
+    def __iterate_memory_map_candidates(self, bytes_expression: re.Pattern):
+        """
+        @param {Pattern} bytes_expression The regular expression compiled for bytes, in multiline mode.
+
+        Method to iterate the lines of a memory-mapped file where a bytes regex matches, decoded as the line by line
+        search reads them (with universal new lines). The regex is searched window by window (every window ends after
+        a new line character, so the anchors behave as in the lines). A bytes match may span several lines, so the
+        lines must be verified with the original regex.
+        """
+        with open(self.path_to_file, 'rb') as file:
+            # An empty file cannot be mapped (and it has no lines to match)
+            if os.fstat(file.fileno()).st_size == 0:
+                return
+            with mmap.mmap(file.fileno(), 0, access = mmap.ACCESS_READ) as buffer:
+                size = len(buffer)
+                window_start = 0
+                while window_start < size:
+                    window_end = buffer.find(b'\n', min(size, window_start + self.search_window_size) - 1)
+                    window_end = size if window_end == -1 else window_end + 1
+                    position = window_start
+                    while position <= window_end:
+                        candidate = bytes_expression.search(buffer, position, window_end)
+                        if candidate == None:
+                            break
+                        line_start = max(window_start, buffer.rfind(b'\n', window_start, candidate.start()) + 1)
+                        line_end = buffer.find(b'\n', candidate.start(), window_end)
+                        line_end = window_end if line_end == -1 else line_end + 1
+                        if line_end > line_start:
+                            yield buffer[line_start:line_end].decode('utf-8', errors = 'replace').replace('\r\n', '\n')
+                        position = max(line_end, candidate.start() + 1)
+                    window_start = window_end
+
+    def __iterate_lines_in_reverse(self, block_size: int):
+        """
+        @param {int} block_size The number of bytes read at once.
+
+        Method to iterate the lines of the file from the last one to the first one, decoded as the line by line
+        search reads them (with the new line character, and universal new lines). The file is read in blocks
+        backwards from its end, the partial line at the beginning of every block is completed with the next block.
+        """
+        file = self.path_to_file if self.__is_file_object() else open(self.path_to_file, 'rb')
+        try:
+            position = file.seek(0, os.SEEK_END)
+            # The beginning of the oldest part read, which may be a partial line, and whether the next part yielded is
+            # the end of the file (a line without new line character, or nothing)
+            remainder = b''
+            is_last_part = True
+            while position > 0:
+                read_size = min(block_size, position)
+                position -= read_size
+                file.seek(position)
+                parts = (file.read(read_size) + remainder).split(b'\n')
+                remainder = parts.pop(0)
+                for part in reversed(parts):
+                    if is_last_part:
+                        is_last_part = False
+                        if part:
+                            yield self.__decode_line(part, False)
+                        continue
+                    yield self.__decode_line(part, True)
+            # The first line of the file
+            if not is_last_part:
+                yield self.__decode_line(remainder, True)
+            elif remainder:
+                yield self.__decode_line(remainder, False)
+        finally:
+            if not self.__is_file_object():
+                file.close()
+
+    def __iterate_lines_in_time_window(
+        self,
+        timestamp_parser,
+        start,
+        end
+    ):
+        """
+        Method to iterate the lines of the file within a time window. The uncompressed files are read from the offset
+        of the first line of the window (found with a binary search), in binary mode, and decoded as the line by
+        line search reads them. The compressed files are read line by line from the beginning.
+        """
+        if self.__is_compressed_file():
+            self.open()
+            try:
+                for line in self.__filter_lines_in_time_window(self.file, timestamp_parser, start, end):
+                    yield line
+            finally:
+                self.close()
+            return
+        file = self.path_to_file if self.__is_file_object() else open(self.path_to_file, 'rb')
+        try:
+            size = file.seek(0, os.SEEK_END)
+            file.seek(self.__find_time_window_offset(file, size, timestamp_parser, start) if start != None else 0)
+            lines = (
+                self.__decode_line(line[:-1], True) if line.endswith(b'\n') else self.__decode_line(line, False)
+                for line in iter(file.readline, b'')
+            )
+            for line in self.__filter_lines_in_time_window(lines, timestamp_parser, start, end):
+                yield line
+        finally:
+            if not self.__is_file_object():
+                file.close()
+
+    @staticmethod
+    def __filter_lines_in_time_window(
+        lines,
+        timestamp_parser,
+        start,
+        end
+    ):
+        """
+        Method to filter the lines within a time window (the lines without timestamp take the one of the previous
+        line), stopping at the first line after the window.
+        """
+        timestamp = None
+        for line in lines:
+            line_timestamp = timestamp_parser(line)
+            if line_timestamp != None:
+                timestamp = line_timestamp
+            if end != None and timestamp != None and timestamp > end:
                 break
-        # We close the file
-        self.close()
-        return result
+            if start != None and (timestamp == None or timestamp < start):
+                continue
+            yield line
+
+    def __find_time_window_offset(
+        self,
+        file,
+        size: int,
+        timestamp_parser,
+        start
+    ) -> int:
+        """
+        Method to find the offset of the first line with a timestamp not older than $start, with a binary search over
+        the byte offsets of the file (the lines are sorted by timestamp). The lower bound is always the beginning of a
+        line that follows a line older than $start.
+        """
+        low, high = 0, size
+        while low < high:
+            middle = (low + high) // 2
+            line_end, timestamp = self.__read_timestamped_line(file, middle, timestamp_parser)
+            if timestamp == None or timestamp >= start:
+                high = middle
+            else:
+                low = line_end
+        return low
+
+    def __read_timestamped_line(
+        self,
+        file,
+        offset: int,
+        timestamp_parser
+    ) -> tuple:
+        """
+        Method to read the first line with timestamp that begins at (or after) an offset, skipping the partial line.
+
+        @returns {tuple} The offset of the end of the line and its timestamp (None if there are no more lines with timestamp).
+        """
+        file.seek(max(0, offset - 1))
+        # The rest of the line that contains the previous byte is skipped (only its new line character if it ends there)
+        if offset > 0:
+            file.readline()
+        for line in iter(file.readline, b''):
+            timestamp = timestamp_parser(self.__decode_line(line.rstrip(b'\n'), line.endswith(b'\n')))
+            if timestamp != None:
+                return file.tell(), timestamp
+        return file.tell(), None
+
+    def __search_lines_forwards_keeping_the_last(
+        self,
+        expression: re.Pattern,
+        max_count: int,
+        max_lines: int
+    ) -> list[str]:
+        """
+        Method to search a regex in the lines of the file from the first one, keeping the last matching lines (and only
+        the matches in the last $max_lines lines), for the files that cannot be read backwards.
+        """
+        matches = deque(maxlen = max_count)
+        line_count = 0
+        self.open()
+        try:
+            for line_count, line in enumerate(self.file, start = 1):
+                if expression.search(line):
+                    matches.append((line_count, line.rstrip('\n')))
+        finally:
+            self.close()
+        first_line = line_count - max_lines if max_lines != None else 0
+        return [line for line_number, line in reversed(matches) if line_number > first_line]
+
+    @staticmethod
+    def __decode_line(
+        segment: bytes,
+        has_new_line: bool
+    ) -> str:
+        """Method to decode a line read in binary mode, as the text mode reads it (universal new lines)."""
+        line = segment.decode('utf-8', errors = 'replace')
+        if not has_new_line:
+            return line
+        return (line[:-1] if line.endswith('\r') else line) + '\n'
+
+    def __get_bytes_expression(self, regex: str) -> re.Pattern:
+        """
+        @param {str} regex Regular expression.
+
+        Method to compile the regex for the memory-mapped search, if the file is an uncompressed file in the disk and
+        the regex matches the same lines in the UTF-8 bytes as in the decoded lines (otherwise the line by line search
+        is used).
+        """
+        if self.__is_file_object() or self.__is_compressed_file():
+            return None
+        bytes_regex = self.__get_bytes_regex(regex)
+        if bytes_regex == None:
+            return None
+        try:
+            return re.compile(bytes_regex.encode('ascii'), re.MULTILINE)
+        except re.error:
+            return None
+
+    @classmethod
+    def __get_bytes_regex(cls, regex: str) -> str:
+        """
+        @param {str} regex Regular expression.
+
+        Method to adapt a regex to the UTF-8 bytes of the file, so that it matches (at least) every line that the
+        regex matches once decoded. The elements that match a single character (any character, the negated classes
+        and the Unicode aware escapes like \\w or \\s) also match a whole multibyte character, and the end of line
+        anchors also match before the CRLF line endings (which the line by line search reads as new lines). The
+        non-ASCII regexes, the inline flags (like the case-insensitive one) and the absolute anchors cannot be adapted.
+
+        @returns {str} The regex for the bytes (None if it cannot be adapted).
+        """
+        if not regex.isascii() or cls.__NON_ASCII_ESCAPE_REGEX.search(regex) or cls.__INLINE_FLAGS_REGEX.search(regex):
+            return None
+        bytes_regex = []
+        index = 0
+        while index < len(regex):
+            if regex[index] == '[':
+                bytes_class, index = cls.__get_bytes_class(regex, index)
+                if bytes_class == None:
+                    return None
+                bytes_regex.append(bytes_class)
+                continue
+            element = regex[index:index + 2] if regex[index] == '\\' else regex[index]
+            if element in (r'\A', r'\Z'):
+                return None
+            bytes_regex.append(cls.__BYTES_ELEMENTS.get(element, element))
+            index += len(element)
+        return ''.join(bytes_regex)
+
+    @classmethod
+    def __get_bytes_class(
+        cls,
+        regex: str,
+        start: int
+    ) -> tuple:
+        """Method to adapt the character class at $start to the bytes, returning it and the position after it (None if it is not closed)."""
+        index = start + 1
+        is_negated = regex.startswith('^', index)
+        index += is_negated
+        is_unicode_aware = is_negated
+        elements = []
+        while index < len(regex):
+            element = regex[index:index + 2] if regex[index] == '\\' else regex[index]
+            # A closing bracket right after the opening one is a literal
+            if element == ']' and elements:
+                if is_negated:
+                    elements.append(r'\x80-\xff')
+                bytes_class = f'[{ "^" if is_negated else "" }{ "".join(elements) }]'
+                if is_unicode_aware:
+                    bytes_class = f'(?:{ bytes_class }|{ cls.__MULTIBYTE_CHARACTER })'
+                return bytes_class, index + 1
+            is_unicode_aware = is_unicode_aware or element in cls.__UNICODE_CLASS_ESCAPES
+            elements.append(r'\s\x1c-\x1f' if element == r'\s' else element)
+            index += len(element)
+        return None, index
 
     def __set_file_name(self):
         """
         Method to set the file name internally.
         """
+        if self.file_name:
+            return
+        if self.__is_file_object():
+            name = getattr(self.path_to_file, 'name', '')
+            self.file_name = os.path.basename(name) if isinstance(name, str) else ''
+            return
         self.file_name = os.path.basename(self.path_to_file)
 
     def __set_file_extension(self):
         """
         Method to set the file extension internally.
         """
-        _, file_extension = os.path.splitext(self.path_to_file)
+        _, file_extension = os.path.splitext(self.file_name if self.__is_file_object() else self.path_to_file)
         self.file_extension = file_extension
 
+    def __is_file_object(self) -> bool:
+        """
+        Method to determine if the managed file is a file-like object instead of a path.
+        """
+        return not isinstance(self.path_to_file, (str, os.PathLike))
+
     def __is_compressed_file(self):
         """
         Method to determine if the file is compressed, by verifying if the file extension is present
@@ -1,3 +1,6 @@
+import asyncio
+import random
+import threading
 import time
 
 
@@ -13,10 +16,12 @@ class IterationTimeout(Exception):
 
 class IteratorValidator:
     """
-    @version 0.1.0
+    @version 0.3.0
     
     Container for different generators, to validate the number of iterations to execute, either by the number of repetitions or by
     the elapsed time, while providing also the waiting mechanism in this last one.
+    The time is always measured with the monotonic clock against a deadline, so the time spent by the caller between
+    iterations (like the command executions) is counted as well.
     """
 
     @staticmethod
@@ -42,10 +47,161 @@ class IteratorValidator:
         Generator to keep track of the elapsed time of the process, when the process times out an exception is raised.
         It also executes the times.sleep function, so there is no need to worry about it at the caller side. 
         """
-        elapsed_time = 0
+        deadline = time.monotonic() + timeout
         while True:
-            time.sleep(sleep_time)
+            time.sleep(max(0, min(sleep_time, deadline - time.monotonic())))
+            elapsed_time = timeout - (deadline - time.monotonic())
             yield elapsed_time
-            if elapsed_time >= timeout:
+            if time.monotonic() >= deadline:
                 raise IterationTimeout()
-            else: elapsed_time += sleep_time
\ No newline at end of file
+
+    @staticmethod
+    def iterator_with_deadline(
+        timeout: float,
+        initial_sleep_time: float = 0.005,
+        max_sleep_time: float = 1,
+        backoff_factor: float = 2,
+        wake_up_event: threading.Event = None
+    ):
+        """
+        @param {float} timeout The upper limit for the time to wait (in seconds) before raising a timeout exception.
+        @param {float} initial_sleep_time The first sleep time between iterations (in seconds, by default 5ms).
+        @param {float} max_sleep_time The upper limit for the sleep time between iterations (in seconds, by default 1s).
+        @param {float} backoff_factor The factor applied to the sleep time after every iteration (1 for a fixed sleep time).
+        @param {Event} wake_up_event Event that ends the current sleep as soon as it is set (it is cleared afterwards).
+
+        Generator for polling with adaptive backoff: the first iteration is immediate, then the sleep time grows from a
+        few milliseconds up to $max_sleep_time, so a condition that is ready soon is detected soon and the long waits
+        do not poll too often. The sleep never goes beyond the deadline, and the timeout exception is raised on time.
+        """
+        deadline = time.monotonic() + timeout
+        sleep_time = initial_sleep_time
+        iteration = 0
+        while True:
+            yield iteration
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise IterationTimeout()
+            IteratorValidator.__sleep(min(sleep_time, remaining), wake_up_event)
+            sleep_time = min(max_sleep_time, sleep_time * backoff_factor)
+            iteration += 1
+
+    @staticmethod
+    async def async_iterator_with_deadline(
+        timeout: float,
+        initial_sleep_time: float = 0.005,
+        max_sleep_time: float = 1,
+        backoff_factor: float = 2,
+        wake_up_event: asyncio.Event = None
+    ):
+        """
+        @param {float} timeout The upper limit for the time to wait (in seconds) before raising a timeout exception.
+        @param {float} initial_sleep_time The first sleep time between iterations (in seconds, by default 5ms).
+        @param {float} max_sleep_time The upper limit for the sleep time between iterations (in seconds, by default 1s).
+        @param {float} backoff_factor The factor applied to the sleep time after every iteration (1 for a fixed sleep time).
+        @param {asyncio.Event} wake_up_event Event that ends the current sleep as soon as it is set (it is cleared afterwards).
+
+        Asyncio variant of iterator_with_deadline, the sleeps are awaited so the event loop keeps running.
+        """
+        deadline = time.monotonic() + timeout
+        sleep_time = initial_sleep_time
+        iteration = 0
+        while True:
+            yield iteration
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise IterationTimeout()
+            await IteratorValidator.__async_sleep(min(sleep_time, remaining), wake_up_event)
+            sleep_time = min(max_sleep_time, sleep_time * backoff_factor)
+            iteration += 1
+
+    @staticmethod
+    def wait_until(
+        condition,
+        timeout: float,
+        initial_sleep_time: float = 0.005,
+        max_sleep_time: float = 1,
+        wake_up_event: threading.Event = None
+    ):
+        """
+        @param {function} condition Function without arguments that returns a truthy value once the wait is over.
+        @param {float} timeout The upper limit for the time to wait (in seconds) before raising a timeout exception.
+        @param {float} initial_sleep_time The first sleep time between checks (in seconds, by default 5ms).
+        @param {float} max_sleep_time The upper limit for the sleep time between checks (in seconds, by default 1s).
+        @param {Event} wake_up_event Event that triggers an immediate check when it is set.
+
+        Waits until the condition is met, checking it with adaptive backoff.
+
+        @returns The value returned by the condition.
+        """
+        for _ in IteratorValidator.iterator_with_deadline(timeout, initial_sleep_time, max_sleep_time, wake_up_event = wake_up_event):
+            result = condition()
+            if result:
+                return result
+
+    @staticmethod
+    async def async_wait_until(
+        condition,
+        timeout: float,
+        initial_sleep_time: float = 0.005,
+        max_sleep_time: float = 1,
+        wake_up_event: asyncio.Event = None
+    ):
+        """
+        @param {function} condition Coroutine function without arguments that returns a truthy value once the wait is over.
+        @param {float} timeout The upper limit for the time to wait (in seconds) before raising a timeout exception.
+        @param {float} initial_sleep_time The first sleep time between checks (in seconds, by default 5ms).
+        @param {float} max_sleep_time The upper limit for the sleep time between checks (in seconds, by default 1s).
+        @param {asyncio.Event} wake_up_event Event that triggers an immediate check when it is set.
+
+        Asyncio variant of wait_until.
+
+        @returns The value returned by the condition.
+        """
+        async for _ in IteratorValidator.async_iterator_with_deadline(timeout, initial_sleep_time, max_sleep_time, wake_up_event = wake_up_event):
+            result = await condition()
+            if result:
+                return result
+
+    @staticmethod
+    def iterator_with_backoff(
+        max_attempts: int,
+        base_delay: float = 1,
+        max_delay: float = 30
+    ):
+        """
+        @param {int} max_attempts The upper limit for the number of attempts.
+        @param {float} base_delay The delay before the second attempt (in seconds, by default 1s), it is doubled on every attempt.
+        @param {float} max_delay The upper limit for the delay between attempts (in seconds, by default 30s).
+
+        Generator for retries with exponential backoff and full jitter: the first attempt is immediate, and the delay
+        before the next ones is a random value between 0 and the exponential delay, so the clients that failed at the
+        same time do not retry at the same time. When the limit of attempts is reached, an exception is raised.
+        """
+        for attempt in range(max_attempts):
+            if attempt > 0:
+                time.sleep(random.uniform(0, min(max_delay, base_delay * 2 ** (attempt - 1))))
+            yield attempt
+        raise IterationLimitReached()
+
+    # Internal helpers
+
+    @staticmethod
+    def __sleep(sleep_time: float, wake_up_event: threading.Event = None):
+        """Sleeps the given time, unless the wake up event is set before."""
+        if wake_up_event == None:
+            time.sleep(sleep_time)
+        elif wake_up_event.wait(sleep_time):
+            wake_up_event.clear()
+
+    @staticmethod
+    async def __async_sleep(sleep_time: float, wake_up_event: asyncio.Event = None):
+        """Awaits the given time, unless the wake up event is set before."""
+        if wake_up_event == None:
+            await asyncio.sleep(sleep_time)
+            return
+        try:
+            await asyncio.wait_for(wake_up_event.wait(), sleep_time)
+            wake_up_event.clear()
+        except asyncio.TimeoutError:
+            pass
\ No newline at end of file
@@ -19,5 +19,11 @@ setup(
     # Dependencies
     install_requires = [
         'paramiko>=2.10.1',
-    ]
+    ],
+    # Optional dependencies (the asyncio facade of the ESASSHAgent)
+    extras_require = {
+        'asyncio': [
+            'asyncssh>=2.13',
+        ],
+    }
 )
@@ -0,0 +1,49 @@
+import subprocess
+
+
+def execute_locally(command: str) -> subprocess.CompletedProcess:
+    """Runs a command in a local shell, capturing its binary output."""
+    return subprocess.run(command, shell = True, capture_output = True)
+
+
+class LocalExecChannel:
+    """Exec channel stand-in, it runs the command in a local shell and records the bytes received."""
+
+    def __init__(self, command: str = None, transport: 'LocalTransport' = None):
+        self.transport = transport
+        self.output = b''
+        self.exit_status = None
+        self.received_bytes = 0
+        if command != None:
+            self.exec_command(command)
+
+    def exec_command(self, command: str):
+        result = execute_locally(command)
+        self.output = result.stdout
+        self.exit_status = result.returncode
+
+    def settimeout(self, timeout):
+        pass
+
+    def recv(self, size: int) -> bytes:
+        chunk, self.output = self.output[:size], self.output[size:]
+        self.received_bytes += len(chunk)
+        if self.transport != None:
+            self.transport.received_bytes += len(chunk)
+        return chunk
+
+    def recv_exit_status(self) -> int:
+        return self.exit_status
+
+    def close(self):
+        pass
+
+
+class LocalTransport:
+    """SSH transport stand-in, its exec channels run the commands locally."""
+
+    def __init__(self):
+        self.received_bytes = 0
+
+    def open_session(self) -> LocalExecChannel:
+        return LocalExecChannel(transport = self)
@@ -0,0 +1,117 @@
+import asyncio
+import unittest
+# The asyncssh library is an optional dependency (the asyncio extra)
+try:
+    import asyncssh
+except ImportError:
+    raise unittest.SkipTest('asyncssh is not installed (pip install esalib[asyncio])')
+# ESA utils
+from esalib.esa_utils.ESASSHAgent import ESASSHAgent, ESASSHAgentScopes
+from esalib.esa_utils.ESAParameters import ESASSHParameters
+
+
+class ESAServerStandIn(asyncssh.SSHServer):
+    """In-process SSH server that plays the role of the ESA (password authentication only)."""
+
+    def begin_auth(self, username: str) -> bool:
+        return True
+
+    def password_auth_supported(self) -> bool:
+        return True
+
+    def validate_password(self, username: str, password: str) -> bool:
+        return password == 'secret'
+
+
+async def handle_esa_process(process: asyncssh.SSHServerProcess):
+    """Emulates the ESA shell: exec commands are echoed back, and the interactive shell supports csh, cli and a paged command."""
+    if process.command:
+        process.stdout.write(f'ran { process.command }\n')
+        process.exit(0)
+        return
+    prompt = 'esa# '
+    process.stdout.write(prompt)
+    while True:
+        line = await process.stdin.readline()
+        if not line:
+            break
+        command = line.strip()
+        if command == 'csh':
+            prompt = '[root@esa ~]'
+        elif command == 'cli':
+            prompt = 'esa.local> '
+        elif command == 'showconfig':
+            process.stdout.write('part 1\n-Press Any Key For More-')
+            await process.stdin.read(1)
+            process.stdout.write('\npart 2\n')
+        elif command == 'showxml':
+            # The output contains > characters, and it arrives in several reads
+            process.stdout.write('<config>\n')
+            await asyncio.sleep(0.1)
+            process.stdout.write('  <hostname>esa.local</hostname>\n</config>\n')
+        elif command:
+            process.stdout.write(f'{ command } output\n')
+        process.stdout.write(prompt)
+    process.exit(0)
+
+
+class AsyncSSHStrategyTest(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self) -> None:
+        self.server = await asyncssh.create_server(
+            ESAServerStandIn,
+            '127.0.0.1',
+            0,
+            server_host_keys = [asyncssh.generate_private_key('ssh-ed25519')],
+            process_factory = handle_esa_process,
+            line_editor = False
+        )
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def asyncTearDown(self) -> None:
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def get_connected_agent(self) -> ESASSHAgent:
+        esa_ssh_agent = ESASSHAgent(ESASSHParameters('127.0.0.1', 'admin', 'secret', self.port))
+        await esa_ssh_agent.async_start_connection()
+        return esa_ssh_agent
+
+    async def test_command(self):
+        """Tests the awaitable method to execute a command and get the output."""
+        esa_ssh_agent = await self.get_connected_agent()
+        self.assertEqual(await esa_ssh_agent.async_execute_command('ls'), 'ran ls\n')
+        await esa_ssh_agent.async_close_connection()
+
+    async def test_cli_command(self):
+        """Tests the awaitable method to execute a command at CLI level, including a paginated output."""
+        esa_ssh_agent = await self.get_connected_agent()
+        output = await esa_ssh_agent.async_execute_cli_command('version')
+        self.assertIn('version output', output)
+        self.assertEqual(esa_ssh_agent.async_scope, ESASSHAgentScopes._CLI_MODE)
+        output = await esa_ssh_agent.async_execute_cli_command('showconfig')
+        self.assertIn('part 2', output)
+        await esa_ssh_agent.async_close_connection()
+
+    async def test_output_with_prompt_characters(self):
+        """Tests that a > inside the output of a CLI command is not taken for the end of the prompt."""
+        esa_ssh_agent = await self.get_connected_agent()
+        output = await esa_ssh_agent.async_execute_cli_command('showxml')
+        self.assertIn('</config>', output)
+        self.assertTrue(output.endswith('esa.local> '))
+        self.assertIn('version output', await esa_ssh_agent.async_execute_cli_command('version'))
+        await esa_ssh_agent.async_close_connection()
+
+    async def test_concurrent_sessions(self):
+        """Tests that a single event loop drives several CLI sessions concurrently."""
+        esa_ssh_agents = await asyncio.gather(*(self.get_connected_agent() for _ in range(10)))
+        outputs = await asyncio.gather(*(
+            esa_ssh_agent.async_execute_cli_command(f'status { index }')
+            for index, esa_ssh_agent in enumerate(esa_ssh_agents)
+        ))
+        for index, output in enumerate(outputs):
+            self.assertIn(f'status { index } output', output)
+        await asyncio.gather(*(esa_ssh_agent.async_close_connection() for esa_ssh_agent in esa_ssh_agents))
+
+if __name__ == '__main__':
+    unittest.main()
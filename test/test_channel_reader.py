@@ -0,0 +1,169 @@
+import socket
+import threading
+import unittest
+# Readers
+from esalib.infrastructure.ssh_manager.readers.ChannelReader import ChannelReader
+from esalib.infrastructure.ssh_manager.readers.PromptMatcher import PromptMatcher
+# SSH
+from esalib.infrastructure.ssh_manager.strategy.ParamikoStrategy import ParamikoStrategy
+# Utils
+from esalib.utils.validators.IteratorValidator import IterationTimeout
+
+
+class ChannelReaderTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        # We use a socket pair as the channel, the remote end plays the role of the device
+        self.channel, self.remote = socket.socketpair()
+        self.channel_reader = ChannelReader(self.channel)
+
+    def tearDown(self) -> None:
+        self.channel.close()
+        self.remote.close()
+
+    def test_read_until_delimiter(self):
+        """Tests that the output is returned once the delimiter is received."""
+        self.remote.sendall(b'Current version: 14.0\nesa.local> ')
+        output = self.channel_reader.read_until('>', timeout = 1)
+        self.assertEqual(output, 'Current version: 14.0\nesa.local> ')
+
+    def test_multibyte_character_split_between_reads(self):
+        """Tests that a multibyte character split across two reads is decoded correctly."""
+        data = 'Contraseña]'.encode()
+        # We force a read of 1 byte, so the ñ is split in two reads
+        self.remote.sendall(data)
+        output = self.channel_reader.read_until(']', timeout = 1, buffer_size = 1)
+        self.assertEqual(output, 'Contraseña]')
+
+    def test_delimiter_split_between_reads(self):
+        """Tests that a delimiter split across two reads is found."""
+        self.remote.sendall(b'config]>')
+        output = self.channel_reader.read_until(']>', timeout = 1, buffer_size = 7)
+        self.assertEqual(output, 'config]>')
+
+    def test_more_output_delimiter_is_answered(self):
+        """Tests that the space char is sent when the output is paginated."""
+        self.remote.sendall(b'line 1\n-Press Any Key For More-')
+        self.remote.settimeout(1)
+        # The output never ends, but the pager must have been answered with the space char
+        with self.assertRaises(IterationTimeout):
+            self.channel_reader.read_until('>', '-Press Any Key For More-', timeout = 0.2)
+        self.assertEqual(self.remote.recv(1), b' ')
+
+    def test_keep_remainder_splits_pipelined_outputs(self):
+        """Tests that the outputs of pipelined commands are split at the prompt boundaries."""
+        self.remote.sendall(b'status output\nesa.local> version output\nesa.local> ')
+        first_output = self.channel_reader.read_until('> ', timeout = 1, keep_remainder = True)
+        second_output = self.channel_reader.read_until('> ', timeout = 1, keep_remainder = True)
+        self.assertEqual(first_output, 'status output\nesa.local> ')
+        self.assertEqual(second_output, 'version output\nesa.local> ')
+
+    def test_timeout(self):
+        """Tests that a timeout exception is raised if the delimiter never arrives."""
+        with self.assertRaises(IterationTimeout):
+            self.channel_reader.read_until('>', timeout = 0.1)
+
+    def test_prompt_matcher_ignores_delimiters_inside_the_output(self):
+        """Tests that a > inside the output does not end the read, and that the matched prompt is reported."""
+        prompt_matcher = PromptMatcher.get_esa_prompt_matcher(PromptMatcher.CLI, PromptMatcher.CONFIG)
+        self.remote.sendall(b'Recipient <a@b.com>')
+        with self.assertRaises(IterationTimeout):
+            self.channel_reader.read_until(prompt_matcher, timeout = 0.2)
+        self.remote.sendall(b'\nChoose the operation:\n[]> ')
+        self.assertEqual(self.channel_reader.read_until(prompt_matcher, timeout = 1), '\nChoose the operation:\n[]> ')
+        self.assertEqual(self.channel_reader.matched_prompt, PromptMatcher.CONFIG)
+
+    def test_prompt_matcher_answers_the_pager(self):
+        """Tests that the pager detected by the matcher is answered and the read goes on."""
+        prompt_matcher = PromptMatcher.get_esa_prompt_matcher(PromptMatcher.CLI, PromptMatcher.PAGER)
+        self.remote.sendall(b'line 1\n-Press Any Key For More-')
+        self.remote.settimeout(1)
+        with self.assertRaises(IterationTimeout):
+            self.channel_reader.read_until(prompt_matcher, timeout = 0.2)
+        self.assertEqual(self.remote.recv(1), b' ')
+        self.assertEqual(self.channel_reader.pages_requested, 1)
+
+
+class SocketChannel:
+    """Shell channel stand-in over a socket, the strategy checks if it is active."""
+    active = True
+
+    def __init__(self, socket_object: socket.socket):
+        self.socket = socket_object
+
+    def send(self, data) -> int:
+        return self.socket.send(data.encode() if isinstance(data, str) else data)
+
+    def recv(self, size: int) -> bytes:
+        return self.socket.recv(size)
+
+    def fileno(self) -> int:
+        return self.socket.fileno()
+
+
+class PipelinedCommandsTest(unittest.TestCase):
+    """Tests the pipelined commands of the ParamikoStrategy against an emulated ESA CLI."""
+
+    PROMPT = 'esa.local> '
+
+    def setUp(self) -> None:
+        self.channel, self.remote = socket.socketpair()
+        self.executed_commands = []
+        self.device_thread = threading.Thread(target = self.emulate_cli, daemon = True)
+        self.device_thread.start()
+        self.strategy = ParamikoStrategy({})
+        self.strategy.channel = SocketChannel(self.channel)
+        self.strategy.channel_reader = ChannelReader(self.strategy.channel)
+        self.strategy.set_channel_properties(timeout = 5, sleep_time = 0.1, buffer_size = 4096)
+
+    def tearDown(self) -> None:
+        self.channel.close()
+        self.device_thread.join(1)
+        self.remote.close()
+
+    def emulate_cli(self):
+        """Reads the input byte by byte, like a terminal, the pager takes the next byte of the input as the key."""
+        remote_file = self.remote.makefile('rb', buffering = 0)
+        while True:
+            line = remote_file.readline()
+            if not line:
+                return
+            command = line.decode().strip()
+            self.executed_commands.append(command)
+            self.remote.sendall(f'{ command }\r\n'.encode())
+            if command == 'showconfig':
+                self.remote.sendall(b'part 1\r\n-Press Any Key For More-')
+                remote_file.read(1)
+                self.remote.sendall(b'\r\npart 2\r\n')
+            elif command == 'recipients':
+                self.remote.sendall(b'Recipient <a@b.com>\r\n')
+            else:
+                self.remote.sendall(f'{ command } output\r\n'.encode())
+            self.remote.sendall(self.PROMPT.encode())
+
+    def test_outputs_are_split_at_the_prompts(self):
+        """Tests that a > inside a pipelined output does not split it."""
+        prompt_matcher = PromptMatcher.get_esa_prompt_matcher(PromptMatcher.CLI, PromptMatcher.PAGER)
+        outputs = self.strategy.execute_async_commands(
+            [('recipients', prompt_matcher), ('status', prompt_matcher)], '-Press Any Key For More-'
+        )
+        self.assertEqual(outputs, [
+            f'recipients\r\nRecipient <a@b.com>\r\n{ self.PROMPT }', f'status\r\nstatus output\r\n{ self.PROMPT }'
+        ])
+
+    def test_pipeline_stops_at_the_pager(self):
+        """Tests that the batch is resumed from a paginated command that was not flagged with may_page."""
+        prompt_matcher = PromptMatcher.get_esa_prompt_matcher(PromptMatcher.CLI, PromptMatcher.PAGER)
+        outputs = self.strategy.execute_async_commands(
+            [('status', prompt_matcher), ('showconfig', prompt_matcher), ('version', prompt_matcher)],
+            '-Press Any Key For More-'
+        )
+        self.assertEqual(outputs[0], f'status\r\nstatus output\r\n{ self.PROMPT }')
+        self.assertIn('part 1', outputs[1])
+        self.assertIn('part 2', outputs[1])
+        self.assertEqual(outputs[2], f'version\r\nversion output\r\n{ self.PROMPT }')
+        # The pager took the first byte of the pipelined version command
+        self.assertEqual(self.executed_commands, ['status', 'showconfig', 'ersion', 'showconfig', 'version'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import re
+import socket
+import unittest
+# SSH
+from esalib.infrastructure.ssh_manager.readers.CommandStream import CommandStream
+# Utils
+from esalib.utils.validators.IteratorValidator import IterationTimeout
+
+
+class FakeExecChannel:
+    """Exec channel stand-in, it returns the provided chunks and then the end of the output."""
+
+    def __init__(self, chunks: list[bytes], exit_status: int = 0):
+        self.chunks = list(chunks)
+        self.exit_status = exit_status
+        self.reads = 0
+        self.closed = False
+
+    def settimeout(self, timeout):
+        self.timeout = timeout
+
+    def recv(self, size: int) -> bytes:
+        if self.closed or not self.chunks:
+            return b''
+        self.reads += 1
+        chunk = self.chunks.pop(0)
+        if chunk == None:
+            raise socket.timeout()
+        return chunk
+
+    def recv_exit_status(self) -> int:
+        return self.exit_status
+
+    def close(self):
+        self.closed = True
+
+
+class CommandStreamTest(unittest.TestCase):
+
+    def test_lines(self):
+        """Tests that the lines are decoded and joined across the chunks (including multibyte chars)."""
+        stream = CommandStream(FakeExecChannel([b'first li', b'ne\nsecond \xc3', b'\xa9\nlast'], exit_status = 1))
+        self.assertEqual(list(stream), ['first line', 'second é', 'last'])
+        self.assertEqual(stream.get_exit_status(), 1)
+
+    def test_stop_on_match(self):
+        """Tests that the stream stops reading (and closes the channel) once a line matches."""
+        channel = FakeExecChannel([b'a\n', b'error: 42\n', b'b\n', b'c\n'])
+        stream = CommandStream(channel, stop_on = re.compile(r'error: \d+'))
+        self.assertEqual(list(stream), ['a', 'error: 42'])
+        self.assertEqual(stream.match, 'error: 42')
+        self.assertTrue(stream.is_stopped_early and channel.closed)
+        self.assertEqual(channel.reads, 2)
+        self.assertIsNone(stream.get_exit_status())
+
+    def test_chunks_are_read_on_demand(self):
+        """Tests that the channel is only read when the consumer requests more data."""
+        channel = FakeExecChannel([b'1', b'2', b'3'])
+        chunks = CommandStream(channel).iter_chunks()
+        self.assertEqual(next(chunks), b'1')
+        self.assertEqual(channel.reads, 1)
+
+    def test_timeout(self):
+        """Tests that a stalled command raises a timeout."""
+        channel = FakeExecChannel([b'a\n', None])
+        stream = CommandStream(channel, timeout = 1)
+        lines = []
+        with self.assertRaises(IterationTimeout):
+            for line in stream:
+                lines.append(line)
+        self.assertEqual(lines, ['a'])
+        self.assertEqual(channel.reads, 2)
+
+if __name__ == '__main__':
+    unittest.main()
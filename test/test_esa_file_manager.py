@@ -0,0 +1,397 @@
+import dataclasses
+import json
+import os
+from datetime import datetime
+import shutil
+import tempfile
+import unittest
+from io import BytesIO
+from scp import SCPException
+# ESA utils
+from esalib.esa_utils.ESAFileManager import ESAFileManager
+from esalib.esa_utils.ESASNMPDConf import ESASNMPDConf
+# SSH
+from esalib.infrastructure.ssh_manager.readers.CommandStream import CommandStream
+from esalib.infrastructure.ssh_manager.strategy.SSHStrategy import SSHStrategy
+# Utils
+from esalib.utils.files.FileCache import FileCache
+from esalib.utils.files.FileManager import FileManager
+# Test stand-ins
+from .local_shell import LocalExecChannel, execute_locally
+
+
+class LocalSSHAgent:
+    """ESASSHAgent stand-in, the remote files are local files and the commands are executed locally."""
+
+    def __init__(self):
+        self.esa_ip = '127.0.0.1'
+        self.esa_ssh_port = 22
+        self.commands = []
+        self.channels = []
+        self.retrieved_files = []
+        self.compressed_files = []
+
+    def execute_command(self, command: str, idempotent: bool = False) -> str:
+        self.commands.append(command)
+        return execute_locally(command).stdout.decode()
+
+    def execute_commands(self, commands: list[str], max_channels: int = SSHStrategy.MAX_CHANNELS, idempotent: bool = False) -> list[str]:
+        return [self.execute_command(command) for command in commands]
+
+    def stream_command(self, command: str, idempotent: bool = False) -> CommandStream:
+        self.commands.append(command)
+        self.channels.append(LocalExecChannel(command))
+        return CommandStream(self.channels[-1])
+
+    def get_file_with_scp(self, path_to_file: str, destination_path: str = None):
+        self.retrieved_files.append(path_to_file)
+        # Like SCP, a missing remote file is reported by the remote side
+        if not os.path.exists(path_to_file):
+            raise SCPException(f'scp: { path_to_file }: No such file or directory')
+        shutil.copy(path_to_file, destination_path)
+
+    def get_file_in_memory(self, path_to_file: str, max_memory_size: int = 1048576):
+        self.retrieved_files.append(path_to_file)
+        file_object = tempfile.SpooledTemporaryFile(max_size = max_memory_size)
+        with open(path_to_file, 'rb') as file:
+            shutil.copyfileobj(file, file_object)
+        file_object.seek(0)
+        return file_object
+
+    def get_file_compressed(self, path_to_file: str, destination_path: str = None, decompress: bool = True) -> str:
+        self.compressed_files.append(path_to_file)
+        return shutil.copy(path_to_file, destination_path)
+
+    def get_files_with_scp(self, paths_to_files: list[str], destination_path: str = None, max_concurrency: int = SSHStrategy.MAX_CHANNELS):
+        for path_to_file in paths_to_files:
+            self.get_file_with_scp(path_to_file, destination_path)
+
+
+class ESAFileManagerRemoteSearchTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        self.remote_path = os.path.join(self.directory, 'remote', 'qlogd_alert_messages.dat')
+        os.makedirs(os.path.dirname(self.remote_path))
+        with open(self.remote_path, 'w') as file:
+            file.write('Info: start\nWarning: Invalid Key (1)\nInfo: ok\nWarning: Invalid Key (2)\n')
+        self.ssh_agent = LocalSSHAgent()
+        self.esa_file_manager = ESAFileManager(self.ssh_agent, os.path.join(self.directory, 'local'), search_logs_remotely = True)
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.directory)
+
+    def test_remote_search(self):
+        """Tests that the remote search returns the matching lines without retrieving the file."""
+        self.assertEqual(self.esa_file_manager.get_first_match_in_remote_file(self.remote_path, 'Invalid Key'), 'Warning: Invalid Key (1)')
+        self.assertEqual(self.esa_file_manager.count_in_remote_file(self.remote_path, 'Invalid Key'), 2)
+        self.assertEqual(self.esa_file_manager.count_in_remote_file(self.remote_path, 'Missing'), 0)
+        self.assertEqual(self.esa_file_manager.search_in_remote_file(self.remote_path, 'Missing'), [])
+        self.assertEqual(self.ssh_agent.retrieved_files, [])
+
+    def test_binary_log(self):
+        """Tests that a log with non-text bytes (like a NUL) is searched as text, returning the matching lines."""
+        with open(self.remote_path, 'ab') as file:
+            file.write(b'Warning: Invalid Key (3)\0\n')
+        self.assertEqual(self.esa_file_manager.search_in_remote_file(self.remote_path, 'Invalid Key'), [
+            'Warning: Invalid Key (1)', 'Warning: Invalid Key (2)', 'Warning: Invalid Key (3)\0'
+        ])
+        self.assertEqual(self.esa_file_manager.count_in_remote_file(self.remote_path, 'Invalid Key'), 3)
+        self.assertEqual(self.ssh_agent.retrieved_files, [])
+
+    def test_local_fallback(self):
+        """Tests that the file is retrieved and searched locally when the regex is not supported by grep."""
+        self.assertEqual(self.esa_file_manager.search_in_remote_file(self.remote_path, r'Key \(\d\)'), [
+            'Warning: Invalid Key (1)', 'Warning: Invalid Key (2)'
+        ])
+        self.assertEqual(self.ssh_agent.retrieved_files, [self.remote_path])
+        # The GNU extensions are not supported by the BSD grep of the ESA either
+        self.assertEqual(self.esa_file_manager.count_in_remote_file(self.remote_path, r'Invalid\sKey\b'), 2)
+        self.assertEqual(self.ssh_agent.commands, [])
+
+    def test_multi_pattern_search(self):
+        """Tests that several patterns are searched in the logs with a single grep (or a single local read)."""
+        self.esa_file_manager.ESA_LOG_FILE_PATH = self.remote_path
+        results = self.esa_file_manager.search_patterns_in_the_logs(
+            regexes = [r'Invalid Key \(([0-9])\)', 'Missing'], literals = ['Info: ok'], mode = FileManager.SEARCH_ALL
+        )
+        self.assertEqual(results, { r'Invalid Key \(([0-9])\)': ['1', '2'], 'Missing': [], 'Info: ok': ['Info: ok'] })
+        self.assertEqual(len(self.ssh_agent.commands), 1)
+        self.assertEqual(
+            self.esa_file_manager.get_warnings_present_in_the_logs([r'Key \(\d\)', 'Missing']),
+            { r'Key \(\d\)': True, 'Missing': False }
+        )
+        self.assertEqual(self.ssh_agent.retrieved_files, [self.remote_path])
+
+    def test_newest_first_search(self):
+        """Tests that the logs are searched newest-first, remotely or in the local copy when there is a line budget."""
+        self.esa_file_manager.ESA_LOG_FILE_PATH = self.remote_path
+        self.assertEqual(self.esa_file_manager.get_last_matches_in_the_logs('Invalid Key'), ['Warning: Invalid Key (2)'])
+        self.assertEqual(self.ssh_agent.retrieved_files, [])
+        self.assertTrue(self.esa_file_manager.is_warning_recent_in_the_logs('Invalid Key', max_lines = 2))
+        self.assertFalse(self.esa_file_manager.is_warning_recent_in_the_logs('start', max_lines = 3))
+        self.assertEqual(self.ssh_agent.retrieved_files, [self.remote_path])
+
+    def test_time_window_search(self):
+        """Tests that the logs are searched within a time window, parsing the ESA timestamps."""
+        with open(self.remote_path, 'w') as file:
+            file.write(
+                'Sun Oct  3 23:59:59 2021 Warning: Invalid Key (1)\n'
+                'Mon Oct  4 10:02:45 2021 Info: start\n'
+                'Mon Oct  4 11:00:00 2021 Warning: Invalid Key (2)\n'
+                'Tue Oct  5 09:00:00 2021 Info: ok\n'
+            )
+        self.esa_file_manager.ESA_LOG_FILE_PATH = self.remote_path
+        self.assertEqual(
+            self.esa_file_manager.search_in_the_logs_between('Invalid Key', datetime(2021, 10, 4), datetime(2021, 10, 5)),
+            ['Mon Oct  4 11:00:00 2021 Warning: Invalid Key (2)']
+        )
+        self.assertFalse(self.esa_file_manager.is_warning_present_in_the_logs_between('Invalid Key', datetime(2021, 10, 4, 12)))
+
+    def test_missing_remote_file(self):
+        """Tests that a remote error (like a missing file) falls back to the local search."""
+        missing_path = os.path.join(self.directory, 'missing.dat')
+        with self.assertRaisesRegex(SCPException, 'No such file or directory'):
+            self.esa_file_manager.search_in_remote_file(missing_path, 'Invalid Key')
+        # The remote grep is attempted first, and its error leads to the retrieval of the file
+        self.assertTrue(self.ssh_agent.commands[0].startswith('grep -a -E '))
+        self.assertIn(missing_path, self.ssh_agent.commands[0])
+        self.assertEqual(self.ssh_agent.retrieved_files, [missing_path])
+
+
+class ESAFileManagerCacheTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        self.remote_path = os.path.join(self.directory, 'snmpd.conf')
+        with open(self.remote_path, 'w') as file:
+            file.write('Serial #: 123\n')
+        self.ssh_agent = LocalSSHAgent()
+        self.local_directory = os.path.join(self.directory, 'local')
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.directory)
+
+    def get_file_manager(self, file_cache: FileCache) -> ESAFileManager:
+        return ESAFileManager(self.ssh_agent, self.local_directory, file_cache = file_cache)
+
+    def test_current_file_is_not_transferred(self):
+        """Tests that an unchanged file is copied from the cache, and that a changed one is transferred again."""
+        cache_directory = os.path.join(self.directory, 'cache')
+        self.get_file_manager(FileCache(cache_directory)).retrieve_file(self.remote_path)
+        # A new run, the file is validated with the remote stat
+        self.get_file_manager(FileCache(cache_directory)).retrieve_file(self.remote_path)
+        self.assertEqual(len(self.ssh_agent.retrieved_files), 1)
+        with open(self.remote_path, 'a') as file:
+            file.write('changed\n')
+        local_path = self.get_file_manager(FileCache(cache_directory)).retrieve_file(self.remote_path)
+        self.assertEqual(len(self.ssh_agent.retrieved_files), 2)
+        with open(local_path) as file:
+            self.assertIn('changed', file.read())
+
+    def test_freshness_policy(self):
+        """Tests that the files validated in the current run are not validated again."""
+        esa_file_manager = self.get_file_manager(FileCache(os.path.join(self.directory, 'cache')))
+        esa_file_manager.retrieve_file(self.remote_path)
+        commands = len(self.ssh_agent.commands)
+        esa_file_manager.retrieve_file(self.remote_path)
+        self.assertEqual(len(self.ssh_agent.commands), commands)
+        self.assertEqual(len(self.ssh_agent.retrieved_files), 1)
+
+    def test_bulk_retrieval_only_transfers_changed_files(self):
+        """Tests that the bulk retrieval validates every file and only transfers the changed ones."""
+        other_path = os.path.join(self.directory, 'other.conf')
+        shutil.copy(self.remote_path, other_path)
+        cache_directory = os.path.join(self.directory, 'cache')
+        self.get_file_manager(FileCache(cache_directory)).get_files([self.remote_path, other_path])
+        with open(other_path, 'a') as file:
+            file.write('changed\n')
+        local_paths = self.get_file_manager(FileCache(cache_directory)).get_files([self.remote_path, other_path])
+        self.assertEqual(self.ssh_agent.retrieved_files, [self.remote_path, other_path, other_path])
+        self.assertEqual([os.path.basename(local_path) for local_path in local_paths], ['snmpd.conf', 'other.conf'])
+        self.assertTrue(all(os.path.exists(local_path) for local_path in local_paths))
+
+    def test_automatic_compression(self):
+        """Tests that the automatic mode only compresses the transfers of the files over the threshold."""
+        big_path = os.path.join(self.directory, 'big.dat')
+        with open(big_path, 'w') as file:
+            file.write('Info: delivered\n' * 100)
+        esa_file_manager = ESAFileManager(
+            self.ssh_agent, self.local_directory, transfer_compression = ESAFileManager.TRANSFER_COMPRESSION_AUTO,
+            compression_threshold = 1000
+        )
+        esa_file_manager.retrieve_file(self.remote_path)
+        esa_file_manager.retrieve_file(big_path)
+        self.assertEqual(self.ssh_agent.retrieved_files, [self.remote_path])
+        self.assertEqual(self.ssh_agent.compressed_files, [big_path])
+        self.assertTrue(os.path.exists(os.path.join(self.local_directory, 'big.dat')))
+
+    def test_lru_eviction(self):
+        """Tests that the least recently used entries are evicted once the cache is full."""
+        file_cache = FileCache(os.path.join(self.directory, 'cache'), max_size = 30)
+        file_cache.put('esa', '/a', self.remote_path)
+        file_cache.put('esa', '/b', self.remote_path)
+        file_cache.get('esa', '/a', self.directory)
+        file_cache.put('esa', '/c', self.remote_path)
+        self.assertTrue(file_cache.is_fresh('esa', '/a'))
+        self.assertFalse(file_cache.is_fresh('esa', '/b'))
+        self.assertLessEqual(file_cache.get_size(), 30)
+
+
+class ESAFileManagerIncrementalFetchTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        self.remote_path = os.path.join(self.directory, 'qlogd_alert_messages.dat')
+        self.start = ''.join(f'Info: MID { index } delivered\n' for index in range(20))
+        self.write_log(self.start, 'w')
+        self.ssh_agent = LocalSSHAgent()
+        self.cache_directory = os.path.join(self.directory, 'cache')
+        self.local_directory = os.path.join(self.directory, 'local')
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.directory)
+
+    def write_log(self, text: str, mode: str = 'a') -> None:
+        with open(self.remote_path, mode) as file:
+            file.write(text)
+
+    def fetch(self) -> str:
+        """Fetches the log file in a new run, returning the content of the local copy."""
+        esa_file_manager = ESAFileManager(self.ssh_agent, self.local_directory, file_cache = FileCache(self.cache_directory))
+        with open(esa_file_manager.retrieve_file_incrementally(self.remote_path)) as file:
+            return file.read()
+
+    def test_only_new_bytes_are_fetched(self):
+        """Tests that only the appended bytes (and the rotation check bytes) are streamed with tail."""
+        self.fetch()
+        self.write_log('Warning: Invalid Key\n')
+        self.assertEqual(self.fetch(), self.start + 'Warning: Invalid Key\n')
+        self.assertEqual(self.ssh_agent.retrieved_files, [self.remote_path])
+        # The last 64 bytes of the cached copy are fetched again to detect the rotations
+        self.assertEqual(self.ssh_agent.commands[-1], f'tail -c +{ len(self.start) - 64 + 1 } { self.remote_path }')
+        self.assertEqual(self.ssh_agent.channels[-1].received_bytes, 64 + len('Warning: Invalid Key\n'))
+        self.assertLess(self.ssh_agent.channels[-1].received_bytes, len(self.start))
+        self.assertFalse(any(name.endswith(FileCache.TEMPORARY_FILE_SUFFIX) for name in os.listdir(self.cache_directory)))
+
+    def test_rotation_triggers_a_full_fetch(self):
+        """Tests that a rotated log (a new file, or a truncated one with the same inode) is retrieved again."""
+        self.fetch()
+        os.remove(self.remote_path)
+        self.write_log('Info: rotated\n', 'w')
+        self.assertEqual(self.fetch(), 'Info: rotated\n')
+        # Truncated in place and rewritten past the previous size
+        self.write_log('Info: truncated and rewritten\n', 'w')
+        self.assertEqual(self.fetch(), 'Info: truncated and rewritten\n')
+        self.assertEqual(len(self.ssh_agent.retrieved_files), 3)
+
+
+class ESAFileManagerInMemoryTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        self.remote_path = os.path.join(self.directory, 'snmpd.conf')
+        with open(self.remote_path, 'w') as file:
+            file.write('Contact: admin\nSerial #: 123\n')
+        self.ssh_agent = LocalSSHAgent()
+        self.local_directory = os.path.join(self.directory, 'local')
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.directory)
+
+    def test_file_is_searched_in_memory(self):
+        """Tests that a file retrieved in memory is searched without writing it to the local directory."""
+        esa_file_manager = ESAFileManager(self.ssh_agent, self.local_directory, retrieve_in_memory = True)
+        file_object = esa_file_manager.retrieve_file(self.remote_path)
+        self.assertIs(esa_file_manager.get_file_source('snmpd.conf'), file_object)
+        self.assertEqual(esa_file_manager.get_value_from_file(file_object, r'Serial #: (.*)$'), '123')
+        # The file can be searched again, it is rewound on every open
+        self.assertTrue(esa_file_manager.is_string_present_in_file(file_object, 'Contact'))
+        self.assertFalse(os.path.exists(self.local_directory))
+        esa_file_manager.safely_remove_file(file_object)
+        self.assertTrue(file_object.closed)
+
+    def test_cached_file_is_copied_to_memory(self):
+        """Tests that the cached copy of a file retrieved in memory is copied back to memory."""
+        cache_directory = os.path.join(self.directory, 'cache')
+        for _ in range(2):
+            esa_file_manager = ESAFileManager(
+                self.ssh_agent, self.local_directory, file_cache = FileCache(cache_directory), retrieve_in_memory = True
+            )
+            file_object = esa_file_manager.retrieve_file(self.remote_path)
+            self.assertEqual(file_object.read(), b'Contact: admin\nSerial #: 123\n')
+        self.assertEqual(self.ssh_agent.retrieved_files, [self.remote_path])
+
+    def test_file_manager_accepts_file_objects(self):
+        """Tests the regex searches of the FileManager over a BytesIO."""
+        file_manager = FileManager(BytesIO('Serial #: 123\nVersion: ñ\n'.encode()))
+        self.assertEqual(file_manager.search_value_with_regex(r'Version: (.*)$'), 'ñ')
+        self.assertTrue(file_manager.is_string_present_in_the_file('Serial'))
+
+class ESAFileManagerSNMPDConfTest(unittest.TestCase):
+
+    SNMPD_CONF = (
+        '# SNMP configuration\n'
+        'sysdescr Cisco Model C170, AsyncOS Version: 14.0.0-657, Build Date: 2021-01-01, Serial #: 42A-B7\n'
+        'syscontact admin@example.com\n'
+        'syslocation Madrid\n'
+    )
+
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        self.remote_path = os.path.join(self.directory, 'remote', 'snmpd.conf')
+        os.makedirs(os.path.dirname(self.remote_path))
+        with open(self.remote_path, 'w') as file:
+            file.write(self.SNMPD_CONF)
+        self.ssh_agent = LocalSSHAgent()
+        self.ssh_agent.esa_ip = self.directory
+        self.local_directory = os.path.join(self.directory, 'local')
+        self.cache_directory = os.path.join(self.directory, 'cache')
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.directory)
+
+    def get_file_manager(self) -> ESAFileManager:
+        esa_file_manager = ESAFileManager(self.ssh_agent, self.local_directory, file_cache = FileCache(self.cache_directory))
+        esa_file_manager.ESA_SNMPD_CONF_PATH = self.remote_path
+        esa_file_manager.get_snmpd_file()
+        return esa_file_manager
+
+    def test_parsed_model(self):
+        """Tests that the model is parsed, immutable and serializable."""
+        snmpd_conf = ESASNMPDConf.parse(self.SNMPD_CONF)
+        self.assertEqual(
+            (snmpd_conf.serial_number, snmpd_conf.version_number, snmpd_conf.model, snmpd_conf.contact),
+            ('42A-B7', '14.0.0-657', 'C170', 'admin@example.com')
+        )
+        self.assertEqual(snmpd_conf.get('syslocation'), 'Madrid')
+        self.assertEqual(snmpd_conf.search_value(r'Build Date: (.*?),'), '2021-01-01')
+        self.assertIsNone(ESASNMPDConf.parse('syslocation Madrid\n').serial_number)
+        self.assertEqual(ESASNMPDConf.from_dict(json.loads(json.dumps(snmpd_conf.to_dict()))), snmpd_conf)
+        with self.assertRaises(dataclasses.FrozenInstanceError):
+            snmpd_conf.serial_number = None
+        with self.assertRaises(TypeError):
+            snmpd_conf.values['syslocation'] = 'Paris'
+        self.assertEqual({ snmpd_conf: 'C170' }[ESASNMPDConf.parse(self.SNMPD_CONF)], 'C170')
+        # The CRLF line endings are read as new lines
+        crlf_snmpd_conf = ESASNMPDConf.parse(self.SNMPD_CONF.replace('\n', '\r\n'))
+        self.assertEqual(crlf_snmpd_conf, snmpd_conf)
+        self.assertEqual(crlf_snmpd_conf.serial_number, '42A-B7')
+
+    def test_model_is_stored_with_the_cached_file(self):
+        """Tests that the model is parsed once and stored with the cached file, for the later runs."""
+        esa_file_manager = self.get_file_manager()
+        self.assertEqual(esa_file_manager.get_esa_serial_number(), '42A-B7')
+        self.assertEqual(esa_file_manager.get_value_from_snmpd(r'AsyncOS Version: (.*?),'), '14.0.0-657')
+        namespace = f'{ self.ssh_agent.esa_ip }:{ self.ssh_agent.esa_ssh_port }'
+        metadata = FileCache(self.cache_directory).get_metadata(namespace, self.remote_path, 'snmpd_conf')
+        self.assertEqual(metadata, esa_file_manager.get_snmpd_conf().to_dict())
+        # The model of another manager (in this run or a later one) is the same until the file changes
+        self.assertIs(self.get_file_manager().get_snmpd_conf(), esa_file_manager.get_snmpd_conf())
+        with open(self.remote_path, 'a') as file:
+            file.write('syslocation Paris\n')
+        os.utime(self.remote_path, (0, 0))
+        self.assertEqual(self.get_file_manager().get_snmpd_conf().lines[-1], 'syslocation Paris\n')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,134 @@
+import unittest
+# ESA utils
+from esalib.esa_utils.ESASSHAgent import ESASSHAgent, ESASSHAgentScopes
+from esalib.esa_utils.ESAParameters import ESASSHParameters
+# SSH
+from esalib.infrastructure.ssh_manager.SSHConnectionPool import SSHConnectionPool
+from esalib.infrastructure.ssh_manager.SSHSession import SSHSessionReconnected
+from esalib.infrastructure.ssh_manager.strategy.SSHStrategy import SSHStrategy
+
+
+class FakeShellStrategy(SSHStrategy):
+    """SSH strategy stand-in that emulates the ESA shells (csh, cli and a configuration mode)."""
+
+    def __init__(self, options):
+        self.options = options
+        self.commands = []
+        self.channel_open = False
+        self.prompt = 'esa# '
+        self.is_alive = False
+        self.drop_connection = False
+
+    def connect(self):
+        self.is_alive = True
+        return self
+
+    def is_connection_alive(self) -> bool:
+        return self.is_alive
+
+    def get_connection(self):
+        return self
+
+    def disconnect(self):
+        self.close_channel()
+
+    def execute_command(self, command: str) -> str:
+        return ''
+
+    def execute_async_command(self, command, terminal_delimiter, close_channel_after, more_output_delimiter) -> str:
+        if self.drop_connection:
+            self.drop_connection = False
+            self.is_alive = False
+            self.close_channel()
+            raise EOFError()
+        self.channel_open = True
+        self.commands.append(command)
+        if command == 'csh':
+            self.prompt = '[root@esa ~]'
+        elif command == 'cli' or command.startswith('\n'):
+            self.prompt = 'esa.local> '
+        elif command == 'destconfig':
+            self.prompt = '[]> '
+        elif command == 'exit':
+            self.prompt = '[root@esa ~]' if self.prompt.endswith('> ') else 'esa# '
+        output = f'{ command }\n{ self.prompt }'
+        if close_channel_after:
+            self.close_channel()
+        return output
+
+    def set_channel_properties(self, timeout, sleep_time, buffer_size) -> None:
+        pass
+
+    def is_channel_open(self) -> bool:
+        return self.channel_open
+
+    def close_channel(self) -> None:
+        self.channel_open = False
+        self.prompt = 'esa# '
+
+
+class ESASSHAgentScopesTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        pool = SSHConnectionPool(strategy_class = FakeShellStrategy)
+        self.esa_ssh_agent = ESASSHAgent(ESASSHParameters('esa1', 'admin', ''), connection_pool = pool)
+        self.esa_ssh_agent.start_connection()
+        self.strategy = self.esa_ssh_agent.get_ssh_session().get_strategy()
+
+    def test_cli_mode_is_entered_once(self):
+        """Tests that consecutive CLI commands do not enter the shells again."""
+        self.esa_ssh_agent.execute_cli_command('version')
+        self.esa_ssh_agent.enter_cli_mode()
+        self.esa_ssh_agent.execute_cli_command('status')
+        self.assertEqual(self.strategy.commands, ['csh', 'cli', 'version', 'status'])
+
+    def test_config_mode(self):
+        """Tests the configuration mode transitions, including the nested levels."""
+        self.esa_ssh_agent.enter_config_mode('destconfig')
+        self.esa_ssh_agent.increase_config_nested_level()
+        self.assertEqual(self.esa_ssh_agent.get_scope(), ESASSHAgentScopes._CONFIG_MODE)
+        self.esa_ssh_agent.close_cli_mode()
+        self.assertEqual(self.strategy.commands, ['csh', 'cli', 'destconfig', '\n\n', 'exit', 'exit'])
+        self.assertEqual(self.esa_ssh_agent.get_scope(), ESASSHAgentScopes._NORMAL_MODE)
+
+    def test_closed_channel_resets_the_scope(self):
+        """Tests that the scopes are entered again if the interactive channel was closed."""
+        self.esa_ssh_agent.enter_cli_mode()
+        self.strategy.close_channel()
+        self.esa_ssh_agent.execute_cli_command('version')
+        self.assertEqual(self.strategy.commands, ['csh', 'cli', 'csh', 'cli', 'version'])
+
+    def test_scope_is_restored_after_reconnect(self):
+        """Tests that the CLI mode is entered again and the idempotent command repeated once the lost connection is restarted."""
+        self.esa_ssh_agent.get_ssh_session().reconnect_base_delay = 0
+        self.esa_ssh_agent.enter_cli_mode()
+        self.strategy.drop_connection = True
+        self.assertIn('version', self.esa_ssh_agent.execute_cli_command('version', idempotent = True))
+        self.assertEqual(self.strategy.commands, ['csh', 'cli', 'csh', 'cli', 'version'])
+        self.assertEqual(self.esa_ssh_agent.get_reconnect_count(), 1)
+
+    def test_command_is_not_repeated_after_reconnect(self):
+        """Tests that the CLI mode is restored after a reconnection, but the commands that are not idempotent are not repeated."""
+        self.esa_ssh_agent.get_ssh_session().reconnect_base_delay = 0
+        self.esa_ssh_agent.enter_cli_mode()
+        self.strategy.drop_connection = True
+        with self.assertRaises(SSHSessionReconnected):
+            self.esa_ssh_agent.execute_cli_command('commit')
+        self.strategy.drop_connection = True
+        with self.assertRaises(SSHSessionReconnected):
+            self.esa_ssh_agent.execute_cli_commands([('clear', '>'), ('commit', '>')])
+        self.assertEqual(self.strategy.commands, ['csh', 'cli', 'csh', 'cli', 'csh', 'cli'])
+        self.assertEqual(self.esa_ssh_agent.get_scope(), ESASSHAgentScopes._CLI_MODE)
+        self.assertEqual(self.esa_ssh_agent.get_reconnect_count(), 2)
+
+    def test_config_mode_is_not_restored_after_reconnect(self):
+        """Tests that the loss of the connection in configuration mode is reported."""
+        self.esa_ssh_agent.get_ssh_session().reconnect_base_delay = 0
+        self.esa_ssh_agent.enter_config_mode('destconfig')
+        self.strategy.drop_connection = True
+        with self.assertRaises(Exception):
+            self.esa_ssh_agent.execute_cli_command('new', command_delimiter = ']>')
+        self.assertEqual(self.esa_ssh_agent.get_scope(), ESASSHAgentScopes._NORMAL_MODE)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,204 @@
+import gzip
+import os
+import re
+import shutil
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from io import BytesIO
+# Utils
+from esalib.utils.files.FileManager import FileManager
+
+
+class FileManagerSearchTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        self.content = (
+            'snmp-server contact admin@example.com\n'
+            + ''.join(f'Info: MID { index } delivered to relay { index % 7 }\n' for index in range(2000))
+            + 'Warning: Invalid Key for the feature\n'
+            + 'Info: last line without new line character: déjà vu'
+        )
+        self.path = os.path.join(self.directory, 'qlogd_alert_messages.dat')
+        self.compressed_path = self.path + '.gz'
+        self.write_files()
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.directory)
+
+    def write_files(self) -> None:
+        """Writes the content to the plain and the compressed files (without translating the new lines)."""
+        with open(self.path, 'w', encoding = 'utf-8', newline = '') as file:
+            file.write(self.content)
+        with gzip.open(self.compressed_path, 'wt', encoding = 'utf-8', newline = '') as file:
+            file.write(self.content)
+
+    def get_file_managers(self) -> list[FileManager]:
+        """Returns a memory-mapped search with small windows, and the line by line searches (compressed and in memory)."""
+        return [
+            FileManager(self.path, search_window_size = 64),
+            FileManager(self.path),
+            FileManager(self.compressed_path),
+            FileManager(BytesIO(self.content.encode('utf-8')), 'qlogd_alert_messages.dat'),
+        ]
+
+    def test_value_search(self):
+        """Tests that the memory-mapped search returns the same values as the line by line search."""
+        for regex in [
+            r'MID (\d+) delivered to relay 6$',
+            r'^Info: MID (1999) ',
+            r'contact (\S+)',
+            r'Invalid (Key)',
+            r'character: (.*)$',
+            r'(relay \d)\s+Info',
+            r'MID (\d+) missing',
+        ]:
+            results = [file_manager.search_value_with_regex(regex) for file_manager in self.get_file_managers()]
+            self.assertEqual(len(set(results)), 1, f'{ regex }: { results }')
+        self.assertEqual(FileManager(self.path).search_value_with_regex(r'MID (\d+) delivered to relay 6$'), '6')
+        # Non-ASCII characters and CRLF line endings
+        self.content = 'Name: José Smith\r\nxéy\r\nÜNÏCODE\r\nDigits: ١٢\r\nSerial #: ABC\r\n'
+        self.write_files()
+        for regex, value in [
+            (r'Name: Jos. (\w+)', 'Smith'),
+            (r'Name: (\w+)', 'José'),
+            (r'(x[^z]y)', 'xéy'),
+            (r'(x\Wy)', False),
+            (r'(?i)(ünïcode)', 'ÜNÏCODE'),
+            (r'(?i)(unicode)', False),
+            (r'Digits: (\d+)$', '١٢'),
+            (r'Serial #: (ABC)$', 'ABC'),
+            (r'(\w+)\r', False),
+        ]:
+            for file_manager in self.get_file_managers():
+                self.assertEqual(file_manager.search_value_with_regex(regex), value, f'{ regex } { file_manager.path_to_file }')
+
+    def test_presence_search(self):
+        """Tests that the memory-mapped search detects the same strings as the line by line search."""
+        for regex, is_present in [
+            (r'Invalid Key', True),
+            (r'déjà vu$', True),
+            (r'delivered\nInfo', False),
+            (r'^Warning', True),
+            (r'Critical', False),
+        ]:
+            for file_manager in self.get_file_managers():
+                self.assertEqual(file_manager.is_string_present_in_the_file(regex), is_present, regex)
+
+    def test_multi_pattern_search(self):
+        """Tests that several literals and regexes are searched in a single pass, in every mode."""
+        regexes = [r'MID (\d+) delivered to relay 3$', r'contact \S+@(\w+)', r'(\w+) vu$', r'MID 1(\d)\1 ']
+        literals = ['Invalid Key', 'Critical', 'relay (3)']
+        for file_manager in self.get_file_managers():
+            self.assertEqual(file_manager.search_patterns(regexes, literals), {
+                regexes[0]: '3', regexes[1]: 'example', regexes[2]: 'déjà', regexes[3]: '0',
+                'Invalid Key': 'Invalid Key', 'Critical': None, 'relay (3)': None,
+            })
+            counts = file_manager.search_patterns(regexes[:1], literals, FileManager.SEARCH_COUNT)
+            self.assertEqual(counts, { regexes[0]: 286, 'Invalid Key': 1, 'Critical': 0, 'relay (3)': 0 })
+            matches = file_manager.search_patterns([r'MID (19\d\d) delivered to relay 0'], mode = FileManager.SEARCH_ALL)
+            self.assertEqual(matches[r'MID (19\d\d) delivered to relay 0'], [str(index) for index in range(1900, 2000) if index % 7 == 0])
+        # Non-ASCII characters and CRLF line endings
+        self.content = 'Name: José Smith\r\nxéy\r\nÜNÏCODE\r\nSerial #: ABC\r\n'
+        self.write_files()
+        regexes = [r'Name: Jos. (\w+)', r'(x[^z]y)', r'Serial #: (ABC)$']
+        for file_manager in self.get_file_managers():
+            self.assertEqual(file_manager.search_patterns(regexes), dict(zip(regexes, ['Smith', 'xéy', 'ABC'])))
+            self.assertEqual(
+                file_manager.search_patterns([r'(?i)(ünïcode)', r'(\w+)$'], mode = FileManager.SEARCH_ALL),
+                { r'(?i)(ünïcode)': ['ÜNÏCODE'], r'(\w+)$': ['Smith', 'xéy', 'ÜNÏCODE', 'ABC'] }
+            )
+
+    def test_reverse_search(self):
+        """Tests that the lines are searched newest-first, within the line budget."""
+        for file_manager in self.get_file_managers():
+            self.assertEqual(
+                file_manager.search_lines_in_reverse(r'relay 4$', max_count = 2, block_size = 100),
+                ['Info: MID 1999 delivered to relay 4', 'Info: MID 1992 delivered to relay 4']
+            )
+            self.assertEqual(file_manager.search_lines_in_reverse('vu$'), ['Info: last line without new line character: déjà vu'])
+            self.assertEqual(file_manager.search_lines_in_reverse('contact'), ['snmp-server contact admin@example.com'])
+            self.assertEqual(file_manager.search_lines_in_reverse('contact', max_lines = 2001), [])
+            self.assertEqual(len(file_manager.search_lines_in_reverse('MID', max_count = None, max_lines = 10)), 8)
+
+    def test_empty_file(self):
+        """Tests that an empty file has no matches."""
+        with open(self.path, 'w'):
+            pass
+        self.assertFalse(FileManager(self.path).is_string_present_in_the_file(r'.*'))
+
+class CountingBytesIO(BytesIO):
+    """BytesIO that counts the bytes read by lines."""
+    read_bytes = 0
+
+    def readline(self, *args) -> bytes:
+        line = super().readline(*args)
+        self.read_bytes += len(line)
+        return line
+
+
+class FileManagerTimeWindowTest(unittest.TestCase):
+
+    START = datetime(2026, 10, 1)
+
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        lines = []
+        for index in range(3000):
+            lines.append(f'{ (self.START + timedelta(minutes = index)).isoformat() } Info: message { index }\n')
+            # Some messages span several lines, the continuation lines have no timestamp
+            if index % 10 == 0:
+                lines.append(f'    continuation of message { index }\n')
+        self.content = ''.join(lines)
+        self.path = os.path.join(self.directory, 'messages.log')
+        with open(self.path, 'w') as file:
+            file.write(self.content)
+        with gzip.open(self.path + '.gz', 'wt') as file:
+            file.write(self.content)
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.directory)
+
+    @staticmethod
+    def parse_timestamp(line: str) -> datetime:
+        return datetime.fromisoformat(line[:19]) if line[:4].isdigit() else None
+
+    def get_expected_lines(self, regex: str, start: datetime, end: datetime) -> list[str]:
+        """Filters the lines of the window with a full scan."""
+        lines, timestamp = [], None
+        for line in self.content.splitlines():
+            timestamp = self.parse_timestamp(line) or timestamp
+            if (start == None or timestamp >= start) and (end == None or timestamp <= end) and re.search(regex, line):
+                lines.append(line)
+        return lines
+
+    def test_window_search(self):
+        """Tests that the lines within a time window are the same as the ones of a full scan."""
+        for start, end in [
+            (self.START + timedelta(minutes = 100), self.START + timedelta(minutes = 120)),
+            (self.START + timedelta(minutes = 99, seconds = 30), self.START + timedelta(minutes = 101)),
+            (None, self.START + timedelta(minutes = 5)),
+            (self.START + timedelta(minutes = 2990), None),
+            (self.START - timedelta(days = 1), self.START),
+            (self.START + timedelta(days = 10), None),
+        ]:
+            for path in [self.path, self.path + '.gz']:
+                self.assertEqual(
+                    FileManager(path).search_lines_in_time_window('message', self.parse_timestamp, start, end),
+                    self.get_expected_lines('message', start, end),
+                    f'{ path } { start } { end }'
+                )
+
+    def test_window_search_reads_only_the_window(self):
+        """Tests that the binary search only reads a few lines besides the ones of the window."""
+        file_object = CountingBytesIO(self.content.encode())
+        start = self.START + timedelta(minutes = 1500)
+        lines = FileManager(file_object, 'messages.log').search_lines_in_time_window(
+            r'message \d+$', self.parse_timestamp, start, start + timedelta(minutes = 9)
+        )
+        self.assertEqual(lines, self.get_expected_lines(r'message \d+$', start, start + timedelta(minutes = 9)))
+        self.assertLess(file_object.read_bytes, 5000)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import asyncio
+import threading
+import time
+import unittest
+# Utils
+from esalib.utils.validators.IteratorValidator import IteratorValidator, IterationTimeout
+
+
+class IteratorValidatorTest(unittest.TestCase):
+
+    def test_timeout_counts_the_caller_time(self):
+        """Tests that the time spent between iterations is counted in the timeout."""
+        start_time = time.monotonic()
+        with self.assertRaises(IterationTimeout):
+            for _ in IteratorValidator.iterator_with_timeout(0.3, 0.01):
+                time.sleep(0.1)
+        self.assertLess(time.monotonic() - start_time, 0.6)
+
+    def test_deadline_backoff(self):
+        """Tests that the first iteration is immediate and that the timeout is raised on time."""
+        start_time = time.monotonic()
+        iterations = 0
+        with self.assertRaises(IterationTimeout):
+            for _ in IteratorValidator.iterator_with_deadline(0.2, initial_sleep_time = 0.001, max_sleep_time = 0.05):
+                iterations += 1
+        self.assertLess(time.monotonic() - start_time, 0.3)
+        # The sleep time grows, so there are far fewer iterations than with a fixed 1ms sleep
+        self.assertLess(iterations, 20)
+
+    def test_wait_until_with_wake_up_event(self):
+        """Tests that the wake up event triggers the check before the sleep time is over."""
+        wake_up_event = threading.Event()
+        is_ready = []
+        def set_ready():
+            is_ready.append(True)
+            wake_up_event.set()
+        threading.Timer(0.05, set_ready).start()
+        start_time = time.monotonic()
+        self.assertTrue(IteratorValidator.wait_until(lambda: is_ready, 5, initial_sleep_time = 2, wake_up_event = wake_up_event))
+        self.assertLess(time.monotonic() - start_time, 1)
+
+    def test_async_wait_until(self):
+        """Tests the asyncio variant of the wait."""
+        async def wait():
+            start_time = time.monotonic()
+            async def is_ready():
+                return time.monotonic() - start_time > 0.05
+            return await IteratorValidator.async_wait_until(is_ready, 1)
+        self.assertTrue(asyncio.run(wait()))
+
+if __name__ == '__main__':
+    unittest.main()
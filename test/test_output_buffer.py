@@ -0,0 +1,54 @@
+import unittest
+# SSH
+from esalib.infrastructure.ssh_manager.buffers.OutputBuffer import OutputBuffer
+
+
+class OutputBufferTest(unittest.TestCase):
+
+    def fill_buffer(self, output_buffer: OutputBuffer) -> None:
+        for index in range(10):
+            output_buffer.append(f'line { index }\n', f'command { index }')
+
+    def test_command_slices(self):
+        """Tests the retrieval of the output of a single command and of the last characters and lines."""
+        output_buffer = OutputBuffer()
+        self.fill_buffer(output_buffer)
+        self.assertEqual(output_buffer.get_command_output(), 'line 9\n')
+        self.assertEqual(output_buffer.get_command_output(2), 'line 2\n')
+        self.assertEqual(output_buffer.get_tail(9), '8\nline 9\n')
+        self.assertEqual(output_buffer.get_tail_lines(2), ['line 8', 'line 9'])
+        self.assertEqual(len(output_buffer), 70)
+
+    def test_max_size(self):
+        """Tests that the oldest output is dropped once the maximum size is reached."""
+        output_buffer = OutputBuffer(max_size = 20)
+        self.fill_buffer(output_buffer)
+        self.assertEqual(output_buffer.get_value(), 'ine 7\nline 8\nline 9\n')
+        self.assertEqual(output_buffer.get_memory_size(), 20)
+        self.assertEqual(output_buffer.get_command_output(0), '')
+        self.assertEqual(output_buffer.get_command_output(7), 'ine 7\n')
+
+    def test_spill_to_file(self):
+        """Tests that the evicted output is kept in the spill file, while the memory size stays bounded."""
+        output_buffer = OutputBuffer(max_size = 20, spill_to_file = True)
+        self.fill_buffer(output_buffer)
+        self.assertEqual(output_buffer.get_memory_size(), 20)
+        self.assertEqual(output_buffer.get_value(), ''.join(f'line { index }\n' for index in range(10)))
+        self.assertEqual(output_buffer.get_command_output(1), 'line 1\n')
+        self.assertEqual(output_buffer.get_slice(12, 30), '1\nline 2\nline 3\nli')
+        self.assertEqual(output_buffer.get_tail(23), '6\nline 7\nline 8\nline 9\n')
+        output_buffer.clear()
+        self.assertEqual(output_buffer.get_value(), '')
+
+    def test_spilled_slices_with_multibyte_characters(self):
+        """Tests that the slices of the spill file are located by offset, also with multibyte characters."""
+        output_buffer = OutputBuffer(max_size = 10, spill_to_file = True)
+        output = ''.join(f'línea { index } ✓\n' for index in range(50))
+        for line in output.splitlines(keepends = True):
+            output_buffer.append(line)
+        self.assertEqual(output_buffer.get_value(), output)
+        for start, end in [(0, 5), (3, 40), (101, 102), (250, 400)]:
+            self.assertEqual(output_buffer.get_slice(start, end), output[start:end])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import threading
+import time
+import unittest
+from io import BytesIO
+# SSH
+from esalib.infrastructure.ssh_manager.strategy.ParamikoStrategy import ParamikoStrategy
+
+
+class ChannelCountingClient:
+    """SSHClient stand-in, it records the number of exec channels open at the same time."""
+
+    def __init__(self, command_time: float = 0.05):
+        self.command_time = command_time
+        self.open_channels = 0
+        self.peak_open_channels = 0
+        self.lock = threading.Lock()
+
+    def exec_command(self, command: str) -> tuple:
+        with self.lock:
+            self.open_channels += 1
+            self.peak_open_channels = max(self.peak_open_channels, self.open_channels)
+        return None, CountedStdout(self, f'{ command } output'.encode()), None
+
+    def close_channel(self):
+        with self.lock:
+            self.open_channels -= 1
+
+
+class CountedStdout(BytesIO):
+    """Output of an exec channel, the channel is closed once the output is read."""
+
+    def __init__(self, client: ChannelCountingClient, data: bytes):
+        super().__init__(data)
+        self.client = client
+
+    def read(self, *args) -> bytes:
+        time.sleep(self.client.command_time)
+        data = super().read(*args)
+        self.client.close_channel()
+        return data
+
+
+class InteractiveChannel:
+    """Interactive channel stand-in, it is always active."""
+    active = True
+
+
+class ParamikoStrategyTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.strategy = ParamikoStrategy({})
+        self.strategy.connection = ChannelCountingClient()
+
+    def test_concurrent_commands_are_capped(self):
+        """Tests that the commands are executed concurrently, without exceeding max_channels open channels."""
+        commands = [f'command { index }' for index in range(12)]
+        outputs = self.strategy.execute_commands(commands, max_channels = 3)
+        self.assertEqual(outputs, [f'{ command } output' for command in commands])
+        self.assertEqual(self.strategy.connection.peak_open_channels, 3)
+        self.assertEqual(self.strategy.connection.open_channels, 0)
+
+    def test_single_channel(self):
+        """Tests that the commands are executed one by one with a single channel."""
+        self.strategy.execute_commands(['status', 'version'], max_channels = 1)
+        self.assertEqual(self.strategy.connection.peak_open_channels, 1)
+
+    def test_interactive_channel_takes_a_channel(self):
+        """Tests that an open interactive channel counts against the channels of the connection."""
+        self.strategy.execute_commands([f'command { index }' for index in range(12)])
+        self.assertEqual(self.strategy.connection.peak_open_channels, ParamikoStrategy.MAX_CHANNELS)
+        self.strategy.channel = InteractiveChannel()
+        self.strategy.connection.peak_open_channels = 0
+        self.strategy.execute_commands([f'command { index }' for index in range(12)])
+        self.assertEqual(self.strategy.connection.peak_open_channels, ParamikoStrategy.MAX_CHANNELS - 1)
+
+if __name__ == '__main__':
+    unittest.main()
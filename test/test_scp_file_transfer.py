@@ -0,0 +1,72 @@
+import gzip
+import os
+import shutil
+import tempfile
+import unittest
+# SSH
+from esalib.infrastructure.ssh_manager.SCPFileTransfer import SCPFileTransfer
+# Utils
+from esalib.utils.files.FileManager import FileManager
+# Test stand-ins
+from .local_shell import LocalTransport
+
+
+class SCPFileTransferTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        self.remote_path = os.path.join(self.directory, 'remote', 'qlogd_alert_messages.dat')
+        os.makedirs(os.path.dirname(self.remote_path))
+        self.content = ''.join(f'Info: MID { index } delivered\n' for index in range(5000))
+        with open(self.remote_path, 'w') as file:
+            file.write(self.content)
+        self.transport = LocalTransport()
+        self.scp_file_transfer = SCPFileTransfer(self.transport)
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.directory)
+
+    def test_compressed_file_is_decompressed_on_the_fly(self):
+        """Tests that a file compressed remotely is decompressed locally, transferring only the compressed bytes."""
+        local_path = self.scp_file_transfer.get_compressed_file(self.remote_path, self.directory)
+        with open(local_path) as file:
+            self.assertEqual(file.read(), self.content)
+        self.assertLess(self.transport.received_bytes * 5, len(self.content))
+
+    def test_compressed_file_is_kept_as_gz(self):
+        """Tests that a compressed file can be kept as .gz and searched with the gzip strategy of the FileManager."""
+        local_path = self.scp_file_transfer.get_compressed_file(self.remote_path, self.directory, decompress = False)
+        self.assertTrue(local_path.endswith('.gz'))
+        with gzip.open(local_path, 'rt') as file:
+            self.assertEqual(file.read(), self.content)
+        self.assertEqual(FileManager(local_path).search_value_with_regex(r'MID (\d+) delivered$'), '0')
+
+    def test_file_object_retrieval(self):
+        """Tests that a file is retrieved in memory, compressed or not."""
+        self.assertEqual(self.scp_file_transfer.get_file_object(self.remote_path).read().decode(), self.content)
+        file_object = self.scp_file_transfer.get_file_object(self.remote_path, compressed = True)
+        self.assertEqual(file_object.read().decode(), self.content)
+
+    def test_transfers_are_recorded(self):
+        """Tests that the progress of the transfers is reported and that every transfer is recorded, even if it fails."""
+        progress = []
+        scp_file_transfer = SCPFileTransfer(self.transport, progress_callback = lambda *arguments: progress.append(arguments))
+        scp_file_transfer.get_compressed_file(self.remote_path, self.directory)
+        with self.assertRaises(Exception):
+            scp_file_transfer.get_file_object(os.path.join(self.directory, 'remote', 'missing.dat'))
+        compressed_record, failed_record = scp_file_transfer.transfer_records
+        self.assertTrue(compressed_record.compressed and compressed_record.succeeded)
+        self.assertEqual(compressed_record.size, len(self.content))
+        self.assertEqual(compressed_record.transferred_bytes, self.transport.received_bytes)
+        self.assertGreater(compressed_record.get_throughput(), 0)
+        self.assertFalse(failed_record.succeeded)
+        self.assertEqual(progress[-1][:3], (self.remote_path, compressed_record.transferred_bytes, len(self.content)))
+
+    def test_missing_remote_file(self):
+        """Tests that a failed compressed transfer raises an exception and leaves no partial file."""
+        with self.assertRaises(Exception):
+            self.scp_file_transfer.get_compressed_file(os.path.join(self.directory, 'remote', 'missing.dat'), self.directory)
+        self.assertFalse(os.path.exists(os.path.join(self.directory, 'missing.dat')))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,172 @@
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import unittest
+from io import BytesIO
+from paramiko import (
+    AUTH_SUCCESSFUL, OPEN_SUCCEEDED, RSAKey, ServerInterface, SFTPAttributes, SFTPHandle, SFTPServer,
+    SFTPServerInterface, Transport
+)
+# Decorators
+from esalib.infrastructure.ssh_manager.decorators.WithSFTPDecorator import WithSFTPDecorator
+# Test stand-ins
+from .local_shell import execute_locally
+
+
+class LocalSFTPHandle(SFTPHandle):
+    """SFTP handle of a local file, it records the offsets of the reads."""
+
+    def read(self, offset, length):
+        LocalSFTPServer.read_offsets.append(offset)
+        return super().read(offset, length)
+
+    def stat(self):
+        return SFTPAttributes.from_stat(os.fstat(self.readfile.fileno()))
+
+
+class LocalSFTPServer(SFTPServerInterface):
+    """SFTP server stand-in, the remote files are local files."""
+    read_offsets = []
+
+    def stat(self, path):
+        return SFTPAttributes.from_stat(os.stat(path))
+
+    lstat = stat
+
+    def open(self, path, flags, attr):
+        handle = LocalSFTPHandle(flags)
+        handle.filename = path
+        handle.readfile = open(path, 'rb')
+        return handle
+
+
+class LocalSSHServer(ServerInterface):
+    """SSH server stand-in, it accepts any password and executes the commands locally."""
+
+    def get_allowed_auths(self, username):
+        return 'password'
+
+    def check_auth_password(self, username, password):
+        return AUTH_SUCCESSFUL
+
+    def check_channel_request(self, kind, chanid):
+        return OPEN_SUCCEEDED
+
+    def check_channel_exec_request(self, channel, command):
+        threading.Thread(target = self.execute, args = (channel, command), daemon = True).start()
+        return True
+
+    @staticmethod
+    def execute(channel, command):
+        result = execute_locally(command.decode())
+        channel.sendall(result.stdout)
+        channel.send_exit_status(result.returncode)
+        channel.close()
+
+
+class WithSFTPDecoratorTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.host_key = RSAKey.generate(1024)
+
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        self.remote_path = os.path.join(self.directory, 'qlogd_alert_messages.dat')
+        self.content = os.urandom(50000)
+        with open(self.remote_path, 'wb') as file:
+            file.write(self.content)
+        self.local_path = os.path.join(self.directory, 'local.dat')
+        LocalSFTPServer.read_offsets = []
+        # We connect both ends of a socket pair, the server end plays the role of the ESA
+        client_socket, server_socket = socket.socketpair()
+        self.server_transport = Transport(server_socket)
+        self.server_transport.add_server_key(self.host_key)
+        self.server_transport.set_subsystem_handler('sftp', SFTPServer, LocalSFTPServer)
+        server_thread = threading.Thread(target = self.server_transport.start_server, kwargs = { 'server': LocalSSHServer() })
+        server_thread.start()
+        self.transport = Transport(client_socket)
+        self.transport.connect(username = 'admin', password = '')
+        server_thread.join()
+
+    def tearDown(self) -> None:
+        self.transport.close()
+        self.server_transport.close()
+        shutil.rmtree(self.directory)
+
+    def read_local_file(self) -> bytes:
+        with open(self.local_path, 'rb') as file:
+            return file.read()
+
+    def test_pipelined_retrieval(self):
+        """Tests that the file is retrieved in chunks, reporting its progress, and that its checksum is verified."""
+        progress = []
+        decorator = WithSFTPDecorator(self.transport, chunk_size = 4096, max_requests = 4, verify_checksum = True)
+        decorator.retrieve_file(self.remote_path, self.local_path, lambda *arguments: progress.append(arguments))
+        self.assertEqual(self.read_local_file(), self.content)
+        self.assertEqual(progress[-1], (len(self.content), len(self.content)))
+        self.assertGreater(len(progress), 1)
+        self.assertFalse(os.path.exists(self.local_path + WithSFTPDecorator.PART_FILE_SUFFIX))
+
+    def interrupt_transfer(self) -> None:
+        """Interrupts a transfer after its first batch of reads, leaving the .part file behind."""
+        def interrupt(*arguments):
+            raise Exception('Interrupted')
+        with self.assertRaises(Exception):
+            WithSFTPDecorator(self.transport, chunk_size = 4096, max_requests = 2).retrieve_file(
+                self.remote_path, self.local_path, interrupt
+            )
+        LocalSFTPServer.read_offsets = []
+
+    def test_partial_download_is_resumed(self):
+        """Tests that an interrupted transfer is resumed from the end of the .part file."""
+        self.interrupt_transfer()
+        progress = []
+        WithSFTPDecorator(self.transport, chunk_size = 4096).retrieve_file(
+            self.remote_path, self.local_path, lambda *arguments: progress.append(arguments)
+        )
+        self.assertEqual(self.read_local_file(), self.content)
+        self.assertEqual(progress[-1], (len(self.content) - 8192, len(self.content) - 8192))
+        self.assertGreaterEqual(min(LocalSFTPServer.read_offsets), 8192)
+        self.assertFalse(os.path.exists(self.local_path + WithSFTPDecorator.PART_METADATA_SUFFIX))
+
+    def test_changed_file_is_not_resumed(self):
+        """Tests that a .part file is discarded if the remote file changed since it was started, or if it is unknown."""
+        self.interrupt_transfer()
+        self.content = os.urandom(50000)
+        with open(self.remote_path, 'wb') as file:
+            file.write(self.content)
+        os.utime(self.remote_path, (0, os.stat(self.remote_path).st_mtime + 10))
+        WithSFTPDecorator(self.transport, chunk_size = 4096).retrieve_file(self.remote_path, self.local_path)
+        self.assertEqual(self.read_local_file(), self.content)
+        self.assertEqual(min(LocalSFTPServer.read_offsets), 0)
+        # A .part file without its metadata is not resumed either
+        with open(self.local_path + WithSFTPDecorator.PART_FILE_SUFFIX, 'wb') as part_file:
+            part_file.write(b'\0' * 30000)
+        LocalSFTPServer.read_offsets = []
+        WithSFTPDecorator(self.transport, chunk_size = 4096).retrieve_file(self.remote_path, self.local_path)
+        self.assertEqual(self.read_local_file(), self.content)
+        self.assertEqual(min(LocalSFTPServer.read_offsets), 0)
+
+    def test_retrieval_into_file_object(self):
+        """Tests that a file is retrieved into a file-like object, without a local file."""
+        file_object = BytesIO()
+        WithSFTPDecorator(self.transport).retrieve_file_object(self.remote_path, file_object)
+        self.assertEqual(file_object.getvalue(), self.content)
+        self.assertFalse(os.path.exists(self.local_path))
+
+    def test_checksum_mismatch(self):
+        """Tests that a corrupted .part file is detected by the checksum and removed."""
+        self.interrupt_transfer()
+        with open(self.local_path + WithSFTPDecorator.PART_FILE_SUFFIX, 'r+b') as part_file:
+            part_file.write(b'\0' * 8192)
+        with self.assertRaises(Exception):
+            WithSFTPDecorator(self.transport, verify_checksum = True).retrieve_file(self.remote_path, self.local_path)
+        self.assertFalse(os.path.exists(self.local_path + WithSFTPDecorator.PART_FILE_SUFFIX))
+        self.assertFalse(os.path.exists(self.local_path + WithSFTPDecorator.PART_METADATA_SUFFIX))
+        self.assertFalse(os.path.exists(self.local_path))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,152 @@
+import threading
+import unittest
+# SSH
+from esalib.infrastructure.ssh_manager.SSHConnectionPool import SSHConnectionPool
+from esalib.infrastructure.ssh_manager.SSHSession import SSHSession, SSHSessionReconnected
+from esalib.infrastructure.ssh_manager.buffers.OutputBuffer import OutputBuffer
+from esalib.infrastructure.ssh_manager.strategy.SSHStrategy import SSHStrategy
+
+
+class FakeStrategy(SSHStrategy):
+    """SSH strategy stand-in, it does not open any real connection."""
+
+    def __init__(self, options):
+        self.options = options
+        self.is_alive = False
+
+    def connect(self):
+        self.is_alive = True
+        return self
+
+    def get_connection(self):
+        return self
+
+    def disconnect(self):
+        self.is_alive = False
+
+    def is_connection_alive(self) -> bool:
+        return self.is_alive
+
+    def execute_command(self, command: str) -> str:
+        return f'{ self.options["hostname"] }: { command }'
+
+
+class DroppingStrategy(FakeStrategy):
+    """SSH strategy stand-in whose connection drops during the first command, and that refuses $failed_connects connections."""
+
+    def __init__(self, options, failed_connects: int = 0):
+        super().__init__(options)
+        self.failed_connects = failed_connects
+        self.executed_commands = []
+
+    def connect(self):
+        if self.executed_commands and self.failed_connects > 0:
+            self.failed_connects -= 1
+            raise ConnectionRefusedError('Connection refused')
+        return super().connect()
+
+    def execute_command(self, command: str) -> str:
+        self.executed_commands.append(command)
+        if len(self.executed_commands) == 1:
+            self.is_alive = False
+            raise EOFError('Connection dropped')
+        return super().execute_command(command)
+
+
+class SSHConnectionPoolTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.pool = SSHConnectionPool(max_size = 2, checkout_timeout = 0.1, strategy_class = FakeStrategy)
+
+    def get_host_options(self, host: str) -> dict:
+        return { 'hostname': host, 'username': 'admin', 'password': '', 'port': 22 }
+
+    def test_sessions_are_isolated_by_host(self):
+        """Tests that every host gets its own session and output buffer."""
+        first_session = self.pool.checkout(self.get_host_options('esa1'))
+        second_session = self.pool.checkout(self.get_host_options('esa2'))
+        self.assertEqual(first_session.exec_command('version'), 'esa1: version')
+        self.assertEqual(second_session.exec_command('version'), 'esa2: version')
+        self.assertEqual(first_session.get_output(), 'esa1: version')
+
+    def test_released_session_is_reused(self):
+        """Tests that a released session is handed out again for the same host."""
+        session = self.pool.checkout(self.get_host_options('esa1'))
+        self.pool.release(session)
+        self.assertIs(self.pool.checkout(self.get_host_options('esa1')), session)
+        self.assertEqual(self.pool.get_size(), 1)
+
+    def test_dead_session_is_replaced(self):
+        """Tests that a session that fails the health check is not handed out."""
+        session = self.pool.checkout(self.get_host_options('esa1'))
+        self.pool.release(session)
+        session.strategy.is_alive = False
+        self.assertIsNot(self.pool.checkout(self.get_host_options('esa1')), session)
+
+    def test_max_size(self):
+        """Tests that idle sessions are evicted when the pool is full, and that the checkout times out otherwise."""
+        first_session = self.pool.checkout(self.get_host_options('esa1'))
+        self.pool.checkout(self.get_host_options('esa2'))
+        with self.assertRaises(Exception):
+            self.pool.checkout(self.get_host_options('esa3'))
+        self.pool.release(first_session)
+        self.pool.checkout(self.get_host_options('esa3'))
+        self.assertFalse(first_session.is_alive())
+        self.assertEqual(self.pool.get_size(), 2)
+
+    def test_sessions_are_closed_outside_the_lock(self):
+        """Tests that the evicted sessions are disconnected without blocking the pool."""
+        pool_sizes = []
+        def disconnect():
+            # Another thread must be able to use the pool while the session is being closed
+            thread = threading.Thread(target = lambda: pool_sizes.append(self.pool.get_size()))
+            thread.start()
+            thread.join(1)
+        first_session = self.pool.checkout(self.get_host_options('esa1'))
+        first_session.strategy.disconnect = disconnect
+        self.pool.checkout(self.get_host_options('esa2'))
+        self.pool.release(first_session)
+        self.pool.checkout(self.get_host_options('esa3'))
+        self.assertEqual(pool_sizes, [2])
+
+    def test_commands_batch(self):
+        """Tests that the outputs of a batch of commands are returned in order and written to the buffer."""
+        session = self.pool.checkout(self.get_host_options('esa1'))
+        self.assertEqual(session.exec_commands(['status', 'version']), ['esa1: status', 'esa1: version'])
+        self.assertEqual(session.get_command_output(0), 'esa1: status')
+
+    def test_output_is_not_truncated_by_the_buffer(self):
+        """Tests that the buffer bound only limits the history, the output of the command is returned in full."""
+        session = SSHSession(FakeStrategy(self.get_host_options('esa1')), output_buffer = OutputBuffer(max_size = 8))
+        session.connect()
+        self.assertEqual(session.exec_command('version'), 'esa1: version')
+        self.assertEqual(session.get_output(), ' version')
+
+    def get_dropping_session(self, failed_connects: int = 0) -> SSHSession:
+        session = SSHSession(DroppingStrategy(self.get_host_options('esa1'), failed_connects))
+        session.reconnect_base_delay = 0.01
+        session.reconnect_attempts = 3
+        session.connect()
+        return session
+
+    def test_commands_are_not_repeated_after_a_reconnection(self):
+        """Tests that a command is only executed again after a reconnection if it is idempotent."""
+        session = self.get_dropping_session()
+        with self.assertRaises(SSHSessionReconnected):
+            session.exec_command('reboot')
+        self.assertEqual(session.strategy.executed_commands, ['reboot'])
+        self.assertEqual(session.reconnect_count, 1)
+        session = self.get_dropping_session()
+        self.assertEqual(session.exec_command('version', idempotent = True), 'esa1: version')
+        self.assertEqual(session.strategy.executed_commands, ['version', 'version'])
+
+    def test_failed_reconnection(self):
+        """Tests that the exception of the last attempt is raised when the connection cannot be restarted."""
+        session = self.get_dropping_session(failed_connects = 3)
+        with self.assertRaises(ConnectionRefusedError):
+            session.exec_command('version', idempotent = True)
+        self.assertEqual(session.reconnect_count, 1)
+        self.assertGreater(session.downtime, 0)
+
+if __name__ == '__main__':
+    unittest.main()